@@ -0,0 +1,219 @@
+import random
+import sys
+import threading
+import time
+from array import array
+
+import numpy as np
+
+from db import DB_NAME, read, write
+from question_bank import get_bank
+from scoring import bank_arrays, encode
+
+# ==========================================
+# الامتحان التكيّفي (IRT ثنائي المعلمة + CAT)
+# ==========================================
+# احتمال الإجابة الصحيحة لطالب بقدرة θ على بند بمعلمتيه (a التمييز، b الصعوبة):
+#     P = 1 / (1 + exp(-a (θ - b)))        ومعلومة البند: I = a² P (1 - P)
+# بعد كل إجابة تُقدَّر θ (EAP على شبكة ثابتة مع توزيع مسبق طبيعي)، ثم يُختار من القسم
+# الأقل تمثيلاً حتى الآن البند الأكثر معلومة عند θ. معاملات كل قسم مصفوفات مبنية
+# مسبقاً، فالاختيار عملية متجهة واحدة مهما كبر البنك.
+# المعاملات تُعاير خارج الخادم من المحاولات المنتهية: python adaptive.py
+
+GRID = np.linspace(-4, 4, 81)
+LOG_PRIOR = -GRID ** 2 / 2
+DEFAULT_A = 1.0          # بند لم يُعاير بعد: تمييز متوسط وصعوبة 0
+MIN_RESPONSES = 20       # أقل عدد إجابات لاعتماد معاملات البند المعايَرة
+MIN_ITEMS = 10           # لا يتوقف الامتحان قبل هذا العدد مهما صغر الخطأ المعياري
+TARGET_SE = 0.3          # يتوقف الامتحان عندما يبلغ الخطأ المعياري للتقدير هذا الحد
+TOP_K = 5                # اختيار عشوائي بين أفضل K بنود حتى لا يظهر نفس السؤال لكل الطلاب
+CHECK_INTERVAL = 30.0    # ثوانٍ بين فحوص Calibration.version
+CALIBRATION_ROUNDS = 30
+
+def probability(a, b, theta):
+    return 1 / (1 + np.exp(-a * (theta - b)))
+
+def select(items, a, b, theta, rng, k=TOP_K):
+    """أحد أكثر k بنود معلومةً عند θ (معلومة فيشر للبنود كلها دفعة واحدة)."""
+    p = probability(a, b, theta)
+    info = a * a * p * (1 - p)
+    best = np.argpartition(info, -k)[-k:] if len(items) > k else np.arange(len(items))
+    # ترتيب ثابت للمرشحين حتى تعطي نفس البذرة نفس الاختيار
+    best = best[np.lexsort((items[best], -info[best]))]
+    return items[best[rng.randrange(len(best))]]
+
+
+class ItemPool:
+    """معاملات بنود البنك كمصفوفات، مع مصفوفات جاهزة لكل (مادة، قسم)."""
+
+    def __init__(self, bank, version, params):
+        self.bank = bank
+        self.version = version    # Calibration.version وقت التحميل
+        self.checked = time.monotonic()
+        arrays = self.arrays = bank_arrays(bank)
+        self.a = np.full(len(arrays.ids), DEFAULT_A)
+        self.b = np.zeros(len(arrays.ids))
+        if params:
+            q_ids, a, b, n = (np.array(col) for col in zip(*params))
+            items = self.items(q_ids)
+            use = (items >= 0) & (n >= MIN_RESPONSES)
+            self.a[items[use]] = a[use]
+            self.b[items[use]] = b[use]
+        # subject -> [(رمز القسم، أرقام البنود، a، b)]؛ الأسئلة بلا إجابة صحيحة لا تدخل الاختيار
+        self.sections = {}
+        for (subject, _), pool in bank.pools.items():
+            items = arrays.lookup[np.frombuffer(pool, dtype=np.int64)]
+            items = items[arrays.key[items] >= 0]
+            if len(items):
+                self.sections.setdefault(subject, []).append(
+                    (int(arrays.sections[items[0]]), items, self.a[items], self.b[items]))
+
+    def items(self, question_ids):
+        ids = np.asarray(question_ids, dtype=np.int64)
+        lookup = self.arrays.lookup
+        return lookup[np.clip(ids, 0, len(lookup) - 1)]
+
+    def estimate(self, question_ids, answers):
+        """(θ، الخطأ المعياري) من الأسئلة المُجاب عنها؛ (0، 1) تقريباً قبل أي إجابة."""
+        items = self.items(question_ids)
+        answers = np.asarray(answers, dtype=np.int8)[:len(items)]
+        used = (items >= 0) & (answers >= 0)
+        items, answers = items[used], answers[used]
+        correct = answers == self.arrays.key[items]
+        p = np.clip(probability(self.a[items, None], self.b[items, None], GRID), 1e-9, 1 - 1e-9)
+        log_like = LOG_PRIOR + np.where(correct[:, None], np.log(p), np.log1p(-p)).sum(axis=0)
+        weights = np.exp(log_like - log_like.max())
+        weights /= weights.sum()
+        theta = float(weights @ GRID)
+        return theta, float(np.sqrt(weights @ (GRID - theta) ** 2))
+
+    def next_item(self, subject, question_ids, theta, seed):
+        """معرّف السؤال التالي عند θ، أو None إذا نفدت أسئلة المادة."""
+        given = self.items(question_ids)
+        given = given[given >= 0]
+        counts = np.bincount(self.arrays.sections[given], minlength=len(self.arrays.section_names))
+        rng = random.Random(f'{seed}/{len(question_ids)}')
+        # توازن المحتوى كالامتحان الثابت: القسم الأقل أسئلة حتى الآن أولاً (التعادل بترتيب البنك)
+        for code, items, a, b in sorted(self.sections.get(subject, ()), key=lambda s: counts[s[0]]):
+            if counts[code]:
+                free = ~np.isin(items, given)
+                items, a, b = items[free], a[free], b[free]
+            if len(items):
+                return int(self.arrays.ids[select(items, a, b, theta, rng)])
+        return None
+
+    def step(self, subject, question_ids, answers, seed, max_items):
+        """تقدير القدرة من الإجابات ثم السؤال التالي: (q_id أو None عند التوقف، θ، الخطأ المعياري)."""
+        theta, se = self.estimate(question_ids, answers)
+        n = len(question_ids)
+        if n >= max_items or (n >= MIN_ITEMS and se <= TARGET_SE):
+            return None, theta, se
+        return self.next_item(subject, question_ids, theta, seed), theta, se
+
+    def replay(self, subject, question_ids, answers, seed, max_items):
+        """إعادة اختيار أسئلة محاولة تكيّفية من بذرتها وإجاباتها (للتحقق من إعادة البناء)؛ -1 حيث توقف الاختيار."""
+        picked = (self.step(subject, question_ids[:k], answers[:k], seed, max_items)[0] for k in range(len(question_ids)))
+        return array('q', (-1 if q_id is None else q_id for q_id in picked))
+
+    def expected_percent(self, subject, theta):
+        """النسبة المتوقعة لطالب بقدرة θ لو أجاب عن كل أسئلة المادة."""
+        sections = self.sections.get(subject)
+        if not sections:
+            return 0.0
+        total = sum(float(probability(a, b, theta).sum()) for _, _, a, b in sections)
+        return total / sum(len(items) for _, items, _, _ in sections) * 100
+
+
+def calibration_version(conn):
+    return conn.execute('SELECT version FROM Calibration WHERE id = 0').fetchone()[0]
+
+_pools = {}
+_lock = threading.Lock()
+
+def get_item_pool(db_path=DB_NAME):
+    """معاملات البنود المشتركة، تُعاد بناؤها عند تغيّر البنك أو بعد معايرة جديدة."""
+    bank = get_bank(db_path)
+    pool = _pools.get(db_path)
+    if pool is not None and pool.bank is bank and time.monotonic() - pool.checked < CHECK_INTERVAL:
+        return pool
+    with _lock:
+        pool = _pools.get(db_path)
+        with read(db_path) as conn:
+            version = calibration_version(conn)
+            if pool is None or pool.bank is not bank or pool.version != version:
+                params = conn.execute('SELECT question_id, a, b, n FROM ItemParams').fetchall()
+                pool = _pools[db_path] = ItemPool(bank, version, params)
+        pool.checked = time.monotonic()
+    return pool
+
+# ==========================================
+# المعايرة (خارج الخادم)
+# ==========================================
+
+def fit(arrays, items, answers, rounds=CALIBRATION_ROUNDS):
+    """معايرة مشتركة (JMAP) على مصفوفتي scoring.encode: خطوات نيوتن متناوبة للقدرات ثم للبنود.
+
+    توزيعات مسبقة θ ~ N(0,1) و b ~ N(0,2²) و a ~ N(1,0.5²) تثبّت المقياس وتمنع التباعد
+    عند الإجابات الصحيحة (أو الخاطئة) بالكامل. يعيد (a, b, n) بطول بنود البنك.
+    """
+    present = items >= 0
+    n_rows, m = items.shape[0], len(arrays.ids)
+    rows = np.broadcast_to(np.arange(n_rows)[:, None], items.shape)[present]
+    item = items[present]
+    choice = answers[present]
+    y = ((choice >= 0) & (choice == arrays.key[item])).astype(np.float64)
+
+    n = np.bincount(item, minlength=m)
+    # البداية من الإحصاءات التقليدية: صعوبة من نسبة الإجابة الصحيحة، وقدرة من النسبة الكلية
+    p = (np.bincount(item, weights=y, minlength=m) + 0.5) / (n + 1)
+    b = np.log((1 - p) / p)
+    a = np.full(m, DEFAULT_A)
+    pct = (np.bincount(rows, weights=y, minlength=n_rows) + 0.5) / (np.bincount(rows, minlength=n_rows) + 1)
+    theta = np.log(pct / (1 - pct))
+    theta = (theta - theta.mean()) / (theta.std() or 1)
+
+    for _ in range(rounds):
+        a_at = a[item]
+        prob = probability(a_at, b[item], theta[rows])
+        grad = np.bincount(rows, weights=a_at * (y - prob), minlength=n_rows) - theta
+        hess = np.bincount(rows, weights=a_at * a_at * prob * (1 - prob), minlength=n_rows) + 1
+        theta = np.clip(theta + np.clip(grad / hess, -1, 1), -4, 4)
+
+        diff = theta[rows] - b[item]
+        prob = probability(a_at, b[item], theta[rows])
+        resid, w = y - prob, prob * (1 - prob)
+        grad_b = np.bincount(item, weights=-a_at * resid, minlength=m) - b / 4
+        hess_b = np.bincount(item, weights=a_at * a_at * w, minlength=m) + 1 / 4
+        grad_a = np.bincount(item, weights=diff * resid, minlength=m) - (a - 1) / 0.25
+        hess_a = np.bincount(item, weights=diff * diff * w, minlength=m) + 4
+        b = np.clip(b + np.clip(grad_b / hess_b, -1, 1), -4, 4)
+        a = np.clip(a + np.clip(grad_a / hess_a, -0.5, 0.5), 0.2, 3)
+    return a, b, n
+
+def calibrate(db_path=DB_NAME):
+    """معايرة معاملات كل البنود من المحاولات المنتهية وحفظها في ItemParams.
+
+    يعيد (عدد البنود التي ظهرت، عدد البنود المعتمدة بـ MIN_RESPONSES إجابة على الأقل).
+    """
+    from attempts import finished_attempts  # attempts يستورد هذه الوحدة لإنشاء المحاولات التكيّفية
+    bank = get_bank(db_path)
+    arrays = bank_arrays(bank)
+    attempts = finished_attempts(None, db_path)
+    if not attempts:
+        return 0, 0
+    a, b, n = fit(arrays, *encode(arrays, [(q_ids, answers) for *_, q_ids, answers in attempts]))
+    seen = n > 0
+    with write(db_path) as conn:
+        conn.execute('DELETE FROM ItemParams')
+        conn.executemany(
+            'INSERT INTO ItemParams (question_id, a, b, n) VALUES (?, ?, ?, ?)',
+            zip(arrays.ids[seen].tolist(), a[seen].tolist(), b[seen].tolist(), n[seen].tolist())
+        )
+        conn.execute('UPDATE Calibration SET version = version + 1, calibrated_at = ? WHERE id = 0', (time.time(),))
+    return int(seen.sum()), int((n >= MIN_RESPONSES).sum())
+
+if __name__ == "__main__":
+    # python adaptive.py [قاعدة.db]
+    seen, calibrated = calibrate(sys.argv[1] if len(sys.argv) > 1 else DB_NAME)
+    print(f"تمت المعايرة: {seen} بند ظهر في المحاولات، منها {calibrated} بإجابات كافية "
+          f"(≥ {MIN_RESPONSES}) لاعتماد معاملاته.")
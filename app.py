@@ -1,227 +1,184 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import sqlite3
+import json
+import os
 import time
 import math
-
-DB_NAME = "exam_simulator.db"
+from array import array
+from functools import lru_cache
+from assets import favicon, logo
+from theme import THEMES, exam_css, main_css
+from db import DB_NAME
+from question_bank import get_bank
+from scoring import score_attempt
+from exam_generator import displayed_options
+from attempts import (attempt_status, closed_here, create_attempt, load_attempt, new_session, record_answer,
+                      record_finish, record_items, record_position, record_review, session_attempt)
+from practice import PRACTICE_SIZE, due_questions, due_summary
+from adaptive import get_item_pool
+from deadlines import get_scheduler, schedule_deadline
+from exam_pool import get_exam_pool
+from metrics import timed
 
 # ==========================================
 # 1. تهيئة قاعدة البيانات والأسئلة
 # ==========================================
 
-def init_db():
-    with sqlite3.connect(DB_NAME) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                subject TEXT,
-                section TEXT DEFAULT 'عام',
-                passage_text TEXT DEFAULT '',
-                question_text TEXT,
-                option_a TEXT,
-                option_b TEXT,
-                option_c TEXT,
-                option_d TEXT,
-                correct_option TEXT
-            )
-        ''')
-        conn.commit()
-
-def get_balanced_questions(subject, total_limit):
-    with sqlite3.connect(DB_NAME) as conn:
-        cursor = conn.cursor()
-        # جلب الأقسام المتاحة ديناميكياً من قاعدة البيانات
-        cursor.execute('SELECT DISTINCT section FROM Questions WHERE subject=?', (subject,))
-        sections = [r[0] for r in cursor.fetchall()]
-        if not sections:
-            return []
-        q_per = total_limit // len(sections)
-        rem = total_limit % len(sections)
-        qs = []
-        selected_ids = set()
-        # الجولة الأولى: توزيع متوازن على الأقسام
-        for i, sec in enumerate(sections):
-            limit = q_per + (1 if i < rem else 0)
-            if selected_ids:
-                placeholders = ','.join('?' * len(selected_ids))
-                cursor.execute(f'SELECT * FROM Questions WHERE subject=? AND section=? AND id NOT IN ({placeholders}) ORDER BY RANDOM() LIMIT ?', (subject, sec, *selected_ids, limit))
-            else:
-                cursor.execute('SELECT * FROM Questions WHERE subject=? AND section=? ORDER BY RANDOM() LIMIT ?', (subject, sec, limit))
-            rows = cursor.fetchall()
-            for r in rows:
-                selected_ids.add(r[0])
-            qs.extend(rows)
-        # جولة التعويض: إذا لم يكتمل العدد المطلوب، نجلب أسئلة إضافية من أي قسم
-        deficit = total_limit - len(qs)
-        if deficit > 0 and selected_ids:
-            placeholders = ','.join('?' * len(selected_ids))
-            cursor.execute(f'SELECT * FROM Questions WHERE subject=? AND id NOT IN ({placeholders}) ORDER BY RANDOM() LIMIT ?', (subject, *selected_ids, deficit))
-            qs.extend(cursor.fetchall())
-    return qs
-
-def save_answer(q_id):
-    st.session_state.user_answers[q_id] = st.session_state[f"q_{q_id}"]
+def get_question(q_id):
+    return get_bank(DB_NAME).get(q_id)
+
+@lru_cache(maxsize=256)
+def passage_html(passage_id):
+    # HTML القطعة يُبنى مرة واحدة لكل قطعة؛ ألوانها وتنسيقها في exam_css (.vx-passage) الذي يُرسل
+    # مرة واحدة مع الصفحة، فلا يتكرر مع النص في كل إعادة تشغيل لجزء السؤال
+    text = get_bank(DB_NAME).passage(passage_id)
+    return f'<div class="vx-passage">{text}</div>'
+
+def passage_span(questions, idx, passage_id):
+    # حدود مجموعة الأسئلة المتتالية التي تشترك في نفس القطعة
+    first = last = idx
+    while first > 0 and get_question(questions[first - 1])[3] == passage_id: first -= 1
+    while last < len(questions) - 1 and get_question(questions[last + 1])[3] == passage_id: last += 1
+    return first, last
+
+def save_answer(pos, q_id):
+    # الإجابة تُحفظ كرقم الخيار (0-3) في مصفوفة مرتبة حسب موضع السؤال
+    ans = st.session_state[f"q_{q_id}"]
+    st.session_state.user_answers[pos] = ans
+    # وتُرسل إلى طابور الكتابة المؤجلة دون انتظار القرص
+    record_answer(st.session_state.attempt_id, pos, q_id, ans)
 
 def finish_exam():
     if st.session_state.get('phase') == 'results': return
-    score = 0
-    incorrect = []
-    for q in st.session_state.questions:
-        q_id, q_txt, correct, sec = q[0], q[4], q[9], q[2]
-        ans = st.session_state.user_answers.get(q_id)
-        if ans == correct: score += 1
-        else: incorrect.append({'sec': sec, 'q': q_txt, 'user': ans if ans else "لم يجب", 'right': correct})
-    st.session_state.update({'raw_score': score, 'incorrect_answers': incorrect, 'phase': 'results'})
+    score, incorrect, sections = score_attempt(get_bank(DB_NAME), st.session_state.questions, st.session_state.user_answers)
+    st.session_state.update({'raw_score': score, 'incorrect_answers': incorrect, 'section_scores': sections, 'phase': 'results'})
+    if st.session_state.get('mode') == 'adaptive':
+        # النتيجة في الامتحان التكيّفي تقدير القدرة، وتُعرض كنسبة متوقعة على أسئلة المادة كلها
+        items = get_item_pool(DB_NAME)
+        theta, se = items.estimate(st.session_state.questions, st.session_state.user_answers)
+        st.session_state.update({'theta': theta, 'se': se, 'expected_pct': items.expected_percent(st.session_state.subject, theta)})
+    record_finish(st.session_state.attempt_id, score)
+
+def resume_exam(name, attempt_id):
+    attempt = load_attempt(attempt_id, name.strip())
+    if attempt is None: return st.error("لا توجد محاولة بهذا الاسم والرقم.")
+    open_attempt(attempt)
+    bind_session()
+    st.rerun()
+
+def restore_session(token):
+    # جلسة جديدة في هذه العملية لامتحان بدأ في عملية أخرى (serve.py) أو قبل إعادة تشغيل الخادم
+    restored = session_attempt(token)
+    if restored is None:
+        # رمز غير معروف أو انتهت صلاحيته (expire_sessions): الرابط يبقى كما هو، والاستئناف
+        # بالاسم ورقم المحاولة متاح دائماً
+        st.warning("لا توجد جلسة بهذا الرابط (ربما انتهت صلاحيتها). استأنف امتحانك بالاسم ورقم المحاولة.")
+        return
+    attempt, position = restored
+    active = attempt['status'] == 'active'
+    open_attempt(attempt, position)
+    st.session_state.session = token
+    if active:
+        schedule_deadline(st.session_state.attempt_id, st.session_state.end_time)
+
+def open_attempt(attempt, position=None):
+    status = attempt.pop('status')
+    del attempt['raw_score']
+    if attempt['mode'] == 'adaptive':
+        # الامتحان التكيّفي يُستأنف من آخر سؤال اختير؛ إذا كان مُجاباً يُختار التالي
+        st.session_state.update(attempt, current_q_index=len(attempt['questions']) - 1, phase='exam')
+        if status != 'finished' and attempt['user_answers'][-1] >= 0:
+            adaptive_next()
+    else:
+        # الاستئناف من الموضع المحفوظ للجلسة، أو من أول سؤال لم تتم الإجابة عليه
+        if position is None:
+            position = next((i for i, a in enumerate(attempt['user_answers']) if a < 0), 0)
+        st.session_state.update(attempt, current_q_index=position, phase='exam')
+    if status == 'finished' or time.time() > attempt['end_time']:
+        finish_exam()
+
+def closed_elsewhere(check_db=False):
+    # المحاولة قد تُنهى خارج هذه الجلسة: جدولة المواعيد أو جلسة أخرى في هذه العملية (closed_here،
+    # دون استعلام، في كل إعادة تشغيل)، أو عملية خادم أخرى (check_db: عند الموعد النهائي فقط).
+    # عندها تُحذف حالة الامتحان المحلية وتُعرض النتيجة المحفوظة
+    attempt_id = st.session_state.attempt_id
+    if not closed_here(attempt_id) and not (check_db and attempt_status(attempt_id) != 'active'):
+        return False
+    attempt = load_attempt(st.session_state.attempt_id, st.session_state.student_name)
+    for key in [k for k in st.session_state if k.startswith('q_') or k == 'nav_map']:
+        del st.session_state[key]
+    if attempt is None:
+        st.session_state.clear()
+        st.query_params.clear()
+    else:
+        open_attempt(attempt)
+    return True
+
+def bind_session():
+    # رمز الجلسة في رابط الصفحة: إعادة الاتصال بأي عملية خادم تستأنف نفس الامتحان
+    token = new_session(st.session_state.attempt_id, st.session_state.current_q_index)
+    st.session_state.session = token
+    st.query_params['s'] = token
+
+def adaptive_next():
+    # تُعتمد إجابة السؤال الحالي، ثم يُقدَّر المستوى ويُختار السؤال التالي أو يُنهى الامتحان
+    state = st.session_state
+    q_id, _, _ = get_item_pool(DB_NAME).step(state.subject, state.questions, state.user_answers, state.seed, state.max_items)
+    if q_id is None:
+        return finish_exam()
+    state.questions.append(q_id)
+    state.user_answers.append(-1)
+    state.current_q_index = len(state.questions) - 1
+    record_items(state.attempt_id, state.questions)
+    if 'session' in state:
+        record_position(state.session, state.current_q_index)
 
 # ==========================================
 # 2. الحل الهندسي للمؤقت والواجهة (CSS & JS)
 # ==========================================
+# الألوان و CSS الوضعين في theme.py (تستخدمها صفحات pages/ أيضاً)
 
-def inject_exam_engine(end_ts):
+def inject_exam_engine():
     dark = st.session_state.get('dark_mode', True)
-    radio_bg = "#1a1a1b" if dark else "#f0f2f6"
-    radio_border = "#3e3e42" if dark else "#dee2e6"
-    radio_text = "white" if dark else "#1a1a2e"
-    sel_bg = "#2d1616" if dark else "#ffe0e0"
     # CSS فقط عبر st.markdown — يعمل بشكل طبيعي
-    st.markdown(f"""
-        <style>
-        /* اتجاه النص من اليمين لليسار */
-        .main .block-container {{
-            direction: rtl;
-            text-align: right;
-        }}
-        /* إخفاء دوائر الراديو */
-        div[role="radiogroup"] > label > div:first-child {{ display: none !important; }}
-        div[role="radiogroup"] svg {{ display: none !important; }}
-        div[role="radiogroup"] > label > div:first-of-type {{
-            display: none !important; width: 0 !important; height: 0 !important;
-            overflow: hidden !important; margin: 0 !important; padding: 0 !important;
-        }}
-        [data-testid="stRadio"] [role="radiogroup"] label > div:first-of-type {{ display: none !important; }}
-
-        /* تحويل الخيارات إلى بطاقات */
-        div[role="radiogroup"] > label {{
-            background-color: {radio_bg} !important;
-            border: 1px solid {radio_border} !important;
-            padding: 15px 25px !important;
-            border-radius: 10px !important;
-            margin-bottom: 8px !important;
-            width: 100% !important;
-            cursor: pointer !important;
-            color: {radio_text} !important;
-            display: block !important;
-            direction: rtl !important;
-            text-align: right !important;
-        }}
-        div[role="radiogroup"] > label[aria-checked="true"] {{
-            border: 2px solid #ff4b4b !important;
-            background-color: {sel_bg} !important;
-            box-shadow: 0 4px 12px rgba(255, 75, 75, 0.4) !important;
-        }}
-        </style>
-    """, unsafe_allow_html=True)
+    st.markdown(exam_css(dark), unsafe_allow_html=True)
+
+@lru_cache(maxsize=1)
+def client_source():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'exam_client.js'), encoding='utf-8') as f:
+        return f.read()
 
-    # المؤقت + تمييز الإجابات عبر components.html
-    components.html(f"""
+@lru_cache(maxsize=64)
+def client_html(end_ts, dark):
+    # عميل واحد ثابت (المؤقت + تمييز الخيارات + أسماء الصفحات) يُثبَّت مرة واحدة في الصفحة الأم.
+    # محتوى الـ iframe لا يتغير إلا بتغير (موعد الانتهاء، الوضع)، فلا يُعاد تحميله مع كل إعادة تشغيل
+    t = THEMES[dark]
+    cfg = {'endTs': end_ts, 'colors': {'radio_bg': t['radio_bg'], 'radio_border': t['radio_border'], 'sel_bg': t['selected_bg']}}
+    source = json.dumps(client_source()).replace('</', '<\\/')
+    return f"""
     <script>
     (function() {{
-        var pd = window.parent.document;
-        var ps = window.parent.sessionStorage;
-        var KEY = 'vexsam_end';
-        var serverEnd = {end_ts} * 1000;
-
-        var stored = parseInt(ps.getItem(KEY) || '0');
-        if (serverEnd > stored) ps.setItem(KEY, serverEnd);
-        var endTime = parseInt(ps.getItem(KEY));
-
-        // إنشاء div المؤقت في صفحة الأب إن لم يكن موجوداً
-        var el = pd.getElementById('_vex_timer_');
-        if (!el) {{
-            el = pd.createElement('div');
-            el.id = '_vex_timer_';
-            el.style.cssText = [
-                'position:fixed', 'top:85px', 'right:25px', 'z-index:999999',
-                'background:#ff4b4b', 'color:white', 'padding:12px 20px',
-                'border-radius:8px', 'font-weight:bold', 'font-family:monospace',
-                'font-size:26px', 'border:2px solid white',
-                'box-shadow:0 6px 20px rgba(0,0,0,0.5)',
-                'min-width:110px', 'text-align:center'
-            ].join(';');
-            pd.body.appendChild(el);
+        var w = window.parent;
+        if (!w.__vexsam) {{
+            var s = w.document.createElement('script');
+            s.id = 'vexsam-client';
+            s.textContent = {source};
+            w.document.head.appendChild(s);
         }}
-
-        // ── تمييز الخيار المحدد بلون أحمر ────────────────────────────
-        function highlightRadio() {{
-            var labels = pd.querySelectorAll('div[role="radiogroup"] > label');
-            for (var i = 0; i < labels.length; i++) {{
-                var lbl = labels[i];
-                var inp = lbl.querySelector('input[type="radio"]');
-                if (inp && inp.checked) {{
-                    lbl.style.border          = '2px solid #ff4b4b';
-                    lbl.style.backgroundColor = '{sel_bg}';
-                    lbl.style.boxShadow       = '0 4px 12px rgba(255,75,75,0.4)';
-                }} else {{
-                    lbl.style.border          = '1px solid {radio_border}';
-                    lbl.style.backgroundColor = '{radio_bg}';
-                    lbl.style.boxShadow       = 'none';
-                }}
-            }}
-        }}
-        if (window._hl) clearInterval(window._hl);
-        window._hl = setInterval(highlightRadio, 200);
-
-        // ── المؤقت ───────────────────────────────────────────────────
-        function tick() {{
-            var e = pd.getElementById('_vex_timer_');
-            if (!e) return;
-            var rem = endTime - Date.now();
-            if (rem <= 0) {{
-                e.textContent = '00:00';
-                ps.removeItem(KEY);
-                clearInterval(window._vt);
-                var btns = pd.querySelectorAll('button');
-                for (var i = 0; i < btns.length; i++) {{
-                    if (btns[i].innerText.includes('\u0625\u0646\u0647\u0627\u0621') ||
-                        btns[i].innerText.includes('\u062a\u0633\u0644\u064a\u0645')) {{
-                        btns[i].click(); break;
-                    }}
-                }}
-                return;
-            }}
-            var m = Math.floor(rem / 60000);
-            var s = Math.floor((rem % 60000) / 1000);
-            e.textContent =
-                (m < 10 ? '0' : '') + m + ':' + (s < 10 ? '0' : '') + s;
-        }}
-        if (window._vt) clearInterval(window._vt);
-        window._vt = setInterval(tick, 500);
-        tick();
+        w.__vexsam.configure({json.dumps(cfg)});
     }})();
     </script>
-    """, height=0)
+    """
 
 # ==========================================
 # 3. مراحل التطبيق
 # ==========================================
 
+@timed('phase_setup')
 def phase_setup():
-    # مسح المؤقت من صفحة الأب ومن sessionStorage بشكل فعلي
-    components.html("""
-    <script>
-    (function() {
-        window.parent.sessionStorage.removeItem('vexsam_end');
-        var el = window.parent.document.getElementById('_vex_timer_');
-        if (el) el.remove();
-        if (window.parent._vt) { clearInterval(window.parent._vt); window.parent._vt = null; }
-    })();
-    </script>
-    """, height=0)
     col1, col2, col3 = st.columns([2, 1, 2])
     with col2:
-        st.image("logo.png", width=300)
+        st.image(logo(300), width=300)
     st.markdown("""
         <div style="text-align:center; padding:0 0 10px;">
             <h1 style="
@@ -244,185 +201,254 @@ def phase_setup():
         c3, c4 = st.columns(2)
         sub = c3.selectbox("المادة:", ['اللغة الإنجليزية', 'اللغة العربية', 'الحاسوب'])
         num = c4.selectbox("الأسئلة:", [20, 40, 60, 80, 100])
+        mode = st.radio("نوع الامتحان:", ['ثابت', 'تكيّفي', 'مراجعة'], horizontal=True)
+        if mode == 'تكيّفي':
+            st.caption("كل سؤال يُختار حسب إجاباتك السابقة، وينتهي الامتحان عندما يُحدَّد مستواك بدقة كافية "
+                       "(عدد الأسئلة المختار هو الحد الأقصى). لا يمكن الرجوع إلى سؤال سابق.")
+        elif mode == 'مراجعة':
+            st.caption(f"مراجعة متباعدة للأسئلة التي أخطأت فيها سابقاً: حتى {PRACTICE_SIZE} سؤالاً مستحقاً اليوم، "
+                       "مع تصحيح فوري. كل سؤال يعود بعد فترة تطول كلما أجبت عنه صحيحاً.")
     
-    if st.button("بدء الامتحان", type="primary", use_container_width=True):
+    if mode == 'مراجعة':
+        if st.button("بدء المراجعة", type="primary", use_container_width=True):
+            if not name: return st.error("أدخل الاسم.")
+            start_practice(name.strip(), sub)
+    elif st.button("بدء الامتحان", type="primary", use_container_width=True):
         if not name: return st.error("أدخل الاسم.")
-        qs = get_balanced_questions(sub, num)
-        if not qs: return st.error("قاعدة البيانات فارغة.")
+        name = name.strip()
+        end_time = time.time() + 3600
+        # الأسئلة وترتيب الخيارات تُولَّد من بذرة (الطالب، رقم المحاولة) ويمكن إعادة بنائها لاحقاً
+        # عند توفر امتحان جاهز في المجمع يكون البدء سحباً من طابور دون أي توليد
+        adaptive = mode == 'تكيّفي'
+        exam = None if adaptive else get_exam_pool(DB_NAME).take(sub, num)
+        created = create_attempt(name, sub, p_mark, num, end_time, exam=exam, adaptive=adaptive)
+        if created is None: return st.error("قاعدة البيانات فارغة.")
+        attempt_id, seed, qs = created
         st.session_state.update({
             'student_name': name, 'pass_mark': p_mark, 'subject': sub, 
-            'questions': qs, 'current_q_index': 0, 'user_answers': {}, 
-            'phase': 'exam', 'end_time': time.time() + 3600
+            'questions': qs, 'current_q_index': 0, 'user_answers': array('b', [-1] * len(qs)), 
+            'phase': 'exam', 'end_time': end_time, 'attempt_id': attempt_id, 'seed': seed,
+            'mode': 'adaptive' if adaptive else 'fixed', 'max_items': num,
         })
+        # الخادم يسلّم المحاولة عند انتهاء وقتها حتى لو أُغلق المتصفح
+        schedule_deadline(st.session_state.attempt_id, end_time)
+        bind_session()
         st.rerun()
 
+    with st.expander("استئناف امتحان سابق"):
+        r1, r2 = st.columns([2, 1])
+        r_name = r1.text_input("اسم الطالب:", key="resume_name")
+        r_id = r2.number_input("رقم المحاولة:", min_value=1, step=1, key="resume_id")
+        if st.button("استئناف", use_container_width=True):
+            resume_exam(r_name, int(r_id))
+
+def start_practice(name, sub):
+    qs = due_questions(name, sub)
+    if not qs:
+        _, total, upcoming = due_summary(name, sub)
+        if not total:
+            return st.info("لا توجد أسئلة للمراجعة بعد: الأسئلة التي تخطئ فيها في الامتحانات تُضاف هنا.")
+        days = math.ceil((upcoming - time.time()) / 86400)
+        return st.info(f"لا توجد أسئلة مستحقة الآن ({total} سؤالاً في جدولك). أقرب مراجعة بعد {days} يوم.")
+    st.session_state.update({
+        'student_name': name, 'subject': sub, 'questions': array('q', qs), 'current_q_index': 0,
+        'user_answers': array('b', [-1] * len(qs)), 'phase': 'practice',
+    })
+    st.rerun()
+
+def check_practice(pos, q_id):
+    # التصحيح فوري، والنتيجة تُرسل إلى جدول المراجعة عبر طابور الكتابة
+    ans = st.session_state[f"p_{q_id}"]
+    if ans is None: return
+    st.session_state.user_answers[pos] = ans
+    record_review(st.session_state.student_name, st.session_state.subject, q_id, ans == get_question(q_id)[9])
+
+def go_to(i):
+    st.session_state.current_q_index = i
+    if 'session' in st.session_state:
+        record_position(st.session_state.session, i)
+
+def nav_from_map():
+    # النقر على السؤال المحدد أصلاً يلغي التحديد في pills؛ نتجاهل ذلك
+    if st.session_state.nav_map is not None:
+        go_to(st.session_state.nav_map)
+
+@timed('phase_exam')
 def phase_exam():
-    dark = st.session_state.get('dark_mode', True)
-    txt_color = '#ffffff' if dark else '#1a1a2e'
-    passage_color = '#e0e0e0' if dark else '#333'
-    passage_bg = 'rgba(255,193,7,0.1)' if dark else 'rgba(255,193,7,0.15)'
     # التحقق من الوقت في السيرفر
     if time.time() > st.session_state.end_time:
         finish_exam()
         st.rerun()
 
-    inject_exam_engine(st.session_state.end_time)
-    
+    inject_exam_engine()
+    # مراقبة الموعد النهائي: جزء يُعاد تشغيله تلقائياً عند انتهاء الوقت وينقل الطالب للنتيجة
+    # (بديل عن نقر زر التسليم من JavaScript)
+    remaining = st.session_state.end_time - time.time()
+    st.fragment(deadline_watch, run_every=max(1, math.ceil(remaining) + 1))()
+
+    # Sidebar
+    st.sidebar.title("خريطة الأسئلة")
+    st.sidebar.caption(f"الطالب: {st.session_state.student_name} — رقم المحاولة: {st.session_state.attempt_id}")
+    exam_view()
+
+def deadline_watch():
+    if st.session_state.phase == 'exam' and time.time() > st.session_state.end_time:
+        if not closed_elsewhere(check_db=True):
+            finish_exam()
+        st.rerun(scope="app")
+
+@st.fragment
+@timed('exam_view')
+def exam_view():
+    # كل تفاعلات الامتحان (إجابة، تنقل، خريطة) تعيد تشغيل هذا الجزء فقط؛
+    # CSS والمؤقت والترويسة تبقى في الصفحة ولا يُعاد إرسالها
+    if st.session_state.phase != 'exam' or time.time() > st.session_state.end_time:
+        finish_exam()
+        st.rerun(scope="app")
+    if closed_elsewhere():
+        st.rerun(scope="app")
+
+    dark = st.session_state.get('dark_mode', True)
+    txt_color = '#ffffff' if dark else '#1a1a2e'
     idx = st.session_state.current_q_index
+    answers = st.session_state.user_answers
     total = len(st.session_state.questions)
-    q = st.session_state.questions[idx]
+    q = get_question(st.session_state.questions[idx])
     
-    q_id, sec, passage, txt = q[0], q[2], q[3], q[4]
+    q_id, sec, passage_id, txt = q[0], q[2], q[3], q[4]
     opts = [q[5], q[6], q[7], q[8]]
 
-    # Sidebar
-    st.sidebar.title("خريطة الأسئلة")
-    st.sidebar.caption(f"الطالب: {st.session_state.student_name}")
-    cols = st.sidebar.columns(4)
-    for i in range(total):
-        is_ans = st.session_state.questions[i][0] in st.session_state.user_answers
-        if cols[i%4].button(f"{'✅' if is_ans else ''}{i+1}", key=f"nav_{i}", type="primary" if i == idx else "secondary"):
-            st.session_state.current_q_index = i
-            st.rerun()
-            
-    if st.sidebar.button("تسليم الامتحان", type="primary", use_container_width=True):
-        finish_exam()
-        st.rerun()
+    adaptive = st.session_state.get('mode') == 'adaptive'
+    # ترتيب الخيارات يُحسب لطول الامتحان الأقصى: في التكيّفي يزداد عدد الأسئلة أثناء الامتحان
+    n_order = st.session_state.max_items if adaptive else total
+
+    if adaptive:
+        st.sidebar.caption(f"أُجيب عن {sum(a >= 0 for a in answers)} سؤال — الحد الأقصى {n_order}")
+    else:
+        # خريطة الأسئلة: عنصر واحد بدلاً من زر لكل سؤال، وحالة الإجابة قراءة مباشرة من المصفوفة
+        st.session_state.nav_map = idx
+        st.sidebar.pills("خريطة الأسئلة", range(total), format_func=lambda i: f"{'✅' if answers[i] >= 0 else ''}{i+1}",
+                         key="nav_map", on_change=nav_from_map, label_visibility="collapsed")
+    st.sidebar.button("تسليم الامتحان", type="primary", use_container_width=True, on_click=finish_exam)
 
     # Main Area
     st.caption(f"القسم: {sec}")
-    st.subheader(f"سؤال {idx + 1} من {total}")
-    if passage:
-        st.markdown(f'<div style="background:{passage_bg}; border-right:5px solid #ffc107; padding:20px; border-radius:8px; direction:ltr; text-align:left; margin-bottom:20px; color:{passage_color};">{passage}</div>', unsafe_allow_html=True)
+    st.subheader(f"سؤال {idx + 1} (بحد أقصى {n_order})" if adaptive else f"سؤال {idx + 1} من {total}")
+    if passage_id is not None:
+        first, last = passage_span(st.session_state.questions, idx, passage_id)
+        if last > first:
+            st.caption(f"اقرأ النص التالي ثم أجب عن الأسئلة {first + 1}–{last + 1}")
+        st.markdown(passage_html(passage_id), unsafe_allow_html=True)
 
     dir_css = "ltr" if st.session_state.subject == 'اللغة الإنجليزية' else "rtl"
     st.markdown(f"<div style='direction:{dir_css}; text-align:right; font-size:22px; margin-bottom:20px; color:{txt_color};'><b>{txt}</b></div>", unsafe_allow_html=True)
 
-    ans = st.session_state.user_answers.get(q_id)
-    st.radio("Options", opts, index=opts.index(ans) if ans in opts else None, key=f"q_{q_id}", on_change=save_answer, args=(q_id,), label_visibility="collapsed")
+    ans = answers[idx]
+    # الخيارات بترتيب البذرة؛ قيمة الاختيار تبقى رقم الخيار الأصلي
+    shown = list(displayed_options(st.session_state.get('seed'), n_order, idx))
+    st.radio("Options", shown, format_func=opts.__getitem__, index=shown.index(ans) if ans >= 0 else None, key=f"q_{q_id}", on_change=save_answer, args=(idx, q_id), label_visibility="collapsed")
 
     st.divider()
+    # التنقل عبر on_click: الحالة تتغير قبل إعادة التشغيل فلا نحتاج st.rerun إضافياً
     c1, _, c3 = st.columns([1, 1, 1])
-    if idx > 0 and c1.button("السابق", use_container_width=True):
-        st.session_state.current_q_index -= 1
-        st.rerun()
+    if adaptive:
+        # لا رجوع في الامتحان التكيّفي: السؤال التالي يعتمد على هذه الإجابة
+        c3.button("التالي", type="primary", use_container_width=True, on_click=adaptive_next, disabled=ans < 0)
+        return
+    if idx > 0:
+        c1.button("السابق", use_container_width=True, on_click=go_to, args=(idx - 1,))
     if idx < total - 1:
-        if c3.button("التالي", type="primary", use_container_width=True):
-            st.session_state.current_q_index += 1
-            st.rerun()
+        c3.button("التالي", type="primary", use_container_width=True, on_click=go_to, args=(idx + 1,))
     else:
-        if c3.button("إنهاء وتسليم", type="primary", use_container_width=True):
-            finish_exam()
+        c3.button("إنهاء وتسليم", type="primary", use_container_width=True, on_click=finish_exam)
+
+@timed('phase_practice')
+def phase_practice():
+    inject_exam_engine()
+    state = st.session_state
+    idx, total = state.current_q_index, len(state.questions)
+    st.sidebar.caption(f"مراجعة: {state.student_name} — {state.subject}")
+    if idx >= total:
+        right = sum(a == get_question(q_id)[9] for q_id, a in zip(state.questions, state.user_answers))
+        st.title("انتهت المراجعة")
+        st.metric("إجابات صحيحة", f"{right} / {total}")
+        due, _, _ = due_summary(state.student_name, state.subject)
+        st.caption(f"الأسئلة الخاطئة ستعود غداً، والصحيحة بعد فترة أطول. المستحق الآن: {due}.")
+        if st.button("العودة", type="primary"):
+            st.session_state.clear()
             st.rerun()
+        return
+
+    q = get_question(state.questions[idx])
+    q_id, passage_id = q[0], q[3]
+    st.caption(f"القسم: {q[2]}")
+    st.subheader(f"مراجعة {idx + 1} من {total}")
+    if passage_id is not None:
+        st.markdown(passage_html(passage_id), unsafe_allow_html=True)
+    dir_css = "ltr" if state.subject == 'اللغة الإنجليزية' else "rtl"
+    st.markdown(f"<div style='direction:{dir_css}; text-align:right; font-size:22px; margin-bottom:20px;'><b>{q[4]}</b></div>", unsafe_allow_html=True)
+
+    ans = state.user_answers[idx]
+    st.radio("Options", range(4), format_func=q[5:9].__getitem__, index=ans if ans >= 0 else None,
+             key=f"p_{q_id}", disabled=ans >= 0, label_visibility="collapsed")
+    if ans < 0:
+        st.button("تحقق", type="primary", on_click=check_practice, args=(idx, q_id))
+        return
+    if ans == q[9]:
+        st.success("إجابة صحيحة")
+    else:
+        st.error(f"الصحيحة: {q[5 + q[9]] if q[9] is not None else '—'}")
+    st.button("التالي" if idx < total - 1 else "إنهاء المراجعة", type="primary", on_click=go_to, args=(idx + 1,))
 
+@timed('phase_results')
 def phase_results():
     st.title("النتيجة النهائية")
-    pct = (st.session_state.raw_score / len(st.session_state.questions)) * 100
+    adaptive = st.session_state.get('mode') == 'adaptive'
+    if adaptive:
+        pct = st.session_state.expected_pct
+    else:
+        pct = (st.session_state.raw_score / len(st.session_state.questions)) * 100
     st.metric(st.session_state.student_name, f"{pct:.2f} %")
+    if adaptive:
+        st.caption(f"امتحان تكيّفي: {len(st.session_state.questions)} سؤال، {st.session_state.raw_score} إجابة صحيحة. "
+                   f"المستوى المقدَّر θ = {st.session_state.theta:.2f} ± {st.session_state.se:.2f}؛ "
+                   f"النسبة هي الدرجة المتوقعة لو أُجيب عن كل أسئلة المادة.")
     if pct >= st.session_state.pass_mark: st.success("اجتياز")
     else: st.error("إخفاق")
+
+    # الدرجة حسب القسم
+    sections = st.session_state.get('section_scores', {})
+    if sections:
+        cols = st.columns(min(len(sections), 4))
+        for i, (sec, (right, total)) in enumerate(sections.items()):
+            cols[i % len(cols)].metric(sec, f"{right} / {total}")
     
-    for idx, e in enumerate(st.session_state.incorrect_answers, 1):
-        with st.expander(f"خطأ {idx}: {e['q']}"):
-            st.error(f"إجابتك: {e['user']}")
-            st.success(f"الصحيحة: {e['right']}")
+    if st.session_state.incorrect_answers:
+        st.caption("الأسئلة الخاطئة أُضيفت إلى جدول مراجعتك: اختر \"مراجعة\" في صفحة البداية لتكرارها على فترات متباعدة.")
+    for idx, (q_id, ans) in enumerate(st.session_state.incorrect_answers, 1):
+        q = get_question(q_id)
+        with st.expander(f"خطأ {idx}: {q[4]}"):
+            st.error(f"إجابتك: {q[5 + ans] if ans >= 0 else 'لم يجب'}")
+            st.success(f"الصحيحة: {q[5 + q[9]] if q[9] is not None else '—'}")
     
     if st.button("امتحان جديد"):
         st.session_state.clear()
+        st.query_params.clear()
         st.rerun()
 
+@timed('main')
 def main():
-    st.set_page_config(page_title="الامتحان الوطني الافتراضي", page_icon="📝", layout="wide")
+    st.set_page_config(page_title="الامتحان الوطني الافتراضي", page_icon=favicon("📝"), layout="wide")
+    # تشغيل جدولة المواعيد مرة واحدة لكل عملية؛ تستعيد المحاولات النشطة بعد إعادة تشغيل الخادم
+    get_scheduler(DB_NAME)
+    get_exam_pool(DB_NAME)
     
     # تهيئة الوضع (داكن افتراضياً)
     if 'dark_mode' not in st.session_state:
         st.session_state.dark_mode = True
 
-    # ألوان الوضع الداكن والفاتح
-    if st.session_state.dark_mode:
-        bg = "#0e1117"; card_bg = "#1a1a1b"; border = "#3e3e42"
-        text = "#ffffff"; text2 = "#e0e0e0"; muted = "#888"
-        selected_bg = "#2d1616"; sidebar_bg = "#0e1117"; sidebar_text = "#ffffff"
-        radio_bg = "#1a1a1b"; radio_text = "white"
-    else:
-        bg = "#ffffff"; card_bg = "#f8f9fa"; border = "#dee2e6"
-        text = "#1a1a2e"; text2 = "#333333"; muted = "#666"
-        selected_bg = "#ffe0e0"; sidebar_bg = "#f0f2f6"; sidebar_text = "#1a1a2e"
-        radio_bg = "#f0f2f6"; radio_text = "#1a1a2e"
-
     # CSS الرئيسي مع دعم الوضعين
-    st.markdown(f"""
-    <style>
-    /* القائمة الجانبية RTL */
-    [data-testid="stSidebar"] {{
-        direction: rtl;
-        text-align: right;
-        background-color: {sidebar_bg} !important;
-    }}
-    [data-testid="stSidebar"] > div:first-child {{
-        background-color: {sidebar_bg} !important;
-    }}
-    [data-testid="stSidebar"] * {{
-        color: {sidebar_text} !important;
-    }}
-    [data-testid="stSidebar"] .stButton button {{
-        color: {sidebar_text} !important;
-        border-color: {border} !important;
-    }}
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] {{
-        direction: rtl;
-        padding-top: 15px;
-    }}
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a {{
-        direction: rtl;
-        text-align: right;
-        font-size: 16px !important;
-        font-weight: 600 !important;
-        padding: 10px 20px !important;
-    }}
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a span {{
-        font-size: 16px !important;
-    }}
-    /* عنوان القائمة الجانبية */
-    .sidebar-title {{
-        text-align: center;
-        padding: 15px 10px;
-        border-bottom: 1px solid {border};
-        margin-bottom: 15px;
-    }}
-    .sidebar-title h3 {{
-        background: linear-gradient(135deg, #ff4b4b, #ff8f00);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-size: 1.3rem;
-        font-weight: 900;
-        margin: 0;
-    }}
-    /* ألوان الوضع */
-    .main .block-container {{
-        color: {text} !important;
-    }}
-    .stApp {{
-        background-color: {bg} !important;
-    }}
-    .stApp [data-testid="stHeader"] {{
-        background-color: {bg} !important;
-    }}
-    h1, h2, h3, h4, h5, h6, p, span, label, .stMarkdown {{
-        color: {text} !important;
-    }}
-    .stCaption, .stCaption p {{
-        color: {muted} !important;
-    }}
-    hr {{
-        border-color: {border} !important;
-    }}
-    /* أزرار */
-    .stButton button {{
-        color: {text} !important;
-    }}
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(main_css(st.session_state.dark_mode), unsafe_allow_html=True)
     
     st.sidebar.markdown(f'<div class="sidebar-title"><h3>📝 الامتحان الوطني</h3></div>', unsafe_allow_html=True)
 
@@ -432,37 +458,15 @@ def main():
         st.session_state.dark_mode = not st.session_state.dark_mode
         st.rerun()
 
-    # تغيير أسماء الصفحات في القائمة الجانبية من الإنجليزي للعربي
-    components.html("""
-    <script>
-    (function(){
-        var map = {
-            'app': '📝 الامتحان',
-            '2   المراجعة': '📖 المراجعة',
-            'المراجعة': '📖 المراجعة'
-        };
-        function rename(){
-            var pd = window.parent.document;
-            var links = pd.querySelectorAll('[data-testid="stSidebarNav"] a span');
-            for(var i=0;i<links.length;i++){
-                var txt = links[i].textContent.trim().toLowerCase();
-                for(var key in map){
-                    if(txt === key.toLowerCase() || txt.includes(key.toLowerCase())){
-                        links[i].textContent = map[key];
-                        break;
-                    }
-                }
-            }
-        }
-        rename();
-        setInterval(rename, 500);
-    })();
-    </script>
-    """, height=0)
-    init_db()
+    if 'phase' not in st.session_state and 's' in st.query_params:
+        restore_session(st.query_params['s'])
     if 'phase' not in st.session_state: st.session_state.phase = 'setup'
+    # عميل الصفحة: المؤقت يعمل فقط أثناء الامتحان، وخارجه يُزال (أسماء الصفحات تُعرَّب دائماً)
+    end_ts = st.session_state.end_time if st.session_state.phase == 'exam' else 0
+    components.html(client_html(end_ts, st.session_state.dark_mode), height=0)
     if st.session_state.phase == 'setup': phase_setup()
     elif st.session_state.phase == 'exam': phase_exam()
+    elif st.session_state.phase == 'practice': phase_practice()
     elif st.session_state.phase == 'results': phase_results()
 
     # التوقيع في أسفل الصفحة
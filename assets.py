@@ -0,0 +1,44 @@
+import json
+import os
+from functools import lru_cache
+
+import streamlit as st
+
+# ==========================================
+# الصور الثابتة (الشعار والأيقونة) بنسخ مصغّرة
+# ==========================================
+# create_favicon.py يبني نسخاً بأحجام وصيغ مختلفة بأسماء تحمل بصمة المحتوى في
+# static/assets مع manifest.json. مع server.enableStaticServing يُعاد رابط
+# /app/static/... فلا يقرأ الخادم الصورة ولا يفك ترميزها ولا يحسب بصمتها مع كل عرض،
+# والمتصفح يخزّنها. دون الخدمة الثابتة يُعاد مسار النسخة المصغّرة، ودون بناء الأصول
+# يُعاد الملف الأصلي كما كان.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIR = os.path.join(ROOT, 'static', 'assets')
+STATIC_URL = '/app/static/assets/'
+
+@lru_cache(maxsize=1)
+def manifest():
+    try:
+        with open(os.path.join(ASSET_DIR, 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+@lru_cache(maxsize=32)
+def image(name, width, fallback):
+    """رابط أخف نسخة من الصورة name عرضها width على الأقل (أو أكبر نسخة متاحة)، أو fallback."""
+    static = st.get_option('server.enableStaticServing')
+    # المسار يمر عبر st.image الذي يعيد ترميز غير PNG/JPEG، فتُختار نسخة PNG
+    entries = [e for e in manifest().get(name, ()) if static or e['file'].endswith('.png')]
+    if not entries:
+        return fallback
+    fitting = [e for e in entries if e['width'] >= width] or [max(entries, key=lambda e: e['width'])]
+    best = min(fitting, key=lambda e: e['bytes'])['file']
+    return STATIC_URL + best if static else os.path.join(ASSET_DIR, best)
+
+def logo(width=300):
+    return image('logo', width, 'logo.png')
+
+def favicon(fallback):
+    return image('favicon', 32, fallback)
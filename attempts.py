@@ -0,0 +1,467 @@
+import atexit
+import json
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+import time
+from array import array
+
+from adaptive import get_item_pool
+from db import DB_NAME, read, write
+from exam_generator import exam_seed, generate_questions, option_order
+from metrics import gauge
+from practice import review
+from question_bank import get_bank
+from scoring import score_attempt
+
+# ==========================================
+# حفظ المحاولات والإجابات (كتابة مؤجلة على دفعات)
+# ==========================================
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5  # ثوانٍ: أقصى تأخير قبل كتابة إجابة إلى القرص
+SESSION_RETENTION = 24 * 3600  # ثوانٍ: بقاء رمز الجلسة بعد انتهاء محاولته
+SYNC_TIMEOUT = 10     # ثوانٍ: أقصى انتظار لكتابة أحداث محاولة واحدة قبل قراءتها
+RETRIES = 3           # إعادة محاولة الدفعة عند قفل القاعدة أو خطأ عابر قبل كتابة أحداثها واحداً واحداً
+
+def create_attempt(student_name, subject, pass_mark, total, end_time, db_path=DB_NAME, exam=None, adaptive=False, mode='fixed'):
+    """إنشاء محاولة وتوليد أسئلتها من بذرة (الطالب، رقم المحاولة).
+
+    يعيد (رقم المحاولة، البذرة، معرّفات الأسئلة)، أو None إذا لم توجد أسئلة للمادة.
+    الصف يُدرج أولاً داخل نفس المعاملة لأن رقمه جزء من البذرة. مع exam (امتحان جاهز من
+    exam_pool) تُحفظ بذرته وأسئلته مباشرة بعبارة واحدة. مع adaptive يبدأ الامتحان بسؤال
+    واحد، و total حده الأقصى؛ بقية الأسئلة تُختار بعد كل إجابة (record_items). mode يُحفظ
+    مع المحاولة للامتحانات الثابتة ('offline' لحزم export_exam).
+    """
+    if exam is not None:
+        with write(db_path) as conn:
+            attempt_id = conn.execute(
+                'INSERT INTO Attempts (student_name, subject, pass_mark, question_ids, started_at, end_time, '
+                'seed, requested, bank_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (student_name, subject, pass_mark, ','.join(map(str, exam.question_ids)), time.time(), end_time,
+                 exam.seed, total, exam.bank_version)
+            ).lastrowid
+        return attempt_id, exam.seed, exam.question_ids
+    bank = get_bank(db_path)
+    if not bank.sections.get(subject):
+        return None
+    items = get_item_pool(db_path) if adaptive else None
+    with write(db_path) as conn:
+        attempt_id = conn.execute(
+            "INSERT INTO Attempts (student_name, subject, pass_mark, question_ids, started_at, end_time, mode) "
+            "VALUES (?, ?, ?, '', ?, ?, ?)",
+            (student_name, subject, pass_mark, time.time(), end_time, 'adaptive' if adaptive else mode)
+        ).lastrowid
+        seed = exam_seed(student_name, attempt_id)
+        if adaptive:
+            question_ids = array('q', [items.step(subject, (), (), seed, total)[0]])
+        else:
+            question_ids = generate_questions(bank, subject, total, seed)
+        conn.execute(
+            'UPDATE Attempts SET question_ids=?, seed=?, requested=?, bank_version=? WHERE id=?',
+            (','.join(map(str, question_ids)), seed, total, bank.version, attempt_id)
+        )
+    return attempt_id, seed, question_ids
+
+
+class AnswerWriter:
+    """طابور أحداث تكتبه خيط خلفي في معاملات مجمّعة حتى لا تنتظر نقرات الطالب القرص."""
+
+    def __init__(self, db_path=DB_NAME):
+        self.db_path = db_path
+        # أحداث تعذر حفظها منفردة: سطر JSON لكل حدث بجانب القاعدة، لإعادة إدخالها يدوياً
+        self.failed_path = os.path.splitext(db_path)[0] + '_failed_events.jsonl'
+        self.failed = 0
+        self._queue = queue.Queue()
+        self._pending = {}      # رقم المحاولة أو رمز الجلسة -> أحداث في الطابور لم تُكتب بعد
+        self._pending_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='vexsam-answer-writer', daemon=True)
+        self._thread.start()
+
+    def record_answer(self, attempt_id, position, question_id, answer_idx):
+        self._put('answer', (attempt_id, position, question_id, answer_idx, time.time()))
+
+    def record_items(self, attempt_id, question_ids):
+        # أسئلة الامتحان التكيّفي تزداد سؤالاً بعد كل إجابة
+        self._put('items', (','.join(map(str, question_ids)), attempt_id))
+
+    def record_review(self, student_name, subject, question_id, correct):
+        # إجابة في وضع المراجعة: لا محاولة لها، تُحدَّث فقط جدول المراجعة
+        self._put('review', (student_name, subject, question_id, correct, time.time()))
+
+    def record_finish(self, attempt_id, raw_score):
+        self._put('finish', (time.time(), raw_score, attempt_id))
+
+    def record_position(self, token, current_q_index):
+        # موضع الطالب في الامتحان، حتى يُستأنف من نفس السؤال في عملية أخرى
+        self._put('position', (current_q_index, time.time(), token))
+
+    def _put(self, kind, args):
+        key = _event_key(kind, args)
+        if key is not None:
+            with self._pending_lock:
+                self._pending[key] = self._pending.get(key, 0) + 1
+        self._queue.put((kind, args))
+
+    def flush(self):
+        """الانتظار حتى تُكتب كل الأحداث الموجودة في الطابور (عند الخروج وفي أدوات القياس)."""
+        self._queue.join()
+
+    def sync(self, key, timeout=SYNC_TIMEOUT):
+        """الانتظار حتى تُكتب أحداث محاولة واحدة (أو رمز جلسة) الموجودة الآن في الطابور.
+
+        لا انتظار إذا لم يكن لها حدث معلّق؛ وإلا تُوضع علامة في الطابور ويُنتظر وصول الكاتب
+        إليها فقط، فما يضيفه الطلاب الآخرون بعدها لا يؤخرها. يعيد False عند انتهاء المهلة.
+        """
+        with self._pending_lock:
+            if not self._pending.get(key):
+                return True
+        done = threading.Event()
+        self._queue.put(('barrier', done))
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            events = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            # قارئ ينتظر (sync): تُكتب الدفعة عند علامته فوراً دون انتظار بقية FLUSH_INTERVAL
+            while len(events) < BATCH_SIZE and events[-1][0] != 'barrier':
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    events.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            writes = [event for event in events if event[0] != 'barrier']
+            try:
+                if writes:
+                    self._save(writes)
+            finally:
+                with self._pending_lock:
+                    for kind, args in writes:
+                        key = _event_key(kind, args)
+                        if key is not None:
+                            if self._pending[key] == 1:
+                                del self._pending[key]
+                            else:
+                                self._pending[key] -= 1
+                for kind, args in events:
+                    if kind == 'barrier':
+                        args.set()
+                    self._queue.task_done()
+
+    def _save(self, events):
+        # الدفعة كلها في معاملة واحدة؛ إذا فشلت رغم إعادة المحاولة تُكتب أحداثها واحداً واحداً
+        # بالترتيب، فلا يضيع إلا الحدث المعطوب نفسه، ويُحفظ في ملف الأحداث الفاشلة مع صاحبه
+        for attempt in range(RETRIES):
+            try:
+                self._write(events)
+                return
+            except sqlite3.OperationalError as e:
+                error = e
+                time.sleep(0.2 * (attempt + 1))
+            except Exception as e:
+                error = e
+                break
+        if len(events) > 1:
+            print(f"خطأ: تعذر حفظ دفعة من {len(events)} حدث ({error})؛ تُكتب الأحداث منفردة.")
+        for event in events:
+            try:
+                self._write([event])
+            except Exception as e:
+                self._failed(event, e)
+
+    def _failed(self, event, error):
+        kind, args = event
+        print(f"خطأ: تعذر حفظ حدث {kind} ({_event_owner(kind, args)}): {error}")
+        self.failed += 1
+        try:
+            with open(self.failed_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'kind': kind, 'args': list(args), 'error': str(error)}, ensure_ascii=False, default=str) + '\n')
+        except OSError as e:
+            print(f"خطأ: تعذر كتابة الحدث الفاشل إلى {self.failed_path}: {e}")
+
+    def _write(self, events):
+        answers = [args for kind, args in events if kind == 'answer']
+        items = [args for kind, args in events if kind == 'items']
+        finishes = [args for kind, args in events if kind == 'finish']
+        positions = {args[2]: args for kind, args in events if kind == 'position'}  # آخر موضع لكل جلسة
+        reviews = {}
+        for kind, args in events:
+            if kind == 'review':
+                reviews.setdefault(args[:2], []).append(args[2:])
+        with write(self.db_path) as conn:
+            conn.executemany(
+                'INSERT INTO AttemptAnswers (attempt_id, position, question_id, answer_idx, answered_at) '
+                'VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(attempt_id, position) DO UPDATE SET answer_idx=excluded.answer_idx, answered_at=excluded.answered_at',
+                answers
+            )
+            conn.executemany('UPDATE Attempts SET question_ids=? WHERE id=?', items)
+            conn.executemany('UPDATE Sessions SET current_q_index=?, updated_at=? WHERE token=?', positions.values())
+            for finished_at, raw_score, attempt_id in finishes:
+                if conn.execute(
+                        "UPDATE Attempts SET status='finished', finished_at=?, raw_score=? WHERE id=? AND status='active'",
+                        (finished_at, raw_score, attempt_id)).rowcount:
+                    _review_attempt(conn, attempt_id, finished_at, self.db_path)
+            for (student_name, subject), outcomes in reviews.items():
+                review(conn, student_name, subject, [(q_id, correct) for q_id, correct, _ in outcomes], outcomes[-1][2])
+        _closed.update(attempt_id for _, _, attempt_id in finishes)
+
+def _event_key(kind, args):
+    # مفتاح sync للحدث: رقم المحاولة لما تقرؤه load_attempt، ورمز الجلسة لما تقرؤه session_attempt
+    if kind == 'answer':
+        return args[0]
+    if kind == 'items':
+        return args[1]
+    if kind == 'finish':
+        return args[2]
+    if kind == 'position':
+        return args[2]
+    return None
+
+def _event_owner(kind, args):
+    # صاحب الحدث في رسالة الخطأ: رقم المحاولة، أو رمز الجلسة، أو الطالب في وضع المراجعة
+    if kind == 'answer':
+        return f'المحاولة {args[0]}'
+    if kind == 'items':
+        return f'المحاولة {args[1]}'
+    if kind == 'finish':
+        return f'المحاولة {args[2]}'
+    if kind == 'position':
+        return f'الجلسة {args[2]}'
+    return f'{args[0]} / {args[1]}'
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+# المحاولات التي أنهتها هذه العملية (أرقام فقط): تفحصها جلسات الامتحان في كل إعادة تشغيل دون استعلام
+_closed = set()
+
+def get_writer(db_path=DB_NAME):
+    writer = _writers.get(db_path)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(db_path)
+            if writer is None:
+                writer = _writers[db_path] = AnswerWriter(db_path)
+    return writer
+
+gauge('vexsam_answer_queue', 'أحداث تنتظر طابور الكتابة في هذه العملية',
+      lambda: sum(writer._queue.qsize() for writer in list(_writers.values())))
+gauge('vexsam_answer_failed', 'أحداث تعذر حفظها حتى منفردة (في ملف *_failed_events.jsonl)',
+      lambda: sum(writer.failed for writer in list(_writers.values())))
+
+@atexit.register
+def _flush_all():
+    for writer in list(_writers.values()):
+        writer.flush()
+
+def _sync(db_path, key):
+    # ما ينتظر طابور هذه العملية للمحاولة أو الجلسة يُكتب قبل قراءتها
+    writer = _writers.get(db_path)
+    if writer is not None:
+        writer.sync(key)
+
+def record_answer(attempt_id, position, question_id, answer_idx, db_path=DB_NAME):
+    get_writer(db_path).record_answer(attempt_id, position, question_id, answer_idx)
+
+def record_items(attempt_id, question_ids, db_path=DB_NAME):
+    get_writer(db_path).record_items(attempt_id, question_ids)
+
+def record_review(student_name, subject, question_id, correct, db_path=DB_NAME):
+    get_writer(db_path).record_review(student_name, subject, question_id, correct)
+
+def record_finish(attempt_id, raw_score, db_path=DB_NAME):
+    get_writer(db_path).record_finish(attempt_id, raw_score)
+
+def new_session(attempt_id, current_q_index=0, db_path=DB_NAME):
+    """رمز جلسة جديد للمحاولة (يوضع في رابط الصفحة).
+
+    يُكتب مباشرة لا عبر طابور الكتابة: مرة واحدة لكل بدء أو استئناف، فأي عملية تستقبل الرابط
+    بعد ذلك تجده، حتى لو توقفت العملية التي أنشأته قبل تفريغ طابورها. الموضع وحده مؤجل.
+    """
+    token = secrets.token_urlsafe(16)
+    with write(db_path) as conn:
+        conn.execute('INSERT INTO Sessions (token, attempt_id, current_q_index, updated_at) VALUES (?, ?, ?, ?)',
+                     (token, attempt_id, current_q_index, time.time()))
+    return token
+
+def record_position(token, current_q_index, db_path=DB_NAME):
+    get_writer(db_path).record_position(token, current_q_index)
+
+def _answers(conn, attempt_id, question_ids_text):
+    question_ids = array('q', map(int, question_ids_text.split(',')))
+    answers = array('b', [-1] * len(question_ids))
+    for position, answer_idx in conn.execute(
+            'SELECT position, answer_idx FROM AttemptAnswers WHERE attempt_id=?', (attempt_id,)):
+        answers[position] = answer_idx
+    return question_ids, answers
+
+def _review_attempt(conn, attempt_id, at, db_path):
+    # أسئلة المحاولة المُجاب عنها تُضاف إلى جدول مراجعة الطالب (practice.review)؛
+    # تُستدعى مرة واحدة فقط: عند انتقال المحاولة من active إلى finished
+    student_name, subject, q_text = conn.execute(
+        'SELECT student_name, subject, question_ids FROM Attempts WHERE id=?', (attempt_id,)).fetchone()
+    question_ids, answers = _answers(conn, attempt_id, q_text)
+    rows = get_bank(db_path).rows
+    outcomes = [(q_id, ans == rows[q_id][9]) for q_id, ans in zip(question_ids, answers) if ans >= 0 and q_id in rows]
+    review(conn, student_name, subject, outcomes, at)
+
+def load_attempt(attempt_id, student_name, db_path=DB_NAME):
+    """استرجاع محاولة باسم الطالب ورقمها، أو None إذا لم تُطابق أي محاولة.
+
+    حزم export_exam (mode='offline') لا تُستأنف في الموقع: تُسلَّم بورقة الإجابات مرة واحدة فقط.
+    """
+    _sync(db_path, attempt_id)
+    with read(db_path) as conn:
+        row = conn.execute(
+            'SELECT id, student_name, subject, pass_mark, question_ids, end_time, status, raw_score, seed, mode, requested '
+            "FROM Attempts WHERE id=? AND student_name=? AND mode != 'offline'",
+            (attempt_id, student_name)
+        ).fetchone()
+        if row is None:
+            return None
+        question_ids, answers = _answers(conn, attempt_id, row[4])
+    return {
+        'attempt_id': row[0], 'student_name': row[1], 'subject': row[2], 'pass_mark': row[3],
+        'questions': question_ids, 'user_answers': answers, 'end_time': row[5],
+        'status': row[6], 'raw_score': row[7], 'seed': row[8], 'mode': row[9], 'max_items': row[10],
+    }
+
+def session_attempt(token, db_path=DB_NAME):
+    """(المحاولة كما في load_attempt، موضع السؤال الحالي) لرمز جلسة، أو None.
+
+    الرمز نفسه إثبات الملكية (لا يُخمَّن)، فلا يُطلب اسم الطالب. الرمز يُحفظ عند إنشائه، فعدم
+    وجوده يعني رمزاً غير معروف؛ أما الموضع والإجابات التي لم يخرجها طابور عملية أخرى بعد
+    (حتى FLUSH_INTERVAL) فلا تظهر هنا.
+    """
+    _sync(db_path, token)
+    with read(db_path) as conn:
+        row = conn.execute(
+            'SELECT s.attempt_id, a.student_name, s.current_q_index FROM Sessions s JOIN Attempts a ON a.id = s.attempt_id '
+            "WHERE s.token=? AND a.mode != 'offline'", (token,)
+        ).fetchone()
+    if row is None:
+        return None
+    return load_attempt(row[0], row[1], db_path), row[2]
+
+def expire_sessions(retention=SESSION_RETENTION, db_path=DB_NAME):
+    """حذف رموز الجلسات لمحاولات انتهت منذ أكثر من retention ثانية؛ يعيد عدد المحذوف.
+
+    خلال المهلة يبقى رابط الجلسة يعرض النتيجة بعد إعادة التحميل.
+    """
+    with write(db_path) as conn:
+        return conn.execute(
+            "DELETE FROM Sessions WHERE attempt_id IN "
+            "(SELECT id FROM Attempts WHERE status='finished' AND IFNULL(finished_at, end_time) < ?)",
+            (time.time() - retention,)
+        ).rowcount
+
+def finalize_attempt(attempt_id, db_path=DB_NAME):
+    """تصحيح محاولة نشطة من قاعدة البيانات وحفظ نتيجتها؛ None إذا كانت مُنهاة مسبقاً."""
+    _sync(db_path, attempt_id)
+    with read(db_path) as conn:
+        row = conn.execute("SELECT question_ids FROM Attempts WHERE id=? AND status='active'", (attempt_id,)).fetchone()
+        if row is None:
+            return None
+        question_ids, answers = _answers(conn, attempt_id, row[0])
+    score, _, _ = score_attempt(get_bank(db_path), question_ids, answers)
+    now = time.time()
+    with write(db_path) as conn:
+        if conn.execute(
+                "UPDATE Attempts SET status='finished', finished_at=?, raw_score=? WHERE id=? AND status='active'",
+                (now, score, attempt_id)).rowcount:
+            _review_attempt(conn, attempt_id, now, db_path)
+    _closed.add(attempt_id)
+    return score
+
+def attempt_status(attempt_id, db_path=DB_NAME):
+    """حالة المحاولة في قاعدة البيانات ('active' أو 'finished')، أو None إذا لم توجد."""
+    with read(db_path) as conn:
+        row = conn.execute('SELECT status FROM Attempts WHERE id=?', (attempt_id,)).fetchone()
+    return row and row[0]
+
+def closed_here(attempt_id):
+    """هل أُنهيت المحاولة في هذه العملية (جدولة المواعيد أو تسليم من جلسة أخرى)؟ دون قراءة القاعدة."""
+    return attempt_id in _closed
+
+def active_deadlines(db_path=DB_NAME):
+    with read(db_path) as conn:
+        return conn.execute("SELECT end_time, id FROM Attempts WHERE status='active'").fetchall()
+
+def live_progress(subject=None, now=None, db_path=DB_NAME):
+    """المحاولات الجارية مع عدّاداتها الحية، ثم عدّادات أقسامها: (محاولات، أقسام).
+
+    تُقرأ من AttemptProgress و SectionProgress (تحدّثها مشغّلات الإجابات) فلا يُقرأ سجل
+    الإجابات أبداً؛ الكلفة تتبع عدد المحاولات الجارية لا عدد الإجابات.
+    محاولة: (id، الطالب، المادة، نهاية الوقت، عدد الأسئلة، الإجابات، الصحيحة)
+    قسم: (id، القسم، الإجابات، الصحيحة)
+    """
+    now = time.time() if now is None else now
+    # الحزم غير المتصلة (offline) نشطة أياماً ولا تُراقب حية
+    where = f"t.status='active' AND t.end_time > ? AND t.mode != 'offline' {'AND t.subject=?' if subject else ''}"
+    params = (now, subject) if subject else (now,)
+    with read(db_path) as conn:
+        attempts = conn.execute(
+            f"SELECT t.id, t.student_name, t.subject, t.end_time, "
+            f"IFNULL(t.requested, LENGTH(t.question_ids) - LENGTH(REPLACE(t.question_ids, ',', '')) + 1), "
+            f"IFNULL(p.answered, 0), IFNULL(p.correct, 0) "
+            f"FROM Attempts t LEFT JOIN AttemptProgress p ON p.attempt_id = t.id WHERE {where} ORDER BY t.end_time", params
+        ).fetchall()
+        sections = conn.execute(
+            f"SELECT s.attempt_id, s.section, s.answered, s.correct FROM Attempts t "
+            f"JOIN SectionProgress s ON s.attempt_id = t.id WHERE {where}", params
+        ).fetchall()
+    return attempts, sections
+
+def finished_attempts(subject=None, db_path=DB_NAME):
+    """كل المحاولات المنتهية (لمادة واحدة أو للكل) مع إجاباتها، لتحليل الدفعة كاملة."""
+    params = (subject,) if subject else ()
+    with read(db_path) as conn:
+        rows = conn.execute(
+            f"SELECT id, student_name, subject, pass_mark, finished_at, question_ids FROM Attempts "
+            f"WHERE status='finished' {'AND subject=?' if subject else ''} ORDER BY id", params
+        ).fetchall()
+        attempts = {}
+        for a_id, name, subj, pass_mark, finished_at, q_text in rows:
+            question_ids = array('q', map(int, q_text.split(',')))
+            attempts[a_id] = (a_id, name, subj, pass_mark, finished_at, question_ids, array('b', [-1] * len(question_ids)))
+        # كل الإجابات في استعلام واحد بدلاً من استعلام لكل محاولة
+        for a_id, position, answer_idx in conn.execute(
+                f"SELECT a.attempt_id, a.position, a.answer_idx FROM AttemptAnswers a JOIN Attempts t ON t.id = a.attempt_id "
+                f"WHERE t.status='finished' {'AND t.subject=?' if subject else ''}", params):
+            attempt = attempts.get(a_id)
+            if attempt is not None:
+                attempt[6][position] = answer_idx
+    return list(attempts.values())
+
+def reconstruct_attempt(attempt_id, db_path=DB_NAME):
+    """إعادة بناء ما رآه الطالب من البذرة: الأسئلة بترتيبها وترتيب خيارات كل سؤال.
+
+    'matches' تعني أن إعادة التوليد من البذرة على البنك الحالي تطابق القائمة المحفوظة؛
+    إذا عُدّل البنك بعد المحاولة (bank_version مختلف) تُعتمد القائمة المحفوظة.
+    """
+    with read(db_path) as conn:
+        row = conn.execute(
+            'SELECT student_name, subject, question_ids, seed, bank_version, requested, mode FROM Attempts WHERE id=?',
+            (attempt_id,)
+        ).fetchone()
+        if row is None or row[3] is None:
+            return None
+        question_ids, answers = _answers(conn, attempt_id, row[2])
+    bank = get_bank(db_path)
+    if row[6] == 'adaptive':
+        # أسئلة الامتحان التكيّفي تتبع إجاباته: تُعاد باختيارها خطوة خطوة من البذرة والإجابات
+        regenerated = get_item_pool(db_path).replay(row[1], question_ids, answers, row[3], row[5])
+    else:
+        regenerated = generate_questions(bank, row[1], row[5], row[3])
+    return {
+        'student_name': row[0], 'subject': row[1], 'seed': row[3],
+        'questions': question_ids, 'user_answers': answers,
+        'option_order': option_order(row[3], len(question_ids)),
+        'matches': regenerated == question_ids, 'bank_changed': bank.version != row[4],
+    }
@@ -0,0 +1,286 @@
+import csv
+import json
+import re
+import sys
+import zlib
+from functools import lru_cache
+from itertools import chain
+
+import numpy as np
+
+from db import DB_NAME, ar_norm, natural_key, passage_hash, read
+
+# ==========================================
+# فحص سلامة بنك الأسئلة (مرور واحد على كل الصفوف)
+# ==========================================
+# كل صف يُفحص وحده (خيارات فارغة أو مكررة حرفياً، لا إجابة صحيحة، HTML في نصوص تُعرض بـ
+# unsafe_allow_html)، وتُجمع له بصمتان للتكرار داخل نفس (المادة، القطعة):
+#   - تطابق تام بعد التطبيع (التشكيل وأشكال الألف والترقيم وترتيب الخيارات لا تهم)
+#   - تشابه تقريبي: MinHash على كلمات وأزواج كلمات السؤال والخيارات، تُقسم إلى نطاقات
+#     (LSH) فلا يُقارن إلا ما اشترك في نطاق كامل، ثم يُتحقق من تقدير التشابه.
+# التواقيع تُحسب بـ numpy على دفعات، والتجميع في النهاية بالفرز، فلا مقارنة بين كل زوجين.
+#
+# المخرجات سطر JSON لكل مشكلة: {"source", "id", "check", "severity", "field", "message", "other"}
+# error: لا يجب أن يصل للطالب (وتمنعه import_data.parse_row عند الاستيراد)، warning: للمراجعة ولا يمنع الاستيراد.
+
+NUM_PERM = 32
+BANDS = 8                     # 8 نطاقات × 4 قيم: زوج بتشابه 0.8 يلتقي في نطاق واحد باحتمال ≈ 0.97
+NEAR_THRESHOLD = 0.8          # أقل تقدير تشابه (Jaccard) يُبلَّغ عنه
+BATCH_SIZE = 2000
+OPTION_FIELDS = ('option_a', 'option_b', 'option_c', 'option_d')
+
+# تجزئة ضرب-إزاحة: أعلى 32 بتاً من a·x mod 2^64، مع a فردي عشوائي (ثابت بين التشغيلات)
+_A = np.random.default_rng(20240611).integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+TAG = re.compile(r'<\s*/?\s*([a-zA-Z][a-zA-Z0-9-]*)[^>]*>')
+UNSAFE = re.compile(r'<\s*/?\s*(script|style|iframe|object|embed|link|meta|form|input|svg|img|base)\b|\bon\w+\s*=|javascript:', re.I)
+WORDS = re.compile(r'[\W_]+')
+
+@lru_cache(maxsize=1 << 20)
+def _norm_token(token):
+    return tuple(WORDS.sub(' ', ar_norm(token).casefold()).split())
+
+def words(text):
+    """كلمات النص للمقارنة: تطبيع عربي، حروف صغيرة، دون ترقيم. كل كلمة تُطبَّع مرة واحدة."""
+    return [word for token in (text or '').split() for word in _norm_token(token)]
+
+def check_text(field, text):
+    if not text or ('<' not in text and '\\' not in text):
+        return []
+    if UNSAFE.search(text):
+        return [('unsafe_html', 'error', field, "نص يحتوي HTML قابلاً للتنفيذ (يُعرض دون تعقيم)")]
+    if TAG.search(text):
+        return [('html', 'warning', field, f"نص يحتوي وسم HTML <{TAG.search(text).group(1)}> يُعرض كما هو")]
+    if '\\' in text:
+        return [('escape_artifact', 'warning', field, "شرطة مائلة عكسية (بقايا تهريب علامات التنصيص في CSV)")]
+    return []
+
+def check_row(subject, question_text, options, correct_idx, passage=None, option_words=None):
+    """مشكلات الصف الواحد: قائمة (الفحص، الخطورة، الحقل، الرسالة). passage يُمرَّر مرة لكل قطعة.
+
+    option_words: كلمات الخيارات المطبَّعة إن كانت محسوبة مسبقاً (words لكل خيار).
+    """
+    findings = []
+    if not (subject or '').strip():
+        findings.append(('missing_field', 'error', 'subject', "المادة فارغة"))
+    if not (question_text or '').strip():
+        findings.append(('missing_field', 'error', 'question_text', "نص السؤال فارغ"))
+    filled = [bool((opt or '').strip()) for opt in options]
+    if sum(filled) < 2:
+        findings.append(('empty_option', 'error', 'option_a', "أقل من خيارين"))
+    elif filled != sorted(filled, reverse=True):
+        field = OPTION_FIELDS[filled.index(False)]
+        findings.append(('empty_option', 'error', field, "خيار فارغ بين خيارات غير فارغة"))
+    elif not all(filled):
+        # سؤال صح/خطأ: الخياران الأخيران فارغان ويُعرضان للطالب كخيارين فارغين
+        findings.append(('empty_option', 'warning', OPTION_FIELDS[filled.index(False)], "خيارات فارغة في آخر السؤال"))
+    if correct_idx is None:
+        findings.append(('no_correct', 'error', 'correct_idx', "لا يوجد خيار واحد يطابق الإجابة الصحيحة"))
+    elif not filled[correct_idx]:
+        findings.append(('no_correct', 'error', OPTION_FIELDS[correct_idx], "الإجابة الصحيحة خيار فارغ"))
+    # الخيار المكرر حرفياً خطأ؛ أما ما يتساوى بعد التطبيع فقط (الأسبوع/الاسبوع، دفئ/دفء، حالة
+    # الأحرف) فغالباً مموّهات مقصودة في أسئلة الإملاء والنحو، فيبقى تحذيراً للمراجعة
+    seen, seen_words = {}, {}
+    for field, opt, opt_words, is_filled in zip(OPTION_FIELDS, options, option_words or map(words, options), filled):
+        if not is_filled:
+            continue
+        raw, key = opt.strip(), tuple(opt_words)
+        if raw in seen:
+            findings.append(('duplicate_options', 'error', field, f"الخيار مكرر مع {seen[raw]}"))
+        elif key in seen_words:
+            findings.append(('similar_options', 'warning', field, f"الخيار لا يختلف عن {seen_words[key]} إلا في الهمزات أو التشكيل أو حالة الأحرف"))
+        seen.setdefault(raw, field)
+        seen_words.setdefault(key, field)
+    for field, text in zip(('question_text',) + OPTION_FIELDS, (question_text,) + tuple(options)):
+        findings.extend(check_text(field, text))
+    if passage:
+        findings.extend(check_text('passage_text', passage))
+    return findings
+
+# ==========================================
+# بصمات التكرار
+# ==========================================
+
+def _group_pairs(keys):
+    """(العضو، أول صف بنفس المفتاح) لكل صف يكرر مفتاح صف قبله."""
+    order = np.argsort(keys, kind='stable')
+    ordered = keys[order]
+    new = np.ones(len(ordered), dtype=bool)
+    new[1:] = ordered[1:] != ordered[:-1]
+    first = order[np.maximum.accumulate(np.where(new, np.arange(len(ordered)), 0))]
+    return order[~new], first[~new]
+
+class _WordHashes(dict):
+    def __missing__(self, word):
+        h = self[word] = zlib.crc32(word.encode('utf-8'))
+        return h
+
+class Duplicates:
+    """بصمات الأسئلة المضافة بالترتيب؛ pairs() تعيد التكرارات التامة ثم التقريبية."""
+
+    def __init__(self):
+        self._exact = []        # بصمة 64 بت لكل صف
+        self._group = []        # (المادة، القطعة) لكل صف ذي كلمات
+        self._rows = []         # رقم الصف لكل توقيع
+        self._hashes = []       # تجزئات كلمات الدفعة الحالية متتالية
+        self._fields = []       # طول كل حقل (السؤال وكل خيار) فيها
+        self._field_rows = []   # صف كل حقل داخل الدفعة
+        self._batch_rows = 0
+        self._signatures = []
+        self._words = _WordHashes()
+
+    def add(self, subject, passage_key, question_words, option_words):
+        """question_words و option_words: كلمات السؤال وكل خيار كما تعيدها words."""
+        group = f'{subject}\x1f{passage_key}'
+        fields = [question_words, *(w for w in option_words if w)]
+        # ترتيب الخيارات لا يغيّر البصمة؛ hash بايثون يكفي للتجميع داخل التشغيل الواحد
+        self._exact.append(hash((group, tuple(question_words), tuple(sorted(map(tuple, fields[1:]))))) & 0xFFFFFFFFFFFFFFFF)
+        if not any(fields):
+            return
+        for field in fields:
+            if field:
+                self._hashes.extend(map(self._words.__getitem__, field))
+                self._fields.append(len(field))
+                self._field_rows.append(self._batch_rows)
+        self._rows.append(len(self._exact) - 1)
+        self._group.append(zlib.crc32(group.encode('utf-8')))
+        self._batch_rows += 1
+        if self._batch_rows >= BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self._fields:
+            return
+        hashes = np.array(self._hashes, dtype=np.uint64)
+        lengths = np.array(self._fields, dtype=np.int64)
+        field_of = np.repeat(np.arange(len(lengths)), lengths)
+        row_of = np.repeat(np.array(self._field_rows, dtype=np.int64), lengths)
+        # لكل كلمة: نفسها (أقل من 2^32) والزوج الذي تبدؤه داخل نفس الحقل (أعلى 2^32)، أو نفسها
+        # مرة ثانية في آخر الحقل؛ التكرار لا يغيّر أصغر قيمة. الصفوف تبقى متتالية فتكفي reduceat
+        shingles = np.repeat(hashes, 2)
+        pairs = (hashes[:-1] << np.uint64(32)) | hashes[1:]
+        inside = field_of[:-1] == field_of[1:]
+        shingles[1:-1:2][inside] = pairs[inside]
+        starts = np.flatnonzero(np.r_[True, row_of[1:] != row_of[:-1]]) * 2
+        # (التبديل، الكلمة): أصغر قيمة على مقاطع متصلة في الذاكرة أسرع بكثير من الأعمدة
+        hashed = np.multiply.outer(_A, shingles)
+        hashed >>= np.uint64(32)
+        self._signatures.append(np.minimum.reduceat(hashed, starts, axis=1).T.astype(np.uint32))
+        self._hashes, self._fields, self._field_rows, self._batch_rows = [], [], [], 0
+
+    def pairs(self):
+        """(الصف، الصف الأقدم الذي يكرره، التشابه، تطابق تام؟) مرتبة حسب الصف."""
+        self._flush()
+        exact = np.array(self._exact, dtype=np.uint64)
+        members, firsts = _group_pairs(exact)
+        found = {int(m): (int(f), 1.0, True) for m, f in zip(members, firsts)}
+        if self._signatures:
+            signatures = np.concatenate(self._signatures)
+            rows = np.array(self._rows, dtype=np.int64)
+            group = np.array(self._group, dtype=np.uint64)
+            width = NUM_PERM // BANDS
+            candidates = []
+            for band in range(BANDS):
+                part = signatures[:, band * width:(band + 1) * width].astype(np.uint64)
+                key = group * np.uint64(0x9E3779B97F4A7C15)
+                for col in range(width):
+                    key = (key ^ part[:, col]) * np.uint64(0xBF58476D1CE4E5B9)
+                candidates.append(np.stack(_group_pairs(key), axis=1))
+            candidates = np.unique(np.concatenate(candidates), axis=0)
+            if len(candidates):
+                # مرتبة حسب (العضو، الأقدم): أول زوج يتجاوز الحد هو أقدم صف مشابه؛ التطابق التام يبقى
+                similarity = (signatures[candidates[:, 0]] == signatures[candidates[:, 1]]).mean(axis=1)
+                for (m, f), s in zip(rows[candidates].tolist(), similarity.tolist()):
+                    if s >= NEAR_THRESHOLD and m not in found:
+                        found[m] = (f, s, False)
+        for member in sorted(found):
+            yield member, *found[member]
+
+# ==========================================
+# مصادر الصفوف
+# ==========================================
+# كل سجل: (المصدر، المعرّف، المادة، نص القطعة، نص السؤال، الخيارات الأربعة، رقم الإجابة الصحيحة،
+#          هل هو تعديل لسؤال موجود في البنك بنفس المفتاح الطبيعي فلا يُعد تكراراً له)
+
+def bank_records(db_path=DB_NAME):
+    with read(db_path) as conn:
+        cursor = conn.execute(
+            'SELECT q.id, q.subject, COALESCE(p.passage_text, q.passage_text), q.question_text, '
+            'q.option_a, q.option_b, q.option_c, q.option_d, q.correct_idx '
+            'FROM Questions q LEFT JOIN Passages p ON p.id = q.passage_id ORDER BY q.id'
+        )
+        while rows := cursor.fetchmany(BATCH_SIZE):
+            for q_id, subject, passage, question_text, a, b, c, d, correct_idx in rows:
+                yield 'bank', q_id, subject, passage, question_text, (a, b, c, d), correct_idx, False
+
+def csv_records(csv_file_path, db_path=DB_NAME):
+    """صفوف ملف استيراد بصيغة import_data (رقم الصف كما في تقرير الرفض)."""
+    from import_data import RowError, correct_index, field_getter
+    with open(csv_file_path, 'r', encoding='utf-8-sig', newline='') as file, read(db_path) as conn:
+        reader = csv.reader(file)
+        get_fields = field_getter(next(reader, []))
+        for row_num, row in enumerate(reader, start=2):
+            subject, section, passage, question_text, a, b, c, d, correct = get_fields(row)
+            try:
+                correct_idx = correct_index((a, b, c, d), correct)
+            except RowError:
+                correct_idx = None
+            key = natural_key(subject, question_text, a, b, c, d)
+            update = conn.execute('SELECT 1 FROM Questions WHERE natural_key=?', (key,)).fetchone() is not None
+            yield 'csv', row_num, subject, passage, question_text, (a, b, c, d), correct_idx, update
+
+# ==========================================
+# الفحص
+# ==========================================
+
+def lint(records):
+    """مرور واحد على السجلات: مشكلات كل صف فور قراءته، ثم التكرارات بعد آخر صف."""
+    duplicates = Duplicates()
+    refs = []
+    passages = {}    # نص القطعة -> بصمتها: تُفحص وتُجزأ مرة واحدة لكل قطعة
+    for source, ref, subject, passage, question_text, options, correct_idx, update in records:
+        passage = (passage or '').strip()
+        first_time = passage and passage not in passages
+        if first_time:
+            passages[passage] = passage_hash(passage)
+        option_words = [words(opt) for opt in options]
+        for check, severity, field, message in check_row(subject, question_text, options, correct_idx,
+                                                         passage if first_time else None, option_words):
+            yield {'source': source, 'id': ref, 'check': check, 'severity': severity, 'field': field, 'message': message}
+        if not update:
+            refs.append((source, ref))
+            duplicates.add(subject or '', passages.get(passage, ''), words(question_text), option_words)
+    for member, first, similarity, exact in duplicates.pairs():
+        source, ref = refs[member]
+        other = refs[first]
+        if exact:
+            finding = ('duplicate', 'error', "السؤال مكرر (نفس النص والخيارات بعد التطبيع)")
+        else:
+            finding = ('near_duplicate', 'warning', f"سؤال شبه مكرر (تشابه {similarity:.2f})")
+        yield {'source': source, 'id': ref, 'check': finding[0], 'severity': finding[1], 'field': 'question_text',
+               'message': finding[2], 'other': other[1] if other[0] == source else f'{other[0]}:{other[1]}'}
+
+def main(args):
+    # python bank_lint.py            مشكلات البنك كاملاً
+    # python bank_lint.py ملف.csv    مشكلات ملف الاستيراد فقط، وتكراراته تُقارن بالبنك أيضاً
+    records = bank_records()
+    if args:
+        records = chain(records, csv_records(args[0]))
+    counts = {}
+    errors = 0
+    for finding in lint(records):
+        if args and finding['source'] != 'csv':
+            continue  # البنك يُقرأ فقط ليُقارن به الملف
+        print(json.dumps(finding, ensure_ascii=False))
+        key = (finding['check'], finding['severity'])
+        counts[key] = counts.get(key, 0) + 1
+        errors += finding['severity'] == 'error'
+    for (check, severity), n in sorted(counts.items()):
+        print(f"{severity:7} {check:18} {n}", file=sys.stderr)
+    print(f"المجموع: {errors} خطأ، {sum(counts.values()) - errors} تحذير.", file=sys.stderr)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    # رمز الخروج 1 عند وجود أي خطأ، فيصلح بوابةً قبل الاستيراد:
+    #   python bank_lint.py جديد.csv > findings.jsonl && python import_data.py جديد.csv
+    sys.exit(main(sys.argv[1:]))
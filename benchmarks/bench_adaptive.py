@@ -0,0 +1,99 @@
+"""الامتحان التكيّفي على بنك اصطناعي: زمن اختيار السؤال التالي، ودقة القياس مقابل الامتحان الثابت،
+واسترجاع معاملات البنود بالمعايرة.
+
+البنك في الذاكرة فقط (معاملات a و b حقيقية معروفة)، والطلاب محاكَون بقدرات θ ~ N(0,1)
+يجيبون حسب نموذج IRT نفسه.
+
+الاستخدام:
+    python benchmarks/bench_adaptive.py [عدد البنود]      # الافتراضي 100000
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from array import array
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import adaptive
+from scoring import bank_arrays, encode
+
+SUBJECT = 'مادة'
+SECTIONS = ['قسم 1', 'قسم 2', 'قسم 3', 'قسم 4', 'قسم 5']
+MAX_ITEMS = 100
+
+class SyntheticBank:
+    # ما يحتاجه ItemPool و bank_arrays من QuestionBank فقط
+    def __init__(self, n_items, rng):
+        self.rows, self.pools = {}, {(SUBJECT, sec): array('q') for sec in SECTIONS}
+        for q_id in range(1, n_items + 1):
+            sec = SECTIONS[q_id % len(SECTIONS)]
+            self.rows[q_id] = (q_id, SUBJECT, sec, None, '', '', '', '', '', 0)  # الإجابة الصحيحة دائماً 0
+            self.pools[(SUBJECT, sec)].append(q_id)
+        self.true_a = np.exp(rng.normal(0, 0.3, n_items + 1))
+        self.true_b = rng.normal(0, 1, n_items + 1)
+
+def answer(bank, q_id, theta, rng):
+    p = adaptive.probability(bank.true_a[q_id], bank.true_b[q_id], theta)
+    return 0 if rng.random() < p else 1
+
+def run_cat(pool, bank, theta, seed, rng, max_items=MAX_ITEMS, timings=None):
+    question_ids, answers = array('q'), array('b')
+    while True:
+        t = time.perf_counter()
+        q_id, estimate, se = pool.step(SUBJECT, question_ids, answers, seed, max_items)
+        if timings is not None:
+            timings.append((time.perf_counter() - t) * 1000)
+        if q_id is None:
+            return question_ids, answers, estimate, se
+        question_ids.append(q_id)
+        answers.append(answer(bank, q_id, theta, rng))
+
+def main(n_items, n_students=300):
+    rng = np.random.default_rng(1)
+    bank = SyntheticBank(n_items, rng)
+    true_params = [(q_id, bank.true_a[q_id], bank.true_b[q_id], 1000) for q_id in bank.rows]
+    pool = adaptive.ItemPool(bank, 1, true_params)
+    thetas = rng.normal(0, 1, n_students)
+    py_rng = random.Random(2)
+
+    # 1) زمن الخطوة (تقدير θ + اختيار السؤال) بمعاملات حقيقية
+    timings, lengths, errors = [], [], []
+    for i, theta in enumerate(thetas):
+        q_ids, _, estimate, _ = run_cat(pool, bank, theta, i, py_rng, timings=timings)
+        lengths.append(len(q_ids))
+        errors.append(estimate - theta)
+    timings.sort()
+    print(f'{n_items:,} بند، {n_students} طالب محاكى')
+    print(f'زمن الخطوة (ms): وسيط {statistics.median(timings):.3f}  p95 {timings[int(len(timings) * 0.95)]:.3f}  '
+          f'أقصى {timings[-1]:.3f}')
+    cat_rmse = float(np.sqrt(np.mean(np.square(errors))))
+    print(f'التكيّفي: متوسط الطول {statistics.mean(lengths):.1f} سؤال، RMSE للقدرة {cat_rmse:.3f}')
+
+    # 2) الامتحان الثابت: أسئلة عشوائية متوازنة بأطوال مختلفة، نفس التقدير (EAP)
+    for length in (20, 40, 60, 100):
+        errors = []
+        for theta in thetas:
+            q_ids = array('q', (int(q) for q in rng.choice(n_items, length, replace=False) + 1))
+            answers = array('b', (answer(bank, q_id, theta, py_rng) for q_id in q_ids))
+            errors.append(pool.estimate(q_ids, answers)[0] - theta)
+        print(f'ثابت {length:3} سؤال: RMSE للقدرة {float(np.sqrt(np.mean(np.square(errors)))):.3f}')
+
+    # 3) المعايرة: محاولات ثابتة على بنك أصغر ثم مقارنة المعاملات المسترجعة بالحقيقية
+    small = SyntheticBank(500, rng)
+    attempts = []
+    for theta in rng.normal(0, 1, 4000):
+        q_ids = array('q', (int(q) for q in rng.choice(500, 40, replace=False) + 1))
+        attempts.append((q_ids, array('b', (answer(small, q_id, theta, py_rng) for q_id in q_ids))))
+    arrays = bank_arrays(small)
+    t = time.perf_counter()
+    a, b, n = adaptive.fit(arrays, *encode(arrays, attempts))
+    fit_s = time.perf_counter() - t
+    ids = arrays.ids
+    print(f'المعايرة: 4000 محاولة × 40 سؤال في {fit_s:.2f}s؛ ارتباط b بالحقيقي '
+          f'{np.corrcoef(b, small.true_b[ids])[0, 1]:.3f}، ارتباط a {np.corrcoef(a, small.true_a[ids])[0, 1]:.3f}')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
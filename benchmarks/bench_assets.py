@@ -0,0 +1,63 @@
+"""كلفة عرض الشعار والأيقونة في كل إعادة تشغيل: الملف الأصلي مقابل النسخ المصغّرة من create_favicon.py.
+
+يقيس image_to_url (ما يفعله st.image و page_icon في الخادم: القراءة وفك الترميز والتصغير
+وتسجيل الملف في مدير الوسائط) وحجم ما يُرسل للمتصفح في كل عرض.
+
+الاستخدام:
+    python create_favicon.py && python benchmarks/bench_assets.py
+"""
+import logging
+import os
+import statistics
+import sys
+import time
+from unittest import mock
+
+logging.disable(logging.CRITICAL)
+
+from streamlit.elements.lib.image_utils import image_to_url
+from streamlit.elements.lib.layout_utils import LayoutConfig
+from streamlit.runtime import Runtime
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+import assets
+
+ROUNDS = 50
+
+def measure(label, image, width, storage):
+    times = []
+    for _ in range(ROUNDS):
+        t = time.perf_counter()
+        url = image_to_url(image, LayoutConfig(width=width), clamp=False, channels='RGB',
+                           output_format='auto', image_id='bench')
+        times.append((time.perf_counter() - t) * 1000)
+    if url.startswith(assets.STATIC_URL):
+        sent = f'{os.path.getsize(os.path.join(assets.ASSET_DIR, url[len(assets.STATIC_URL):])) / 1024:.1f} KB (ملف ثابت يخزّنه المتصفح)'
+    else:
+        sent = f'{len(storage.get_file(url.rsplit("/", 1)[-1].split(".")[0]).content) / 1024:.1f} KB'
+    print(f'{label:34} وسيط {statistics.median(times):8.3f}ms  أقصى {max(times):8.3f}ms  يُرسل {sent}')
+
+def main():
+    if not assets.manifest():
+        sys.exit('خطأ: لم تُبنَ الأصول؛ شغّل python create_favicon.py أولاً.')
+    storage = MemoryMediaFileStorage('/media')
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(storage)
+    with mock.patch.object(Runtime, '_instance', runtime):
+        measure('الشعار: logo.png الأصلي', 'logo.png', 300, storage)
+        with mock.patch.object(assets.st, 'get_option', lambda key: False):
+            assets.image.cache_clear()
+            measure('الشعار: نسخة مصغّرة (مسار)', assets.logo(300), 300, storage)
+            measure('الأيقونة: favicon.png الأصلي', 'favicon.png', 'stretch', storage)
+            measure('الأيقونة: نسخة 32px (مسار)', assets.favicon('📝'), 'stretch', storage)
+        assets.image.cache_clear()
+        with mock.patch.object(assets.st, 'get_option', lambda key: True):
+            measure('الشعار: رابط /app/static', assets.logo(300), 300, storage)
+            measure('الأيقونة: رابط /app/static', assets.favicon('📝'), 'stretch', storage)
+
+if __name__ == '__main__':
+    main()
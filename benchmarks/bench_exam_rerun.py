@@ -0,0 +1,108 @@
+"""قياس زمن الخادم والبايتات المرسلة لكل إعادة تشغيل أثناء امتحان من 100 سؤال.
+
+يشغّل app.py عبر AppTest على نسخة مؤقتة من المستودع (حتى لا تتغير قاعدة البيانات)،
+ويحاكي: اختيار إجابة، ثم "التالي"، ثم التنقل عبر خريطة الأسئلة.
+عندما يكون عنصر الامتحان داخل st.fragment تُرسل التفاعلات كإعادة تشغيل للجزء
+فقط، كما يفعل المتصفح.
+
+المادة الافتراضية بلا قطع قراءة؛ "اللغة الإنجليزية" تقيس أسئلة القطع أيضاً (نص القطعة يُرسل
+مع كل إعادة تشغيل لسؤال منها). الأسئلة تختلف بين تشغيل وآخر، فالفروق الصغيرة في البايتات ضجيج.
+
+الاستخدام:
+    python benchmarks/bench_exam_rerun.py [مجلد_التطبيق] [المادة]
+"""
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from unittest import mock
+
+logging.disable(logging.CRITICAL)
+
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.runtime.scriptrunner import RerunData
+from streamlit.testing.v1 import AppTest
+import streamlit.testing.v1.local_script_runner as local_script_runner
+
+SUBJECT = sys.argv[2] if len(sys.argv) > 2 else 'اللغة العربية'
+N_QUESTIONS = 100
+MAP_CLICKS = 20
+
+class Probe:
+    """يعدّ بايتات الرسائل المرسلة ويحقن معرّف الجزء في طلبات إعادة التشغيل."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.fragment_id = None
+        self.scoped = False
+
+    def enqueue(self, original):
+        def wrapper(queue, msg):
+            self.bytes += msg.ByteSize()
+            if msg.HasField('delta') and msg.delta.fragment_id:
+                self.fragment_id = msg.delta.fragment_id
+            return original(queue, msg)
+        return wrapper
+
+    def rerun_data(self, **kwargs):
+        if self.scoped and self.fragment_id:
+            kwargs['fragment_id_queue'] = [self.fragment_id]
+        return RerunData(**kwargs)
+
+
+def timed(probe, samples, action):
+    probe.bytes = 0
+    t = time.perf_counter()
+    action()
+    samples.append((time.perf_counter() - t, probe.bytes))
+
+
+def map_click(at, i):
+    pills = [p for p in at.pills if p.key == 'nav_map']
+    if pills:
+        return pills[0].set_value(i).run()
+    return at.button(key=f'nav_{i}').click().run()
+
+
+def run(app_dir):
+    probe = Probe()
+    samples = {'answer': [], 'next': [], 'map': []}
+    with mock.patch.object(ForwardMsgQueue, 'enqueue', probe.enqueue(ForwardMsgQueue.enqueue)), \
+         mock.patch.object(local_script_runner, 'RerunData', probe.rerun_data):
+        at = AppTest.from_file(os.path.join(app_dir, 'app.py'), default_timeout=60).run()
+        at.text_input[0].input('bench')
+        at.selectbox[0].select(SUBJECT)
+        at.selectbox[1].select(N_QUESTIONS)
+        [b for b in at.button if b.label == 'بدء الامتحان'][0].click().run()
+        total = len(at.session_state.questions)
+        probe.scoped = True
+        for i in range(total - 1):
+            timed(probe, samples['answer'], lambda: at.radio[0].set_value(i % 4).run())
+            timed(probe, samples['next'], lambda: [b for b in at.button if b.label == 'التالي'][0].click().run())
+        for i in range(MAP_CLICKS):
+            timed(probe, samples['map'], lambda: map_click(at, (i * 37) % total))
+        assert not at.exception, at.exception
+    return samples
+
+
+def main():
+    app_dir = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    with tempfile.TemporaryDirectory() as tmp:
+        work = os.path.join(tmp, 'app')
+        shutil.copytree(app_dir, work, ignore=shutil.ignore_patterns('.git', 'benchmarks', '*.db-wal', '*.db-shm'))
+        os.chdir(work)
+        sys.path.insert(0, work)
+        samples = run(work)
+    print(f'امتحان {N_QUESTIONS} سؤال ({SUBJECT}) — {app_dir}')
+    for name, values in samples.items():
+        times = sorted(v[0] * 1000 for v in values)
+        sizes = [v[1] for v in values]
+        p95 = times[int(len(times) * 0.95) - 1]
+        print(f'{name:7} n={len(values):3}  زمن الخادم: وسيط {statistics.median(times):7.2f}ms  p95 {p95:7.2f}ms'
+              f'  البايتات: متوسط {statistics.mean(sizes):9.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""موجة "بدء الامتحان": N طالب يبدؤون خلال ثوانٍ، مع مجمع الامتحانات الجاهزة وبدونه.
+
+كل طالب خيط يستدعي ما يستدعيه زر البدء في app.py (create_attempt، مع exam من
+المجمع أو بدونه). يُقاس زمن البدء لكل طالب، ومقاييس المجمع بعد الموجة.
+يعمل على نسخة مؤقتة من قاعدة البيانات.
+
+الاستخدام:
+    python benchmarks/bench_exam_start.py [N]
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from attempts import create_attempt
+from db import DB_NAME
+from exam_pool import get_exam_pool
+from question_bank import get_bank
+
+def wave(db_path, n, pool):
+    subjects = list(get_bank(db_path).sections)
+    timings = [0.0] * n
+    start = threading.Barrier(n)
+
+    def student(i):
+        subject, total = subjects[i % len(subjects)], (20, 40, 60, 80, 100)[i % 5]
+        start.wait()
+        t = time.perf_counter()
+        exam = pool.take(subject, total) if pool else None
+        create_attempt(f'طالب {i}', subject, 50, total, time.time() + 3600, db_path, exam=exam)
+        timings[i] = (time.perf_counter() - t) * 1000
+
+    threads = [threading.Thread(target=student, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    timings.sort()
+    return statistics.median(timings), timings[int(n * 0.95) - 1], timings[-1]
+
+def main(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = shutil.copy(os.path.join(ROOT, DB_NAME), tmp)
+        get_bank(db_path)
+        print(f'{n} طالب يبدؤون معاً — زمن البدء (ms): وسيط / p95 / أقصى')
+        print('بدون المجمع:  %8.2f %8.2f %8.2f' % wave(db_path, n, None))
+        pool = get_exam_pool(db_path)
+        ready = {}
+        while not ready or min(ready.values()) < pool.size:  # ننتظر امتلاء كل الطوابير
+            time.sleep(0.05)
+            ready = pool.stats()['ready']
+        print('مع المجمع:    %8.2f %8.2f %8.2f' % wave(db_path, n, pool))
+        time.sleep(0.5)
+        stats = pool.stats()
+        print(f"المجمع: إصابة {stats['hits']}، إخفاق {stats['misses']}، مولَّد {stats['generated']}، "
+              f"زمن التوليد p50 {stats['refill_ms_p50']:.3f}ms p95 {stats['refill_ms_p95']:.3f}ms")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,79 @@
+"""مقارنة خطط الاستعلام وزمنها قبل الترحيلات وبعدها على بنوك أسئلة اصطناعية.
+
+الاستخدام:
+    python benchmarks/bench_indexes.py            # 10k و 100k و 1M
+    python benchmarks/bench_indexes.py 10000      # أحجام مخصصة
+"""
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db
+
+SUBJECTS = {
+    'اللغة الإنجليزية': ['Grammar', 'Functions', 'Reading', 'Conversations'],
+    'اللغة العربية': ['الإملاء', 'النحو والصرف', 'معاني المفردات', 'الأدب', 'اللغة والمعاجم'],
+    'الحاسوب': ['Word', 'PowerPoint', 'Excel', 'الإنترنت', 'البريد', 'Access', 'أمن المعلومات'],
+}
+
+# نفس الاستعلامات التي ينفذها app.py وصفحة المراجعة
+QUERIES = {
+    'subjects': ('SELECT DISTINCT subject FROM Questions ORDER BY subject', ()),
+    'sections': ('SELECT DISTINCT section FROM Questions WHERE subject=? ORDER BY section', ('الحاسوب',)),
+    'section_rows': ('SELECT id, passage_text, question_text, option_a, option_b, option_c, option_d '
+                     'FROM Questions WHERE subject=? AND section=? ORDER BY id', ('الحاسوب', 'Excel')),
+    'section_count': ('SELECT COUNT(*) FROM Questions WHERE subject=? AND section=?', ('الحاسوب', 'Excel')),
+}
+
+def build(path, n_rows):
+    pairs = [(s, sec) for s, secs in SUBJECTS.items() for sec in secs]
+    conn = sqlite3.connect(path, isolation_level=None)
+    db.MIGRATIONS[0](conn)  # الهيكلية الأصلية فقط: بدون فهارس
+    conn.execute('PRAGMA user_version=1')
+    conn.execute('BEGIN')
+    conn.executemany(
+        'INSERT INTO Questions (subject, section, question_text, option_a, option_b, option_c, option_d, correct_option) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        ((*pairs[i % len(pairs)], f'سؤال رقم {i} ' + 'نص ' * 10, f'a{i}', f'b{i}', f'c{i}', f'd{i}', f'a{i}')
+         for i in range(n_rows))
+    )
+    conn.execute('COMMIT')
+    return conn
+
+def measure(conn, repeats):
+    results = {}
+    for name, (sql, params) in QUERIES.items():
+        plan = '; '.join(r[3] for r in conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+        timings = []
+        for _ in range(repeats):
+            t = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - t) * 1000)
+        results[name] = (statistics.median(timings), plan)
+    return results
+
+def main(sizes):
+    for n_rows in sizes:
+        repeats = max(3, 200_000 // n_rows)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            conn = build(path, n_rows)
+            before = measure(conn, repeats)
+            t = time.perf_counter()
+            db.migrate(conn)
+            migrate_s = time.perf_counter() - t
+            after = measure(conn, repeats)
+            conn.close()
+        print(f'\n=== {n_rows:,} سؤال (الترحيل: {migrate_s:.2f}s، التكرار: {repeats}) ===')
+        for name in QUERIES:
+            (b_ms, b_plan), (a_ms, a_plan) = before[name], after[name]
+            print(f'{name:14} قبل {b_ms:9.3f}ms  بعد {a_ms:9.3f}ms  (x{b_ms / max(a_ms, 1e-6):.1f})')
+            print(f'{"":14}   قبل: {b_plan}')
+            print(f'{"":14}   بعد: {a_plan}')
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
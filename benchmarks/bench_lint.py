@@ -0,0 +1,80 @@
+"""زمن bank_lint على بنك كبير اصطناعي، ودقة كشف التكرار.
+
+تُولَّد أسئلة من مفردات البنك الحقيقي (أطوال الأسئلة والخيارات مثل البنك)، ويُحقن فيها:
+  - تكرار تام بعد التطبيع (نفس السؤال مع علامة ترقيم وترتيب خيارات مختلف)
+  - تكرار تقريبي (كلمة واحدة مختلفة في سؤال من 12 كلمة فأكثر)
+ثم يُطبع زمن المرور الكامل (الفحوص + البصمات + التجميع، دون زمن التوليد) ونسبة ما كُشف من المحقون
+وعدد ما بُلِّغ عنه دون أن يُحقن.
+
+الاستخدام:
+    python benchmarks/bench_lint.py [عدد الصفوف]      # الافتراضي: 1000000
+"""
+import os
+import random
+import sqlite3
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from bank_lint import lint
+
+DUPLICATE_RATE = 0.005
+
+def vocabulary():
+    conn = sqlite3.connect(os.path.join(ROOT, 'exam_simulator.db'))
+    words = set()
+    for row in conn.execute('SELECT question_text, option_a, option_b, option_c, option_d FROM Questions'):
+        for text in row:
+            words.update((text or '').split())
+    conn.close()
+    return sorted(words)
+
+def records(n, words, injected):
+    rng = random.Random(0)
+    subjects = ['اللغة الإنجليزية', 'اللغة العربية', 'الحاسوب']
+    made = []
+    for i in range(n):
+        roll = rng.random()
+        if made and roll < DUPLICATE_RATE:
+            j = rng.randrange(len(made))
+            subject, question, options = made[j]
+            options = options[::-1]
+            question += ' ؟'
+            injected[i] = ('exact', j)
+        elif made and roll < 2 * DUPLICATE_RATE and len(made[-1][1].split()) >= 12:
+            j = len(made) - 1
+            subject, question, options = made[j]
+            tokens = question.split()
+            tokens[rng.randrange(len(tokens))] = rng.choice(words)
+            question = ' '.join(tokens)
+            injected[i] = ('near', j)
+        else:
+            subject = subjects[i % 3]
+            question = ' '.join(rng.choices(words, k=rng.randint(6, 24)))
+            options = tuple(' '.join(rng.choices(words, k=rng.randint(1, 3))) for _ in range(4))
+        made.append((subject, question, options))
+        yield 'bank', i, subject, '', question, options, 0, False
+
+def main(n):
+    words = vocabulary()
+    # زمن توليد الصفوف وحده يُطرح من زمن الفحص
+    start = time.perf_counter()
+    for _ in records(n, words, {}):
+        pass
+    generate = time.perf_counter() - start
+    injected = {}
+    start = time.perf_counter()
+    findings = list(lint(records(n, words, injected)))
+    wall = time.perf_counter() - start - generate
+    reported = {f['id']: f for f in findings if f['check'] in ('duplicate', 'near_duplicate')}
+    print(f'{n} صف في {wall:.1f}s ({n / wall:,.0f} صف/ث)، {len(findings)} نتيجة، مفردات {len(words)}')
+    for kind, check in (('exact', 'duplicate'), ('near', 'near_duplicate')):
+        rows = [i for i, (k, _) in injected.items() if k == kind]
+        hits = sum(i in reported and reported[i]['check'] == check for i in rows)
+        print(f'{check:15} محقون {len(rows):6}  مكتشف {hits:6} ({hits / max(len(rows), 1) * 100:.1f}%)')
+    extra = sum(i not in injected for i in reported)
+    print(f'بُلِّغ عنه دون حقن: {extra}')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,66 @@
+"""كلفة القياس (metrics.py) معطلاً ومفعّلاً.
+
+يقيس لكل حالة: استدعاء دالة مزخرفة بـ timed، والكتلة span، واستعلام SQLite بسيط على اتصال
+من connection_class، واستعلام حقيقي يشبه get_questions في صفحة المراجعة (قراءة 25 سؤالاً).
+
+الاستخدام:
+    python benchmarks/bench_metrics.py
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import metrics
+from db import init_db
+
+N = 200_000
+QUERY = ('SELECT q.id, q.question_text, q.option_a, q.option_b, q.option_c, q.option_d, q.correct_idx '
+         'FROM Questions q WHERE q.subject=? ORDER BY q.id LIMIT 25')
+
+def per_call_ns(fn, n=N):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e9
+
+def measure(db_path, enabled):
+    config = {**metrics.DEFAULTS, 'enabled': enabled}
+    with mock.patch.object(metrics, 'settings', lambda: config), \
+            mock.patch.object(metrics, 'get_exporter', lambda: None):
+        noop = metrics.timed('bench')(lambda: None)
+        span = metrics.span
+
+        def block():
+            with span('bench'):
+                pass
+
+        conn = sqlite3.connect(db_path, factory=metrics.connection_class('read'))
+        subject = conn.execute('SELECT subject FROM Questions LIMIT 1').fetchone()[0]
+        results = {
+            'timed (دالة فارغة)': per_call_ns(noop),
+            'span (كتلة فارغة)': per_call_ns(block),
+            'execute("SELECT 1")': per_call_ns(lambda: conn.execute('SELECT 1'), N // 4),
+            'قراءة 25 سؤالاً': per_call_ns(lambda: conn.execute(QUERY, (subject,)).fetchall(), N // 100),
+        }
+        conn.close()
+    return results
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'exam.db')
+        shutil.copy(os.path.join(ROOT, 'exam_simulator.db'), db_path)
+        init_db(db_path)
+        off = measure(db_path, False)
+        on = measure(db_path, True)
+    print(f'{"":24} {"معطّل":>12} {"مفعّل":>12} {"الفرق":>10}')
+    for name in off:
+        print(f'{name:24} {off[name]:10.0f}ns {on[name]:10.0f}ns {on[name] - off[name]:8.0f}ns')
+
+if __name__ == '__main__':
+    main()
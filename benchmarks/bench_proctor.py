@@ -0,0 +1,101 @@
+"""كلفة لوحة المراقبة: العدّادات الحية (AttemptProgress / SectionProgress) مقابل إعادة تجميع سجل الإجابات.
+
+1) إنتاجية طابور الكتابة مع مشغّلات العدّادات ودونها: كل طالب نشط يجيب كل أسئلته
+   (مع تغيير 10٪ من الإجابات)، ويُقاس الزمن حتى تُكتب كل الأحداث.
+2) زمن لقطة اللوحة لعدد كبير من المحاولات الجارية: live_progress مقابل استعلام يعيد
+   تجميع AttemptAnswers مع Questions في كل تحديث.
+
+يعمل على نسخ مؤقتة من قاعدة البيانات.
+
+الاستخدام:
+    python benchmarks/bench_proctor.py [عدد الطلاب]      # الافتراضي: 3000
+"""
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from attempts import create_attempt, get_writer, live_progress, record_answer
+from db import init_db
+
+SUBJECTS = ['اللغة الإنجليزية', 'اللغة العربية', 'الحاسوب']
+N_QUESTIONS = 20
+ROUNDS = 20
+
+RESCAN = '''
+    SELECT t.id, COUNT(a.position), SUM(IFNULL(a.answer_idx = q.correct_idx, 0))
+    FROM Attempts t JOIN AttemptAnswers a ON a.attempt_id = t.id LEFT JOIN Questions q ON q.id = a.question_id
+    WHERE t.status='active' AND t.end_time > ? AND t.mode != 'offline' GROUP BY t.id
+'''
+RESCAN_SECTIONS = '''
+    SELECT t.id, IFNULL(q.section, 'عام'), COUNT(a.position), SUM(IFNULL(a.answer_idx = q.correct_idx, 0))
+    FROM Attempts t JOIN AttemptAnswers a ON a.attempt_id = t.id LEFT JOIN Questions q ON q.id = a.question_id
+    WHERE t.status='active' AND t.end_time > ? AND t.mode != 'offline' GROUP BY 1, 2
+'''
+
+def prepare(db_path, n_students, triggers):
+    init_db(db_path)
+    if not triggers:
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('DROP TRIGGER answers_progress_insert')
+            conn.execute('DROP TRIGGER answers_progress_update')
+    end_time = time.time() + 3600
+    return [create_attempt(f'طالب {i}', SUBJECTS[i % len(SUBJECTS)], 50, N_QUESTIONS, end_time, db_path)
+            for i in range(n_students)]
+
+def answer_all(db_path, attempts):
+    rng = random.Random(0)
+    events = [(a_id, pos, q_id, rng.randrange(4)) for a_id, _, questions in attempts for pos, q_id in enumerate(questions)]
+    events += [(a_id, pos, q_id, (ans + 1) % 4) for a_id, pos, q_id, ans in rng.sample(events, len(events) // 10)]
+    writer = get_writer(db_path)
+    t = time.perf_counter()
+    for event in events:
+        record_answer(*event, db_path)
+    writer.flush()
+    wall = time.perf_counter() - t
+    return len(events), wall
+
+def median_ms(fn, rounds=ROUNDS):
+    times = []
+    for _ in range(rounds):
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1000)
+    return statistics.median(times)
+
+def main(n_students):
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for triggers in (False, True):
+            db_path = os.path.join(tmp, f'exam_{int(triggers)}.db')
+            shutil.copy(os.path.join(ROOT, 'exam_simulator.db'), db_path)
+            attempts = prepare(db_path, n_students, triggers)
+            results[triggers] = answer_all(db_path, attempts)
+            label = 'مع مشغّلات العدّادات' if triggers else 'دون مشغّلات'
+            n, wall = results[triggers]
+            print(f'طابور الكتابة {label:22} {n} إجابة في {wall:6.2f}s  ({n / wall:8.0f} إجابة/ث)')
+        slowdown = results[True][1] / results[False][1]
+        print(f'كلفة المشغّلات على الكتابة: ×{slowdown:.2f}')
+
+        now = time.time()
+        attempts, sections = live_progress(now=now, db_path=db_path)
+        with sqlite3.connect(db_path) as conn:
+            expected = {row[0]: row[1:] for row in conn.execute(RESCAN, (now,))}
+            assert all(expected[a[0]] == (a[5], a[6]) for a in attempts), 'العدّادات لا تطابق سجل الإجابات'
+            assert len(sections) == len(conn.execute(RESCAN_SECTIONS, (now,)).fetchall())
+            answers = conn.execute('SELECT COUNT(*) FROM AttemptAnswers').fetchone()[0]
+            print(f'\n{len(attempts)} محاولة جارية، {answers} إجابة محفوظة (العدّادات تطابق إعادة التجميع)')
+            live = median_ms(lambda: live_progress(now=now, db_path=db_path))
+            rescan = median_ms(lambda: (conn.execute(RESCAN, (now,)).fetchall(),
+                                        conn.execute(RESCAN_SECTIONS, (now,)).fetchall()))
+        print(f'لقطة اللوحة: live_progress   وسيط {live:8.1f}ms')
+        print(f'لقطة اللوحة: إعادة التجميع   وسيط {rescan:8.1f}ms  (×{rescan / live:.1f})')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
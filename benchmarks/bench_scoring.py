@@ -0,0 +1,64 @@
+"""مقارنة التصحيح بحلقة بايثون بالتصحيح المتجه في scoring.py.
+
+يسحب N محاولة عشوائية من نسخة مؤقتة من بنك الأسئلة (في الذاكرة فقط، دون كتابة)،
+ثم يقيس: تصحيح محاولة واحدة، وتصحيح الدفعة كاملة مع تحليل البنود.
+
+الاستخدام:
+    python benchmarks/bench_scoring.py [N]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from db import DB_NAME
+from question_bank import get_bank
+import scoring
+
+def loop_score(bank, question_ids, answers):
+    # تصحيح سؤال بسؤال كما كان في finish_exam
+    score = 0
+    for q_id, ans in zip(question_ids, answers):
+        if ans >= 0 and ans == bank.rows[q_id][9]:
+            score += 1
+    return score
+
+def main(n, db_path):
+    bank = get_bank(db_path)
+    rng = random.Random(1)
+    subjects = list(bank.sections)
+    attempts = []
+    for _ in range(n):
+        qs = array('q', bank.sample(rng.choice(subjects), 100, rng=rng))  # كما تُخزَّن في الجلسة وفي finished_attempts
+        attempts.append((qs, array('b', [rng.choice((-1, 0, 1, 2, 3)) for _ in qs])))
+    scoring.bank_arrays(bank)  # بناء المفتاح مرة واحدة لكل بنك
+
+    t = time.perf_counter()
+    expected = [loop_score(bank, q, a) for q, a in attempts]
+    loop_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    result = scoring.analyse(bank, attempts)
+    batch_s = time.perf_counter() - t
+    assert result['scores'].tolist() == expected
+
+    t = time.perf_counter()
+    for q, a in attempts[:1000]:
+        scoring.score_attempt(bank, q, a)
+    single_ms = (time.perf_counter() - t) / min(n, 1000) * 1000
+
+    print(f'{n:,} محاولة × 100 سؤال')
+    print(f'حلقة بايثون (درجات فقط):            {loop_s * 1000:9.1f}ms')
+    print(f'analyse (درجات + أقسام + بنود + مشتتات): {batch_s * 1000:9.1f}ms')
+    print(f'score_attempt لمحاولة واحدة:        {single_ms:9.3f}ms')
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        # نسخة مؤقتة حتى لا تُطبَّق الترحيلات على قاعدة بيانات المستودع
+        path = shutil.copy(os.path.join(ROOT, DB_NAME), tmp)
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000, path)
@@ -0,0 +1,57 @@
+"""زمن البحث النصي (FTS5) على بنك أسئلة اصطناعي.
+
+يبني بنكاً بمفردات عربية مشكولة وغير مشكولة، ثم يطبّق الترحيلات (ومنها بناء الفهرس)
+ويقيس زمن صفحة النتائج الأولى والعدّ لكلمات نادرة وشائعة.
+
+الاستخدام:
+    python benchmarks/bench_search.py            # 1M
+    python benchmarks/bench_search.py 100000
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db
+import search
+from bench_indexes import build
+
+WORDS = ['مَدْرَسَة', 'كتاب', 'إعراب', 'الفعل', 'المضارع', 'قصيدة', 'الشاعر', 'مستشفى', 'أمانة', 'الحاسوب',
+         'البريد', 'جدول', 'Excel', 'Word', 'grammar', 'reading'] + [f'كلمة{i}' for i in range(5000)]
+
+QUERIES = ['مدرسه', 'اعراب الفعل', 'كلمة4999', 'excel', 'كلم', 'ال', 'غيرموجود']
+
+def fill_text(conn, n_rows):
+    rng = random.Random(1)
+    conn.execute('BEGIN')
+    conn.executemany(
+        'UPDATE Questions SET question_text=? WHERE id=?',
+        ((' '.join(rng.choices(WORDS, k=12)), i) for i in range(1, n_rows + 1))
+    )
+    conn.execute('COMMIT')
+
+def main(n_rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        conn = build(path, n_rows)
+        fill_text(conn, n_rows)
+        t = time.perf_counter()
+        db.migrate(conn)
+        migrate_s = time.perf_counter() - t
+        conn.close()
+        print(f'=== {n_rows:,} سؤال (الترحيل مع بناء الفهرس: {migrate_s:.1f}s، '
+              f'حجم الملف: {os.path.getsize(path) / 2**20:.0f}MB) ===')
+        for text in QUERIES:
+            timings = []
+            for _ in range(20):
+                t = time.perf_counter()
+                rows = search.search_questions(text, 25, db_path=path)
+                hits = search.count_hits(text, db_path=path)
+                timings.append((time.perf_counter() - t) * 1000)
+            print(f'{text:12} نتائج {hits:5}  صفحة + عدّ: وسيط {statistics.median(timings):7.2f}ms  أقصى {max(timings):7.2f}ms')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,240 @@
+"""تدرّج الأداء مع عدد العمّال في serve.py: نفس عدد الطلاب على 1 / 2 / 4 / 8 عمليات Streamlit.
+
+كل طالب عميل بلا متصفح يتكلم بروتوكول الواجهة الأمامية نفسه (رسائل BackMsg عبر
+WebSocket الوسيط، مع إعادة تشغيل الجزء exam_view للإجابة والتنقل كما يفعل المتصفح):
+    الإعداد -> بدء الامتحان -> إجابة كل سؤال و"التالي" -> التسليم
+في منتصف الامتحان يقطع الطالب اتصاله ويعيد الاتصال؛ الوسيط يوزّع دورياً (rr) فيصل
+غالباً إلى عامل آخر، ويُتحقق أن الامتحان استؤنف من نفس السؤال بنفس الإجابات.
+
+يُطبع لكل عدد عمّال: الزمن الكلي، التفاعلات في الثانية، ووسيط / p95 لزمن التفاعل،
+وعدد الجلسات المستأنفة بنجاح بعد إعادة الاتصال.
+
+يعمل على نسخة مؤقتة من المستودع حتى لا تتغير قاعدة البيانات.
+
+يحتاج websockets (ليس من متطلبات التطبيق):
+    pip install -r benchmarks/requirements.txt
+
+الاستخدام:
+    python benchmarks/bench_workers.py [عدد الطلاب] [عدد العمّال ...]      # الافتراضي: 16 طالباً، 1 2 4 8
+"""
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+
+from websockets.sync.client import connect
+
+import streamlit  # noqa: F401  (يهيئ الإعدادات قبل استيراد الرسائل)
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8590
+BASE_PORT = 8600  # serve.BASE_PORT
+SUBJECTS = ['اللغة الإنجليزية', 'اللغة العربية', 'الحاسوب']
+N_QUESTIONS = 20
+WIDGETS = ('radio', 'selectbox', 'text_input', 'number_input', 'button', 'button_group')
+DONE = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+        ForwardMsg.FINISHED_WITH_COMPILE_ERROR)
+
+
+class Session:
+    """جلسة متصفح واحدة: عناصر الصفحة الحالية (حسب المسار) وقيم الحقول التي تُرسل مع كل تشغيل."""
+
+    def __init__(self, port):
+        self.port = port
+        self.query_string = ''
+        self.ws = None
+        self.connect()
+
+    def connect(self):
+        if self.ws is not None:
+            self.ws.close()
+        # الاتصال يبقى مفتوحاً عبر عدة دوال، فيُدخَل سياقه يدوياً (ويُغلق في close)
+        self.ws = connect(f'ws://127.0.0.1:{self.port}/_stcore/stream', subprotocols=['streamlit'],
+                          max_size=None, open_timeout=60).__enter__()
+        self.elements = {}   # delta_path -> (النوع، الرسالة، معرّف الجزء)
+        self.values = {}     # معرّف الحقل -> WidgetState
+
+    def run(self, trigger=None, fragment_id=''):
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.query_string = self.query_string
+        state.widget_states.widgets.extend(self.values.values())
+        if trigger is not None:
+            state.widget_states.widgets.add(id=trigger, trigger_value=True)
+        state.fragment_id = fragment_id
+        t = time.perf_counter()
+        self.ws.send(msg.SerializeToString())
+        self._receive()
+        return (time.perf_counter() - t) * 1000
+
+    def _receive(self):
+        while True:
+            msg = ForwardMsg.FromString(self.ws.recv(timeout=120))
+            kind = msg.WhichOneof('type')
+            if kind == 'new_session':
+                fragments = set(msg.new_session.fragment_ids_this_run)
+                if fragments:
+                    self.elements = {p: e for p, e in self.elements.items() if e[2] not in fragments}
+                else:
+                    self.elements = {}
+            elif kind == 'page_info_changed':
+                self.query_string = msg.page_info_changed.query_string
+            elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                self.elements[tuple(msg.metadata.delta_path)] = (element.WhichOneof('type'), element, msg.delta.fragment_id)
+            elif kind == 'script_finished' and msg.script_finished in DONE:
+                break
+        ids = {getattr(e, t).id for t, e, _ in self.elements.values() if t in WIDGETS}
+        self.values = {k: v for k, v in self.values.items() if k in ids}
+        errors = [e.exception.message for t, e, _ in self.elements.values() if t == 'exception']
+        if errors:
+            raise RuntimeError(errors[0])
+
+    def find(self, kind, label=None):
+        for path in sorted(self.elements):
+            t, element, fragment_id = self.elements[path]
+            if t == kind and (label is None or getattr(element, kind).label == label):
+                return getattr(element, kind), fragment_id
+        raise LookupError(f'{kind} {label or ""} غير موجود في الصفحة')
+
+    def texts(self, kind):
+        return [getattr(e, kind).body for t, e, _ in self.elements.values() if t == kind]
+
+    def set(self, kind, label, value):
+        widget, _ = self.find(kind, label)
+        self.values[widget.id] = WidgetState(id=widget.id, string_value=value)
+
+    def click(self, label):
+        for path in sorted(self.elements):
+            t, element, fragment_id = self.elements[path]
+            if t == 'button' and element.button.label == label:
+                return self.run(trigger=element.button.id, fragment_id=fragment_id)
+        raise LookupError(f'زر {label} غير موجود في الصفحة')
+
+    def close(self):
+        self.ws.close()
+
+
+def student(i, timings, outcome, start):
+    def timed(action, ms):
+        timings[action].append(ms)
+
+    start.wait()
+    s = Session(PORT)
+    timed('setup', s.run())
+    s.set('text_input', 'اسم الطالب:', f'طالب {i}')
+    s.set('selectbox', 'المادة:', SUBJECTS[i % len(SUBJECTS)])
+    s.set('selectbox', 'الأسئلة:', str(N_QUESTIONS))
+    timed('start', s.click('بدء الامتحان'))
+    assert 's=' in s.query_string, 'لم يُربط رمز الجلسة برابط الصفحة'
+    for pos in range(N_QUESTIONS):
+        if pos == N_QUESTIONS // 2:
+            # انقطاع الاتصال: جلسة جديدة (غالباً في عامل آخر) بنفس الرابط فقط
+            time.sleep(0.6)  # مهلة طابور الكتابة (attempts.FLUSH_INTERVAL)
+            s.connect()
+            timed('reconnect', s.run())
+            # نفس السؤال، وكل الإجابات السابقة معلَّمة ✅ في خريطة الأسئلة
+            pills, _ = s.find('button_group')
+            answered = sum(o.content.startswith('✅') for o in pills.options)
+            if f'سؤال {pos + 1} من {N_QUESTIONS}' in s.texts('heading') and answered == pos:
+                outcome['restored'] += 1
+        radio, fragment_id = s.find('radio')
+        choice = radio.options[(pos + i) % len(radio.options)]
+        s.values[radio.id] = WidgetState(id=radio.id, string_value=choice)
+        timed('answer', s.run(fragment_id=fragment_id))
+        if pos < N_QUESTIONS - 1:
+            timed('next', s.click('التالي'))
+    timed('submit', s.click('تسليم الامتحان'))
+    assert 'النتيجة النهائية' in s.texts('heading'), 'لم تظهر صفحة النتيجة'
+    outcome['finished'] += 1
+    s.close()
+
+
+def percentile(times, q):
+    return times[min(len(times) - 1, int(len(times) * q))]
+
+
+def wait_ready(ports, timeout=180):
+    deadline = time.time() + timeout
+    for port in ports:
+        while True:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=2) as r:
+                    if r.status == 200:
+                        break
+            except OSError:
+                pass
+            if time.time() > deadline:
+                raise TimeoutError(f'العامل على المنفذ {port} لم يبدأ')
+            time.sleep(0.5)
+
+
+def level(work, n_workers, n_students):
+    proc = subprocess.Popen([sys.executable, 'serve.py', str(n_workers), 'rr', str(PORT)], cwd=work,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready([PORT] + [BASE_PORT + k for k in range(n_workers)])
+        # إحماء كل عامل مباشرة (تحميل البنك والمجمعات) حتى لا يُحسب في القياس
+        for k in range(n_workers):
+            warm = Session(BASE_PORT + k)
+            warm.run()
+            warm.close()
+        time.sleep(2)
+        timings, outcome, errors = defaultdict(list), defaultdict(int), []
+        start = threading.Barrier(n_students)
+
+        def run(i):
+            try:
+                student(i, timings, outcome, start)
+            except Exception as e:
+                errors.append(e)
+
+        t = time.perf_counter()
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(n_students)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        wall = time.perf_counter() - t
+    finally:
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    interactions = sorted(ms for action, times in timings.items() if action != 'reconnect' for ms in times)
+    print(f'\n=== {n_workers} عامل، {n_students} طالب — {wall:.1f}s، {len(interactions) / wall:.1f} تفاعل/ث، '
+          f'{len(errors)} خطأ ===')
+    for e in errors[:3]:
+        print(f'خطأ: {type(e).__name__}: {e}')
+    for action in ('setup', 'start', 'answer', 'next', 'submit', 'reconnect'):
+        times = sorted(timings[action])
+        if times:
+            print(f'{action:9} n={len(times):4}  وسيط {statistics.median(times):8.1f}ms  p95 {percentile(times, 0.95):8.1f}ms')
+    if interactions:
+        print(f'{"الكل":9} n={len(interactions):4}  وسيط {statistics.median(interactions):8.1f}ms  '
+              f'p95 {percentile(interactions, 0.95):8.1f}ms')
+    print(f'استُؤنف بعد إعادة الاتصال: {outcome["restored"]} / {n_students}، أكملوا الامتحان: {outcome["finished"]}')
+
+
+def main(n_students, levels):
+    print(f'الأنوية المتاحة: {os.cpu_count()}')
+    with tempfile.TemporaryDirectory() as tmp:
+        work = os.path.join(tmp, 'app')
+        shutil.copytree(ROOT, work, ignore=shutil.ignore_patterns('.git', 'benchmarks', 'exports', '*.db-wal', '*.db-shm', '*.whl'))
+        for n_workers in levels:
+            level(work, n_workers, n_students)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16, [int(a) for a in sys.argv[2:]] or [1, 2, 4, 8])
@@ -0,0 +1,98 @@
+"""فحص تسرّب المؤقتات في عميل الصفحة عبر N إعادة تشغيل.
+
+يولّد HTML العميل من app.client_html كما يرسله الخادم، ثم يشغّله في Node
+داخل نافذة أم وهمية بساعة افتراضية: كل إعادة تشغيل تعيد تحميل الـ iframe (وهي أسوأ
+حالة؛ في المتصفح لا يُعاد التحميل إلا إذا تغيّر المحتوى)، وتُحدث تغييرات في DOM،
+وتُقدّم الساعة. بعد كل دورة تُسجَّل أعداد setTimeout/setInterval المعلّقة
+وMutationObserver ومستمعي الأحداث، ويفشل الفحص إذا لم تبقَ ثابتة.
+
+الاستخدام:
+    python benchmarks/client_leak_check.py [N]
+"""
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app
+
+HARNESS = r"""
+const pages = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+let now = 1_000_000, nextId = 1;
+const timeouts = new Map(), intervals = new Map(), frames = new Map();
+const observers = [], listeners = [];
+function node(tag) {
+    return {
+        tagName: tag, style: {}, children: [], firstChild: null, parentNode: null, textContent: '',
+        appendChild(c) {
+            c.parentNode = this; this.children.push(c); this.firstChild = this.children[0];
+            if (c.tagName === 'script') new Function('window', c.textContent)(parentWindow);
+            return c;
+        },
+        removeChild(c) { this.children = this.children.filter(x => x !== c); c.parentNode = null; return c; },
+    };
+}
+const body = node('body'), head = node('head');
+const doc = {
+    body, head,
+    createElement: node,
+    createTextNode: (v) => ({ nodeValue: v }),
+    getElementById: (id) => body.children.find(c => c.id === id) || null,
+    querySelectorAll: () => [],
+    addEventListener: (type, fn) => listeners.push(type),
+};
+const store = new Map();
+const parentWindow = {
+    document: doc,
+    sessionStorage: { getItem: k => store.get(k) ?? null, setItem: (k, v) => store.set(k, String(v)), removeItem: k => store.delete(k) },
+    setTimeout: (fn, ms) => { const id = nextId++; timeouts.set(id, [now + ms, fn]); return id; },
+    clearTimeout: (id) => timeouts.delete(id),
+    setInterval: (fn, ms) => { const id = nextId++; intervals.set(id, [ms, fn]); return id; },
+    clearInterval: (id) => intervals.delete(id),
+    requestAnimationFrame: (fn) => { const id = nextId++; frames.set(id, fn); return id; },
+    MutationObserver: class { constructor(cb) { this.cb = cb; observers.push(this); } observe() {} },
+};
+Date.now = () => now;
+function advance(ms) {
+    const end = now + ms;
+    for (;;) {
+        let due = null;
+        for (const [id, [t, fn]] of timeouts) if (t <= end && (!due || t < due[1])) due = [id, t, fn];
+        if (!due) break;
+        timeouts.delete(due[0]); now = due[1]; due[2]();
+    }
+    now = end;
+    for (const [id, fn] of [...frames]) { frames.delete(id); fn(); }
+}
+const counts = [];
+pages.forEach((html) => {
+    const code = html.split('<script>')[1].split('</script>')[0];
+    new Function('window', code)({ parent: parentWindow });  // إعادة تحميل الـ iframe
+    observers.forEach(o => o.cb([]));                           // Streamlit يعيد رسم DOM
+    advance(5000);
+    counts.push({ timeouts: timeouts.size, intervals: intervals.size, frames: frames.size,
+                  observers: observers.length, listeners: listeners.length });
+});
+console.log(JSON.stringify(counts));
+"""
+
+def main(n):
+    exam_end = time.time() + 3600
+    # خليط من إعادة التشغيل داخل الامتحان، وتبديل الوضع، والعودة إلى صفحة الإعداد
+    pages = [app.client_html(0 if i % 7 == 6 else exam_end, i % 5 != 4) for i in range(n)]
+    out = subprocess.run(['node', '-e', HARNESS], input=json.dumps(pages), capture_output=True, text=True, check=True)
+    counts = json.loads(out.stdout)
+    for i in (0, 1, n // 2, n - 1):
+        print(f'rerun {i + 1:4}: {counts[i]}')
+    for key in ('intervals', 'observers', 'listeners'):
+        values = {c[key] for c in counts}
+        assert len(values) == 1, f'{key} grows across reruns: {sorted(values)}'
+    assert max(c['timeouts'] for c in counts) <= 1, 'more than one pending timer'
+    print(f'OK: {n} reruns, counts stay flat')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,211 @@
+"""اختبار حمل: N طالب متزامن على عملية Streamlit واحدة (app.py عبر AppTest).
+
+كل طالب خيط له جلسته الخاصة، ويمر بمسار الامتحان كاملاً:
+    الإعداد -> بدء الامتحان -> إجابة كل سؤال و"التالي" -> التنقل عبر خريطة الأسئلة -> التسليم
+كل الجلسات تشترك في نفس الوحدات (البنك، مجمع الاتصالات، طابور الكتابة...) كما في الخادم.
+تفاعلات الامتحان تُرسل كإعادة تشغيل لجزء exam_view فقط، كما يفعل المتصفح.
+
+يُطبع لكل مستوى تزامن:
+  - زمن إعادة التشغيل لكل نوع تفاعل: وسيط / p95 / p99 (يشمل الانتظار خلف الجلسات الأخرى،
+    ويُطبع الانتظار وحده في سطر queue)
+  - نمو ذاكرة العملية (RSS) لكل جلسة
+  - عدد عبارات SQL لكل جلسة حسب مرحلة التطبيق (setup / exam / results) ولخيوط الخلفية
+
+يعمل على نسخة مؤقتة من المستودع حتى لا تتغير قاعدة البيانات.
+
+الاستخدام:
+    python benchmarks/load_test.py [N ...]      # الافتراضي: 1 10 25
+"""
+import gc
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from unittest import mock
+
+logging.disable(logging.CRITICAL)
+
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.runtime.scriptrunner import RerunData, get_script_run_ctx
+from streamlit.testing.v1 import AppTest
+import streamlit.testing.v1.local_script_runner as local_script_runner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUBJECTS = ['اللغة الإنجليزية', 'اللغة العربية', 'الحاسوب']
+N_QUESTIONS = 20
+MAP_CLICKS = 10
+ACTIONS = ('setup', 'start', 'answer', 'next', 'map', 'submit')  # + 'queue': الانتظار خلف الجلسات الأخرى
+
+def percentile(times, q):
+    return times[min(len(times) - 1, int(len(times) * q))]
+
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+class Probe:
+    """عدّاد عبارات SQL لكل مرحلة، وحقن معرّف جزء exam_view في طلبات إعادة التشغيل."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queries = Counter()
+        self.fragment_id = None
+        self.frozen = False         # بعد الإحماء: معرّف الجزء ثابت لكل الجلسات
+        self.local = threading.local()  # scoped: هل تُرسل إعادة التشغيل لجزء الامتحان فقط
+
+    def trace(self, sql):
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            key = 'خلفية: ' + threading.current_thread().name
+        else:
+            key = ctx.session_state['phase'] if 'phase' in ctx.session_state else 'setup'
+        with self.lock:
+            self.queries[key] += 1
+
+    def connect(self, original):
+        def wrapper(pool, target, uri):
+            conn = original(pool, target, uri)
+            conn.set_trace_callback(self.trace)
+            return conn
+        return wrapper
+
+    def enqueue(self, original):
+        def wrapper(queue, msg):
+            # آخر جزء يرسم في الصفحة هو exam_view (بعد جزء مراقبة الموعد)؛ يُلتقط في جلسة
+            # الإحماء وحدها لأن أجزاء الجلسات المتزامنة تتداخل هنا
+            if not self.frozen and msg.HasField('delta') and msg.delta.fragment_id:
+                self.fragment_id = msg.delta.fragment_id
+            return original(queue, msg)
+        return wrapper
+
+    def rerun_data(self, **kwargs):
+        if getattr(self.local, 'scoped', False) and self.fragment_id:
+            kwargs['fragment_id_queue'] = [self.fragment_id]
+        return RerunData(**kwargs)
+
+
+def serialized(probe, original):
+    # AppTest مصمم لجلسة واحدة: يعيد ضبط حالة عامة قبل كل تشغيل (Runtime الوهمي،
+    # PagesManager.uses_pages_directory، إعداد global.appTest) فتتلف الجلسات المتزامنة
+    # بعضها بعضاً. لذلك تُنفَّذ إعادة التشغيل واحدة في كل مرة؛ وهذا قريب من الخادم الحقيقي
+    # حيث يُسلسل GIL تنفيذ السكربت، ويُحسب زمن الانتظار في الطابور ضمن زمن التفاعل.
+    lock = threading.Lock()
+
+    def wrapper(at, *args, **kwargs):
+        t = time.perf_counter()
+        with lock:
+            probe.local.waited = time.perf_counter() - t
+            return original(at, *args, **kwargs)
+    return wrapper
+
+
+def student(probe, i, timings, sessions, start):
+    def timed(action, run):
+        t = time.perf_counter()
+        result = run()
+        timings[action].append((time.perf_counter() - t) * 1000)
+        timings['queue'].append(probe.local.waited * 1000)
+        return result
+
+    start.wait()
+    at = timed('setup', lambda: AppTest.from_file(os.path.join(os.getcwd(), 'app.py'), default_timeout=120).run())
+    at.text_input[0].input(f'طالب {i}')
+    at.selectbox[0].select(SUBJECTS[i % len(SUBJECTS)])
+    at.selectbox[1].select(N_QUESTIONS)
+    timed('start', lambda: [b for b in at.button if b.label == 'بدء الامتحان'][0].click().run())
+    total = len(at.session_state.questions)
+    probe.local.scoped = True
+    for pos in range(total):
+        timed('answer', lambda: at.radio[0].set_value(at.radio[0].options and (pos + i) % 4).run())
+        if pos < total - 1:
+            timed('next', lambda: [b for b in at.button if b.label == 'التالي'][0].click().run())
+    for k in range(MAP_CLICKS):
+        timed('map', lambda: [p for p in at.pills if p.key == 'nav_map'][0].set_value((k * 7 + i) % total).run())
+    probe.local.scoped = False
+    timed('submit', lambda: [b for b in at.sidebar.button if b.label == 'تسليم الامتحان'][0].click().run())
+    assert not at.exception, at.exception
+    assert at.session_state.phase == 'results'
+    sessions.append(at)  # الجلسة تبقى حية حتى قياس الذاكرة، كجلسات الخادم المفتوحة
+
+
+def level(probe, n):
+    timings = defaultdict(list)
+    sessions, errors = [], []
+    start = threading.Barrier(n)
+
+    def run(i):
+        try:
+            student(probe, i, timings, sessions, start)
+        except Exception as e:
+            errors.append(e)
+
+    gc.collect()
+    rss_before = rss_kb()
+    with probe.lock:
+        probe.queries.clear()
+    t = time.perf_counter()
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    wall = time.perf_counter() - t
+    from attempts import get_writer
+    get_writer().flush()
+    gc.collect()
+    rss_after = rss_kb()
+    with probe.lock:
+        queries = dict(probe.queries)
+
+    print(f'\n=== {n} طالب متزامن — {wall:.1f}s، {len(errors)} خطأ ===')
+    for e in errors[:3]:
+        print(f'خطأ: {type(e).__name__}: {e!r}')
+    all_times = []
+    for action in ACTIONS + ('queue',):
+        times = sorted(timings[action])
+        if not times:
+            continue
+        if action != 'queue':
+            all_times.extend(times)
+        print(f'{action:7} n={len(times):5}  وسيط {statistics.median(times):8.2f}ms  '
+              f'p95 {percentile(times, 0.95):8.2f}ms  p99 {percentile(times, 0.99):8.2f}ms')
+    all_times.sort()
+    print(f'{"الكل":7} n={len(all_times):5}  وسيط {statistics.median(all_times):8.2f}ms  '
+          f'p95 {percentile(all_times, 0.95):8.2f}ms  p99 {percentile(all_times, 0.99):8.2f}ms')
+    print(f'الذاكرة: {rss_before / 1024:.1f} -> {rss_after / 1024:.1f} MB  ({(rss_after - rss_before) / max(len(sessions), 1):.0f} KB لكل جلسة)')
+    print('عبارات SQL لكل جلسة حسب المرحلة:')
+    for key, count in sorted(queries.items(), key=lambda kv: -kv[1]):
+        print(f'    {key:32} {count / n:8.1f}')
+    sessions.clear()
+
+
+def main(levels):
+    with tempfile.TemporaryDirectory() as tmp:
+        work = os.path.join(tmp, 'app')
+        shutil.copytree(ROOT, work, ignore=shutil.ignore_patterns('.git', 'benchmarks', 'exports', '*.db-wal', '*.db-shm'))
+        os.chdir(work)
+        sys.path.insert(0, work)
+        import db
+        probe = Probe()
+        with mock.patch.object(AppTest, '_run', serialized(probe, AppTest._run)), \
+             mock.patch.object(db.ConnectionPool, '_connect', probe.connect(db.ConnectionPool._connect)), \
+             mock.patch.object(ForwardMsgQueue, 'enqueue', probe.enqueue(ForwardMsgQueue.enqueue)), \
+             mock.patch.object(local_script_runner, 'RerunData', probe.rerun_data):
+            level(probe, 1)  # إحماء: تحميل البنك والمجمعات ومعرّف الجزء
+            probe.frozen = True
+            print('(الإحماء أعلاه يشمل التحميل الأول للبنك والترحيلات)')
+            for n in levels:
+                level(probe, n)
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1, 10, 25])
@@ -1,21 +1,100 @@
-"""Generate a favicon for the Virtual National Exam app."""
+"""Build the static image assets for the Virtual National Exam app.
+
+    python create_favicon.py            # resize logo.png / favicon.png into static/assets/
+    python create_favicon.py --draw     # redraw favicon.png first, then build
+
+Every variant gets a content-hashed name (logo-600.1a2b3c4d.webp) so browsers can
+cache it forever, and static/assets/manifest.json maps each image to its variants
+for the loader in assets.py.
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+
 from PIL import Image, ImageDraw
 
-img = Image.new('RGBA', (128, 128), (0, 0, 0, 0))
-draw = ImageDraw.Draw(img)
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIR = os.path.join(ROOT, 'static', 'assets')
+MANIFEST = 'manifest.json'
+
+# source image -> (widths, formats); widths cover 1x and 2x displays
+SOURCES = {
+    'logo': ('logo.png', (300, 600), ('webp', 'png')),
+    'favicon': ('favicon.png', (16, 32, 64, 192), ('png',)),
+}
+
+
+def draw_favicon(size=128):
+    img = Image.new('RGBA', (128, 128), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+
+    # Blue circle background
+    draw.ellipse([4, 4, 124, 124], fill='#1a56db', outline='#ffffff', width=3)
+
+    # White paper/document
+    draw.rounded_rectangle([35, 22, 93, 102], radius=5, fill='white')
+
+    # Blue checkmark
+    draw.line([(48, 62), (58, 76), (82, 42)], fill='#1a56db', width=6, joint='curve')
+
+    # Grey lines (text representation)
+    draw.line([(45, 85), (83, 85)], fill='#b0b0b0', width=3)
+    draw.line([(45, 93), (73, 93)], fill='#b0b0b0', width=2)
+    return img if size == 128 else img.resize((size, size), Image.LANCZOS)
+
+
+def encode(img, fmt):
+    buf = io.BytesIO()
+    if fmt == 'webp':
+        img.save(buf, 'WEBP', quality=85, method=6)
+    else:
+        img.save(buf, 'PNG', optimize=True)
+    return buf.getvalue()
+
 
-# Blue circle background
-draw.ellipse([4, 4, 124, 124], fill='#1a56db', outline='#ffffff', width=3)
+def variants(name, img, widths, formats):
+    """Yield (file name, width, height, bytes) for every size and format of one image."""
+    for width in widths:
+        if width > img.width:
+            continue
+        height = round(img.height * width / img.width)
+        resized = img.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            data = encode(resized, fmt)
+            digest = hashlib.blake2b(data, digest_size=4).hexdigest()
+            yield f'{name}-{width}.{digest}.{fmt}', width, height, data
 
-# White paper/document
-draw.rounded_rectangle([35, 22, 93, 102], radius=5, fill='white')
 
-# Blue checkmark
-draw.line([(48, 62), (58, 76), (82, 42)], fill='#1a56db', width=6, joint='curve')
+def build_assets(out_dir=ASSET_DIR):
+    """Write every variant and the manifest; remove variants left over from older builds."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest, written = {}, {MANIFEST}
+    for name, (source, widths, formats) in SOURCES.items():
+        with Image.open(os.path.join(ROOT, source)) as img:
+            img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+            entries = []
+            for filename, width, height, data in variants(name, img, widths, formats):
+                with open(os.path.join(out_dir, filename), 'wb') as f:
+                    f.write(data)
+                written.add(filename)
+                entries.append({'file': filename, 'width': width, 'height': height, 'bytes': len(data)})
+        manifest[name] = entries
+    for filename in os.listdir(out_dir):
+        if filename not in written:
+            os.remove(os.path.join(out_dir, filename))
+    with open(os.path.join(out_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
 
-# Grey lines (text representation)
-draw.line([(45, 85), (83, 85)], fill='#b0b0b0', width=3)
-draw.line([(45, 93), (73, 93)], fill='#b0b0b0', width=2)
 
-img.save('favicon.png')
-print("favicon.png created!")
+if __name__ == '__main__':
+    if '--draw' in sys.argv[1:] or not os.path.exists(os.path.join(ROOT, 'favicon.png')):
+        draw_favicon().save(os.path.join(ROOT, 'favicon.png'))
+        print("favicon.png created!")
+    for name, entries in build_assets().items():
+        source = SOURCES[name][0]
+        print(f"{source} ({os.path.getsize(os.path.join(ROOT, source)) // 1024} KB):")
+        for e in entries:
+            print(f"    {e['file']:32} {e['width']}x{e['height']}  {e['bytes'] / 1024:.1f} KB")
@@ -0,0 +1,491 @@
+import hashlib
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from metrics import connection_class
+
+DB_NAME = "exam_simulator.db"
+BUSY_TIMEOUT = 15  # ثوانٍ: مع عدة عمليات خادم (serve.py) ينتظر كاتب كل عملية انتهاء معاملة الأخرى
+
+# ==========================================
+# هيكلية قاعدة البيانات المشتركة
+# ==========================================
+
+def passage_hash(text):
+    """مفتاح المحتوى للقطعة: نفس النص (بعد إزالة الفراغات الطرفية) يعطي نفس المفتاح."""
+    return hashlib.sha1(text.strip().encode('utf-8')).hexdigest()
+
+def natural_key(subject, question_text, option_a, option_b, option_c, option_d):
+    """المفتاح الطبيعي للسؤال: المادة + نص السؤال + الخيارات الأربعة."""
+    parts = (subject, question_text, option_a, option_b, option_c, option_d)
+    return hashlib.sha1('\x1f'.join([(p or '').strip() for p in parts]).encode('utf-8')).hexdigest()
+
+# تطبيع النص العربي للبحث: حذف التشكيل والتطويل وتوحيد أشكال الألف والياء والتاء المربوطة
+AR_NORM = {
+    **{code: None for code in range(0x064B, 0x0653)},  # الفتحتان ... السكون
+    0x0670: None,    # الألف الخنجرية
+    0x0640: None,    # التطويل
+    0x0622: 0x0627, 0x0623: 0x0627, 0x0625: 0x0627, 0x0671: 0x0627,  # آ أ إ ٱ → ا
+    0x0649: 0x064A,  # ى → ي
+    0x0629: 0x0647,  # ة → ه
+}
+
+def ar_norm(text):
+    return (text or '').translate(AR_NORM)
+
+def ar_norm_sql(expr):
+    """نفس تطبيع ar_norm كتعبير SQL (REPLACE متداخلة) حتى تعمل المشغّلات من أي اتصال."""
+    for src, dst in AR_NORM.items():
+        expr = f"REPLACE({expr}, char({src}), {f'char({dst})' if dst else chr(39) * 2})"
+    return expr
+
+def _columns(conn, table):
+    return {r[1] for r in conn.execute(f'PRAGMA table_info({table})')}
+
+# ==========================================
+# الترحيلات: كل دالة ترفع PRAGMA user_version برقم واحد
+# ==========================================
+# الدوال متسامحة مع قواعد بيانات أُنشئت قبل وجود user_version (القيمة 0)
+
+def _v1_questions(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS Questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            subject TEXT,
+            section TEXT DEFAULT 'عام',
+            passage_text TEXT DEFAULT '',
+            question_text TEXT,
+            option_a TEXT,
+            option_b TEXT,
+            option_c TEXT,
+            option_d TEXT,
+            correct_option TEXT
+        )
+    ''')
+
+def _v2_passages(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS Passages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_hash TEXT UNIQUE NOT NULL,
+            passage_text TEXT NOT NULL
+        )
+    ''')
+    if 'passage_id' not in _columns(conn, 'Questions'):
+        conn.execute('ALTER TABLE Questions ADD COLUMN passage_id INTEGER REFERENCES Passages(id)')
+    migrate_inline_passages(conn)
+
+def _v3_natural_key(conn):
+    if 'natural_key' not in _columns(conn, 'Questions'):
+        conn.execute('ALTER TABLE Questions ADD COLUMN natural_key TEXT')
+    backfill_natural_keys(conn)
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_natural_key ON Questions(natural_key)')
+
+def _v4_section_index(conn):
+    # يغطي DISTINCT subject/section والبحث بـ subject=? AND section=? مع ORDER BY id
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_questions_subject_section ON Questions(subject, section, id)')
+    conn.execute('ANALYZE')
+
+def _v5_attempts(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS Attempts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_name TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            pass_mark INTEGER NOT NULL,
+            question_ids TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            end_time REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'active',
+            finished_at REAL,
+            raw_score INTEGER
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_attempts_student ON Attempts(student_name, id)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS AttemptAnswers (
+            attempt_id INTEGER NOT NULL REFERENCES Attempts(id),
+            position INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            answer_idx INTEGER NOT NULL,
+            answered_at REAL NOT NULL,
+            PRIMARY KEY (attempt_id, position)
+        ) WITHOUT ROWID
+    ''')
+
+def _v6_active_attempts(conn):
+    # جدولة المواعيد النهائية عند بدء العملية تقرأ المحاولات النشطة فقط
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_attempts_status_end ON Attempts(status, end_time)')
+
+def _search_columns(q):
+    # عمودا الفهرس النصي لصف من Questions باسم q (NEW أو جدول في SELECT)
+    question = f"IFNULL({q}.question_text, '') || ' ' || IFNULL({q}.option_a, '') || ' ' || IFNULL({q}.option_b, '') || ' ' || " \
+               f"IFNULL({q}.option_c, '') || ' ' || IFNULL({q}.option_d, '')"
+    passage = f"COALESCE((SELECT passage_text FROM Passages WHERE id = {q}.passage_id), {q}.passage_text, '')"
+    return ar_norm_sql(question), ar_norm_sql(passage)
+
+def _v7_search(conn):
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS QuestionsFTS USING fts5(question, passage, tokenize='unicode61 remove_diacritics 2', prefix='3')")
+    # نص السؤال وخياراته أهم من نص القطعة في الترتيب
+    conn.execute("INSERT INTO QuestionsFTS(QuestionsFTS, rank) VALUES('rank', 'bm25(2.0, 1.0)')")
+    question, passage = _search_columns('NEW')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON Questions BEGIN
+            INSERT INTO QuestionsFTS(rowid, question, passage) VALUES (NEW.id, {question}, {passage});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS questions_fts_update
+        AFTER UPDATE OF question_text, option_a, option_b, option_c, option_d, passage_id, passage_text ON Questions BEGIN
+            DELETE FROM QuestionsFTS WHERE rowid = OLD.id;
+            INSERT INTO QuestionsFTS(rowid, question, passage) VALUES (NEW.id, {question}, {passage});
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON Questions BEGIN
+            DELETE FROM QuestionsFTS WHERE rowid = OLD.id;
+        END
+    ''')
+    rebuild_search_index(conn)
+
+def _v8_bank_version(conn):
+    # عدّاد يتغير فقط مع تعديل الأسئلة، حتى لا يُعاد تحميل بنك الأسئلة في الذاكرة
+    # مع كل كتابة للمحاولات والإجابات في نفس الملف
+    conn.execute('CREATE TABLE IF NOT EXISTS BankVersion (id INTEGER PRIMARY KEY CHECK (id = 0), version INTEGER NOT NULL)')
+    conn.execute('INSERT OR IGNORE INTO BankVersion (id, version) VALUES (0, 0)')
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS questions_version_{event.lower()} AFTER {event} ON Questions BEGIN
+                UPDATE BankVersion SET version = version + 1 WHERE id = 0;
+            END
+        ''')
+
+def _v9_correct_idx(conn):
+    # الإجابة الصحيحة رقم الخيار (0-3) بدلاً من تكرار نصه، بقاعدة import_data.correct_index نفسها:
+    # النص (دون الفراغات الطرفية) يطابق خياراً واحداً بالضبط. ما لا يطابق أي خيار أو يطابق أكثر من
+    # خيار يبقى NULL (لا إجابة صحيحة)، ونصه الأصلي يُحفظ في CorrectOptionReport قبل حذف العمود
+    if 'correct_idx' not in _columns(conn, 'Questions'):
+        conn.execute('ALTER TABLE Questions ADD COLUMN correct_idx INTEGER CHECK (correct_idx BETWEEN 0 AND 3)')
+    if 'correct_option' in _columns(conn, 'Questions'):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS CorrectOptionReport (
+                question_id INTEGER PRIMARY KEY,
+                correct_option TEXT,
+                matches INTEGER NOT NULL
+            )
+        ''')
+        matches = ' + '.join(f'IFNULL(TRIM({col}) = TRIM(correct_option), 0)'
+                             for col in ('option_a', 'option_b', 'option_c', 'option_d'))
+        conn.execute(f'''
+            INSERT OR REPLACE INTO CorrectOptionReport (question_id, correct_option, matches)
+            SELECT id, correct_option, m FROM (SELECT id, correct_option, {matches} AS m FROM Questions) WHERE m != 1
+        ''')
+        conn.execute('''
+            UPDATE Questions SET correct_idx = CASE TRIM(correct_option)
+                WHEN TRIM(option_a) THEN 0 WHEN TRIM(option_b) THEN 1 WHEN TRIM(option_c) THEN 2 WHEN TRIM(option_d) THEN 3 END
+            WHERE id NOT IN (SELECT question_id FROM CorrectOptionReport)
+        ''')
+        unmatched, ambiguous = conn.execute(
+            'SELECT COUNT(*) FILTER (WHERE matches = 0), COUNT(*) FILTER (WHERE matches > 1) FROM CorrectOptionReport'
+        ).fetchone()
+        if unmatched or ambiguous:
+            print(f"تحذير: {unmatched} سؤال لا تطابق إجابته الصحيحة أي خيار و{ambiguous} تطابق أكثر من خيار؛ "
+                  f"بقيت دون إجابة صحيحة، ونصوصها الأصلية في جدول CorrectOptionReport.")
+        conn.execute('ALTER TABLE Questions DROP COLUMN correct_option')
+
+def _v10_attempt_seed(conn):
+    # بذرة التوليد والعدد المطلوب ونسخة البنك وقت الإنشاء: تكفي لإعادة بناء الامتحان كما رآه الطالب
+    columns = _columns(conn, 'Attempts')
+    if 'seed' not in columns:
+        conn.execute('ALTER TABLE Attempts ADD COLUMN seed INTEGER')
+    if 'requested' not in columns:
+        conn.execute('ALTER TABLE Attempts ADD COLUMN requested INTEGER')
+    if 'bank_version' not in columns:
+        conn.execute('ALTER TABLE Attempts ADD COLUMN bank_version INTEGER')
+
+def _v11_adaptive(conn):
+    # معاملات البنود (IRT ثنائي المعلمة) تُحسب خارج الخادم من المحاولات المحفوظة (adaptive.calibrate)؛
+    # Calibration.version يتغير مع كل معايرة حتى تعيد العمليات تحميل المعاملات
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ItemParams (
+            question_id INTEGER PRIMARY KEY,
+            a REAL NOT NULL,
+            b REAL NOT NULL,
+            n INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('CREATE TABLE IF NOT EXISTS Calibration (id INTEGER PRIMARY KEY CHECK (id = 0), version INTEGER NOT NULL, calibrated_at REAL)')
+    conn.execute('INSERT OR IGNORE INTO Calibration (id, version) VALUES (0, 0)')
+    if 'mode' not in _columns(conn, 'Attempts'):
+        conn.execute("ALTER TABLE Attempts ADD COLUMN mode TEXT NOT NULL DEFAULT 'fixed'")
+
+def _v12_reviews(conn):
+    # جدول المراجعة المتباعدة (practice.py): صف لكل (طالب، سؤال)، وطابور المستحق قراءة نطاق من الفهرس
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS Reviews (
+            student_name TEXT NOT NULL,
+            question_id INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            due REAL NOT NULL,
+            interval REAL NOT NULL,
+            ease REAL NOT NULL,
+            reps INTEGER NOT NULL,
+            lapses INTEGER NOT NULL,
+            last_review REAL NOT NULL,
+            PRIMARY KEY (student_name, question_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_reviews_due ON Reviews(student_name, subject, due)')
+
+def _v13_sessions(conn):
+    # رمز جلسة المتصفح (في رابط الصفحة ?s=) مربوط بمحاولته وموضعه: أي عملية خادم تستقبل
+    # الطالب بعد انقطاع أو إعادة توجيه تستأنف امتحانه من هنا (serve.py)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS Sessions (
+            token TEXT PRIMARY KEY,
+            attempt_id INTEGER NOT NULL REFERENCES Attempts(id),
+            current_q_index INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL
+        ) WITHOUT ROWID
+    ''')
+
+def _v14_progress(conn):
+    # عدّادات حية لكل محاولة ولكل (محاولة، قسم): تحدّثها مشغّلات AttemptAnswers داخل معاملة
+    # الكتابة نفسها (خيط طابور الكتابة أو ingest_sheet)، فتقرأها لوحة المراقبة مباشرة بدلاً من
+    # إعادة تجميع سجل الإجابات. الصحة تُحسب وقت الإجابة؛ تعديل البنك لاحقاً لا يعيد حسابها.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS AttemptProgress (
+            attempt_id INTEGER PRIMARY KEY,
+            answered INTEGER NOT NULL,
+            correct INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS SectionProgress (
+            attempt_id INTEGER NOT NULL,
+            section TEXT NOT NULL,
+            answered INTEGER NOT NULL,
+            correct INTEGER NOT NULL,
+            PRIMARY KEY (attempt_id, section)
+        ) WITHOUT ROWID
+    ''')
+    def correct(row):
+        return f"IFNULL((SELECT {row}.answer_idx = correct_idx FROM Questions WHERE id = {row}.question_id), 0)"
+    section = "IFNULL((SELECT section FROM Questions WHERE id = NEW.question_id), 'عام')"
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS answers_progress_insert AFTER INSERT ON AttemptAnswers BEGIN
+            INSERT INTO AttemptProgress (attempt_id, answered, correct) VALUES (NEW.attempt_id, 1, {correct('NEW')})
+                ON CONFLICT(attempt_id) DO UPDATE SET answered = answered + 1, correct = correct + excluded.correct;
+            INSERT INTO SectionProgress (attempt_id, section, answered, correct) VALUES (NEW.attempt_id, {section}, 1, {correct('NEW')})
+                ON CONFLICT(attempt_id, section) DO UPDATE SET answered = answered + 1, correct = correct + excluded.correct;
+        END
+    ''')
+    # تغيير الإجابة (ON CONFLICT ... DO UPDATE في طابور الكتابة) يغيّر عدد الصحيح فقط
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS answers_progress_update AFTER UPDATE OF answer_idx ON AttemptAnswers
+        WHEN OLD.answer_idx IS NOT NEW.answer_idx BEGIN
+            UPDATE AttemptProgress SET correct = correct + {correct('NEW')} - {correct('OLD')} WHERE attempt_id = NEW.attempt_id;
+            UPDATE SectionProgress SET correct = correct + {correct('NEW')} - {correct('OLD')}
+                WHERE attempt_id = NEW.attempt_id AND section = {section};
+        END
+    ''')
+    conn.execute('''
+        INSERT OR REPLACE INTO AttemptProgress (attempt_id, answered, correct)
+        SELECT a.attempt_id, COUNT(*), SUM(IFNULL(a.answer_idx = q.correct_idx, 0))
+        FROM AttemptAnswers a LEFT JOIN Questions q ON q.id = a.question_id GROUP BY a.attempt_id
+    ''')
+    conn.execute('''
+        INSERT OR REPLACE INTO SectionProgress (attempt_id, section, answered, correct)
+        SELECT a.attempt_id, IFNULL(q.section, 'عام'), COUNT(*), SUM(IFNULL(a.answer_idx = q.correct_idx, 0))
+        FROM AttemptAnswers a LEFT JOIN Questions q ON q.id = a.question_id GROUP BY 1, 2
+    ''')
+
+def bank_version(conn):
+    return conn.execute('SELECT version FROM BankVersion WHERE id = 0').fetchone()[0]
+
+MIGRATIONS = [
+    _v1_questions,
+    _v2_passages,
+    _v3_natural_key,
+    _v4_section_index,
+    _v5_attempts,
+    _v6_active_attempts,
+    _v7_search,
+    _v8_bank_version,
+    _v9_correct_idx,
+    _v10_attempt_seed,
+    _v11_adaptive,
+    _v12_reviews,
+    _v13_sessions,
+    _v14_progress,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def migrate(conn):
+    """تطبيق الترحيلات الناقصة بالترتيب، كل واحدة في معاملة مستقلة."""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute('BEGIN')
+        try:
+            step(conn)
+            conn.execute(f'PRAGMA user_version={number}')
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+    return version
+
+def get_or_create_passage(conn, text, cache=None):
+    """إرجاع معرّف القطعة بعد إدخالها مرة واحدة فقط حسب مفتاح المحتوى."""
+    text = text.strip()
+    if not text:
+        return None
+    key = passage_hash(text)
+    if cache is not None and key in cache:
+        return cache[key]
+    conn.execute('INSERT OR IGNORE INTO Passages (content_hash, passage_text) VALUES (?, ?)', (key, text))
+    p_id = conn.execute('SELECT id FROM Passages WHERE content_hash=?', (key,)).fetchone()[0]
+    if cache is not None:
+        cache[key] = p_id
+    return p_id
+
+def migrate_inline_passages(conn):
+    """نقل النصوص المخزنة داخل كل سؤال إلى جدول Passages وتفريغ العمود القديم."""
+    rows = conn.execute("SELECT id, passage_text FROM Questions WHERE passage_text IS NOT NULL AND passage_text != ''").fetchall()
+    if not rows:
+        return 0
+    cache = {}
+    conn.executemany(
+        "UPDATE Questions SET passage_id=?, passage_text='' WHERE id=?",
+        [(get_or_create_passage(conn, text, cache), q_id) for q_id, text in rows]
+    )
+    return len(rows)
+
+def backfill_natural_keys(conn):
+    """حساب المفتاح الطبيعي للصفوف القديمة وحذف التكرارات (يبقى أقدم صف)."""
+    rows = conn.execute('''
+        SELECT id, subject, question_text, option_a, option_b, option_c, option_d
+        FROM Questions WHERE natural_key IS NULL ORDER BY id
+    ''').fetchall()
+    if not rows:
+        return 0
+    seen = dict(conn.execute('SELECT natural_key, id FROM Questions WHERE natural_key IS NOT NULL'))
+    updates, duplicates = [], []
+    for q_id, *fields in rows:
+        key = natural_key(*fields)
+        if key in seen:
+            duplicates.append((q_id,))
+        else:
+            seen[key] = q_id
+            updates.append((key, q_id))
+    conn.executemany('DELETE FROM Questions WHERE id=?', duplicates)
+    conn.executemany('UPDATE Questions SET natural_key=? WHERE id=?', updates)
+    return len(duplicates)
+
+def rebuild_search_index(conn):
+    """إعادة بناء الفهرس النصي بالكامل من Questions (بعد استيراد كبير أو عند الشك في تزامنه)."""
+    question, passage = _search_columns('q')
+    conn.execute('DELETE FROM QuestionsFTS')
+    conn.execute(f'INSERT INTO QuestionsFTS(rowid, question, passage) SELECT q.id, {question}, {passage} FROM Questions q')
+    conn.execute("INSERT INTO QuestionsFTS(QuestionsFTS) VALUES('optimize')")
+    return conn.execute('SELECT COUNT(*) FROM QuestionsFTS').fetchone()[0]
+
+_migrated = set()
+_lock = threading.Lock()
+
+def init_db(db_path=DB_NAME):
+    """تهيئة قاعدة البيانات وتطبيق الترحيلات مرة واحدة لكل عملية."""
+    if db_path in _migrated:
+        return
+    with _lock:
+        if db_path in _migrated:
+            return
+        conn = sqlite3.connect(db_path, isolation_level=None, timeout=BUSY_TIMEOUT)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            migrate(conn)
+        finally:
+            conn.close()
+        _migrated.add(db_path)
+
+# ==========================================
+# مجمع الاتصالات المشترك لعملية الخادم
+# ==========================================
+
+READER_POOL_SIZE = 8
+MMAP_SIZE = 256 * 1024 * 1024
+CACHED_STATEMENTS = 256
+
+class ConnectionPool:
+    """اتصالات قراءة فقط يعاد استخدامها بين خيوط Streamlit، مع اتصال كتابة واحد."""
+
+    def __init__(self, db_path, size=READER_POOL_SIZE):
+        init_db(db_path)
+        self.db_path = db_path
+        self.size = size
+        self._uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._writer_lock = threading.Lock()
+        # اتصال الكتابة يبقى مفتوحاً طوال عمر العملية فيبقي ملفات WAL موجودة للقرّاء
+        self._writer = self._connect(db_path, uri=False)
+
+    def _connect(self, target, uri):
+        conn = sqlite3.connect(target, uri=uri, check_same_thread=False, timeout=BUSY_TIMEOUT,
+                               cached_statements=CACHED_STATEMENTS, isolation_level=None,
+                               factory=connection_class('read' if uri else 'write'))
+        conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+        return conn
+
+    @contextmanager
+    def read(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect(self._uri, uri=True)
+        try:
+            yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def writer(self):
+        """اتصال الكتابة الوحيد دون فتح معاملة؛ للعمليات التي تدير معاملاتها بنفسها."""
+        with self._writer_lock:
+            yield self._writer
+
+    @contextmanager
+    def write(self):
+        with self.writer() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path=DB_NAME):
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = _pools[db_path] = ConnectionPool(db_path)
+    return pool
+
+def read(db_path=DB_NAME):
+    return get_pool(db_path).read()
+
+def write(db_path=DB_NAME):
+    return get_pool(db_path).write()
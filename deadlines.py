@@ -0,0 +1,88 @@
+import heapq
+import threading
+import time
+
+from db import DB_NAME
+from attempts import active_deadlines, expire_sessions, finalize_attempt
+
+# ==========================================
+# جدولة المواعيد النهائية في الخادم
+# ==========================================
+# الخادم هو المرجع في انتهاء الوقت: خيط خلفي يصحّح كل محاولة عند موعدها ويحفظ
+# نتيجتها، سواء كان المتصفح متصلاً أم لا، دون الاعتماد على نقرة من الطالب.
+
+GRACE_SECONDS = 2  # مهلة قصيرة حتى تصل إجابات اللحظة الأخيرة من طابور الكتابة
+CLEANUP_INTERVAL = 3600  # ثوانٍ بين دورات حذف رموز الجلسات المنتهية (expire_sessions)
+CLEANUP = 0  # رقم "محاولة" في الكومة يعني دورة تنظيف (أرقام المحاولات تبدأ من 1)
+
+class DeadlineScheduler:
+    """كومة (heap) من (موعد الانتهاء، رقم المحاولة) يخدمها خيط واحد."""
+
+    def __init__(self, db_path=DB_NAME):
+        self.db_path = db_path
+        self.finalized = 0
+        self._heap = []
+        self._cond = threading.Condition()
+        # المحاولات النشطة من قبل إعادة تشغيل الخادم تُجدول من جديد
+        for end_time, attempt_id in active_deadlines(db_path):
+            self._heap.append((end_time, attempt_id))
+        self._heap.append((time.time(), CLEANUP))
+        heapq.heapify(self._heap)
+        self._thread = threading.Thread(target=self._run, name='vexsam-deadlines', daemon=True)
+        self._thread.start()
+
+    def schedule(self, attempt_id, end_time):
+        with self._cond:
+            heapq.heappush(self._heap, (end_time, attempt_id))
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return sum(attempt_id != CLEANUP for _, attempt_id in self._heap)
+
+    def _next_due(self):
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                end_time, attempt_id = self._heap[0]
+                delay = end_time + GRACE_SECONDS - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                return attempt_id
+
+    def _run(self):
+        while True:
+            attempt_id = self._next_due()
+            if attempt_id == CLEANUP:
+                try:
+                    expire_sessions(db_path=self.db_path)
+                except Exception as e:
+                    print(f"خطأ: تعذر حذف رموز الجلسات المنتهية: {e}")
+                self.schedule(CLEANUP, time.time() + CLEANUP_INTERVAL)
+                continue
+            try:
+                # المحاولات التي سلّمها الطالب بنفسه تُتجاهل (finalize_attempt تعيد None)
+                if finalize_attempt(attempt_id, self.db_path) is not None:
+                    self.finalized += 1
+            except Exception as e:
+                print(f"خطأ: تعذر إنهاء المحاولة {attempt_id} عند انتهاء وقتها: {e}")
+
+
+_schedulers = {}
+_lock = threading.Lock()
+
+def get_scheduler(db_path=DB_NAME):
+    scheduler = _schedulers.get(db_path)
+    if scheduler is None:
+        with _lock:
+            scheduler = _schedulers.get(db_path)
+            if scheduler is None:
+                scheduler = _schedulers[db_path] = DeadlineScheduler(db_path)
+    return scheduler
+
+def schedule_deadline(attempt_id, end_time, db_path=DB_NAME):
+    get_scheduler(db_path).schedule(attempt_id, end_time)
@@ -0,0 +1,49 @@
+import hashlib
+import random
+from array import array
+from functools import lru_cache
+
+from metrics import timed
+
+# ==========================================
+# توليد الامتحان من بذرة (قابل لإعادة الإنتاج)
+# ==========================================
+# البذرة = دالة (اسم الطالب، رقم المحاولة)، أو بذرة عشوائية للامتحانات المولّدة مسبقاً
+# في exam_pool (تُحفظ مع المحاولة في الحالتين). منها يُشتق كل ما رآه الطالب:
+#   - اختيار الأسئلة المتوازن على الأقسام (QuestionBank.sample بمولّد random.Random(seed))
+#   - ترتيب الخيارات لكل سؤال (مستقل عن البنك: يعتمد على البذرة وعدد الأسئلة فقط)
+# مولّد random.Random ثابت عبر إصدارات بايثون لنفس البذرة، بخلاف ORDER BY RANDOM().
+
+N_OPTIONS = 4
+
+def exam_seed(student_name, attempt_id):
+    """بذرة 63 بت ثابتة لـ (الطالب، المحاولة)."""
+    digest = hashlib.blake2b(f'{student_name.strip()}\x1f{attempt_id}'.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') >> 1
+
+@timed('generate_questions')
+def generate_questions(bank, subject, total, seed):
+    """معرّفات أسئلة الامتحان لبذرة معينة؛ نفس البنك ونفس البذرة يعطيان نفس القائمة بنفس الترتيب."""
+    return array('q', bank.sample(subject, total, rng=random.Random(seed), group_passages=True))
+
+@lru_cache(maxsize=256)
+def option_order(seed, n_questions):
+    """ترتيب عرض الخيارات: array('b') بطول 4 × عدد الأسئلة، كل أربعة أرقام تبديل لـ 0-3.
+
+    القيمة في الموضع k هي رقم الخيار الأصلي المعروض في المكان k، فالإجابة المحفوظة
+    تبقى رقم الخيار الأصلي ولا يتغير التصحيح.
+    """
+    rng = random.Random(f'{seed}/options')
+    order = array('b')
+    perm = list(range(N_OPTIONS))
+    for _ in range(n_questions):
+        rng.shuffle(perm)
+        order.extend(perm)
+    return order
+
+def displayed_options(seed, n_questions, position):
+    """أرقام الخيارات الأصلية بترتيب عرضها للسؤال في الموضع position."""
+    if seed is None:  # محاولات أُنشئت قبل التوليد بالبذرة
+        return range(N_OPTIONS)
+    start = position * N_OPTIONS
+    return option_order(seed, n_questions)[start:start + N_OPTIONS]
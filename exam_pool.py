@@ -0,0 +1,129 @@
+import secrets
+import threading
+import time
+from collections import deque
+
+from db import DB_NAME
+from exam_generator import generate_questions
+from question_bank import get_bank
+
+# ==========================================
+# مجمع امتحانات جاهزة لساعة بدء الامتحان
+# ==========================================
+# خيط خلفي يبقي لكل (مادة، عدد أسئلة) عدداً محدوداً من الامتحانات المولّدة مسبقاً،
+# فبدء الامتحان يصبح سحباً O(1) من طابور. كل امتحان في المجمع له بذرة عشوائية
+# خاصة به تُحفظ مع المحاولة، فيبقى قابلاً لإعادة البناء كأي امتحان آخر.
+
+QUESTION_COUNTS = (20, 40, 60, 80, 100)
+POOL_SIZE = 32            # أقصى عدد امتحانات جاهزة لكل (مادة، عدد)
+LATENCY_WINDOW = 1000     # عدد أزمنة التوليد المحفوظة لحساب الوسيط وp95
+IDLE_CHECK = 5.0          # ثوانٍ: إعادة فحص نسخة البنك عندما يكون المجمع ممتلئاً
+
+class PooledExam:
+    __slots__ = ('seed', 'question_ids', 'bank_version')
+
+    def __init__(self, seed, question_ids, bank_version):
+        self.seed = seed
+        self.question_ids = question_ids
+        self.bank_version = bank_version
+
+
+class ExamPool:
+    """طوابير امتحانات جاهزة لكل (مادة، عدد) مع مقاييس الإصابة والإخفاق وزمن التعبئة."""
+
+    def __init__(self, db_path=DB_NAME, size=POOL_SIZE, counts=QUESTION_COUNTS):
+        self.db_path = db_path
+        self.size = size
+        self.counts = counts
+        self._queues = {}
+        self._cond = threading.Condition()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.generated = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._thread = threading.Thread(target=self._run, name='vexsam-exam-pool', daemon=True)
+        self._thread.start()
+
+    def take(self, subject, total):
+        """امتحان جاهز، أو None عند الإخفاق (فيُولَّد الامتحان عند الطلب كالمعتاد)."""
+        version = get_bank(self.db_path).version
+        with self._cond:
+            queue = self._queues.get((subject, total))
+            exam = queue.popleft() if queue else None
+            if exam is not None and exam.bank_version != version:
+                # البنك تغيّر: كل ما في الطابور قديم
+                self.stale += len(queue) + 1
+                queue.clear()
+                exam = None
+            if exam is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self._cond.notify()
+        return exam
+
+    def stats(self):
+        with self._cond:
+            latencies = sorted(self._latencies)
+            ready = {key: len(queue) for key, queue in self._queues.items()}
+            hits, misses = self.hits, self.misses
+            stats = {
+                'hits': hits, 'misses': misses, 'stale': self.stale, 'generated': self.generated,
+                'hit_rate': hits / (hits + misses) if hits + misses else None,
+                'ready': ready,
+            }
+        if latencies:
+            stats['refill_ms_p50'] = latencies[len(latencies) // 2] * 1000
+            stats['refill_ms_p95'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            stats['refill_ms_max'] = latencies[-1] * 1000
+        return stats
+
+    def _next_key(self, bank):
+        # أكثر الطوابير نقصاً أولاً، حتى تتوزع التعبئة بعد موجة سحب على مادة واحدة
+        with self._cond:
+            while True:
+                if any(q and q[0].bank_version != bank.version for q in self._queues.values()):
+                    self.stale += sum(len(q) for q in self._queues.values())
+                    self._queues.clear()
+                keys = [(s, n) for s in bank.sections for n in self.counts]
+                for key in keys:
+                    self._queues.setdefault(key, deque())
+                short = [key for key in keys if len(self._queues[key]) < self.size]
+                if short:
+                    return min(short, key=lambda k: len(self._queues[k]))
+                if not self._cond.wait(IDLE_CHECK):
+                    return None  # انتهت المهلة: نعيد فحص البنك
+
+    def _run(self):
+        while True:
+            try:
+                bank = get_bank(self.db_path)
+                key = self._next_key(bank)
+                if key is None:
+                    continue
+                t = time.perf_counter()
+                seed = secrets.randbits(63)
+                exam = PooledExam(seed, generate_questions(bank, key[0], key[1], seed), bank.version)
+                elapsed = time.perf_counter() - t
+                with self._cond:
+                    if exam.question_ids:
+                        self._queues.setdefault(key, deque()).append(exam)
+                    self.generated += 1
+                    self._latencies.append(elapsed)
+            except Exception as e:
+                print(f"خطأ: تعذر تعبئة مجمع الامتحانات: {e}")
+                time.sleep(IDLE_CHECK)
+
+
+_pools = {}
+_lock = threading.Lock()
+
+def get_exam_pool(db_path=DB_NAME):
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = _pools[db_path] = ExamPool(db_path)
+    return pool
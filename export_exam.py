@@ -0,0 +1,124 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+
+from attempts import create_attempt, finalize_attempt
+from db import DB_NAME, read, write
+from exam_generator import displayed_options
+from question_bank import get_bank
+
+# ==========================================
+# تصدير امتحان كحزمة ثابتة للمراكز ضعيفة الاتصال
+# ==========================================
+# لكل طالب تُنشأ محاولة عادية (نفس التوليد بالبذرة، فتبقى قابلة لإعادة البناء)، ثم
+# تُكتب الأسئلة وترتيب خياراتها في ملف HTML واحد (JSON مضغوط gzip + base64 مع عميل
+# static/offline_exam.html). التنقل والمؤقت والحفظ في المتصفح، ولا يتصل الطالب بالخادم
+# إلا مرة واحدة: رفع ورقة الإجابات في صفحة التسليم (ingest_sheet).
+# الإجابة الصحيحة لا تُضمَّن في الحزمة.
+
+EXAM_MINUTES = 60
+VALID_DAYS = 7        # المحاولة تبقى مفتوحة للتسليم هذه المدة ثم يُنهيها الخادم (deadlines.py)
+PASS_MARK = 50
+EXPORT_DIR = "exports"
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'offline_exam.html')
+
+class SheetError(ValueError):
+    """ورقة إجابات لا يمكن قبولها (محاولة غير موجودة، رمز خاطئ، أو سُلّمت مسبقاً)."""
+
+def submit_token(seed, attempt_id):
+    # مشتق من البذرة التي لا تغادر الخادم: يمنع تسليم ورقة باسم محاولة أخرى
+    return hashlib.blake2b(f'{seed}/{attempt_id}/submit'.encode(), digest_size=8).hexdigest()
+
+def bundle_payload(bank, attempt_id, student_name, subject, seed, question_ids, minutes=EXAM_MINUTES):
+    """بيانات الحزمة: الأسئلة بترتيب العرض، وكل قطعة مرة واحدة."""
+    passages, questions = {}, []
+    for pos, q_id in enumerate(question_ids):
+        q = bank.get(q_id)
+        passage = -1
+        if q[3] is not None:
+            passage = passages.setdefault(q[3], len(passages))
+        order = list(displayed_options(seed, len(question_ids), pos))
+        questions.append([q[2], passage, q[4], [q[5 + k] for k in order], order])
+    return {
+        'attempt': attempt_id, 'student': student_name, 'subject': subject, 'minutes': minutes,
+        'token': submit_token(seed, attempt_id), 'rtl': subject != 'اللغة الإنجليزية',
+        'passages': [bank.passage(p_id) for p_id in passages], 'questions': questions,
+    }
+
+def render_bundle(payload):
+    data = gzip.compress(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), mtime=0)
+    with open(TEMPLATE, encoding='utf-8') as f:
+        return f.read().replace('__PAYLOAD__', base64.b64encode(data).decode('ascii'))
+
+def export_exam(student_name, subject, total, out_dir=EXPORT_DIR, minutes=EXAM_MINUTES, pass_mark=PASS_MARK, db_path=DB_NAME):
+    """إنشاء محاولة وحزمتها؛ يعيد (رقم المحاولة، مسار الملف) أو None إذا لم توجد أسئلة للمادة."""
+    student_name = student_name.strip()
+    created = create_attempt(student_name, subject, pass_mark, total, time.time() + VALID_DAYS * 86400,
+                             db_path, mode='offline')
+    if created is None:
+        return None
+    attempt_id, seed, question_ids = created
+    html = render_bundle(bundle_payload(get_bank(db_path), attempt_id, student_name, subject, seed, question_ids, minutes))
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f'exam_{attempt_id}.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return attempt_id, path
+
+def ingest_sheet(sheet, db_path=DB_NAME):
+    """تسليم ورقة إجابات حزمة ثابتة: حفظ الإجابات دفعة واحدة ثم تصحيح المحاولة.
+
+    يعيد (رقم المحاولة، اسم الطالب، الدرجة، عدد الأسئلة)؛ SheetError إذا رُفضت الورقة.
+    """
+    try:
+        attempt_id, token, answers = int(sheet['attempt']), str(sheet['token']), list(sheet['answers'])
+    except (KeyError, TypeError, ValueError):
+        raise SheetError("ملف ليس ورقة إجابات")
+    with read(db_path) as conn:
+        row = conn.execute('SELECT student_name, question_ids, seed, mode, status FROM Attempts WHERE id=?',
+                           (attempt_id,)).fetchone()
+    if row is None or row[3] != 'offline':
+        raise SheetError(f"لا توجد محاولة مصدَّرة بالرقم {attempt_id}")
+    if token != submit_token(row[2], attempt_id):
+        raise SheetError("رمز الورقة لا يطابق المحاولة")
+    if row[4] != 'active':
+        raise SheetError("سُلّمت هذه المحاولة مسبقاً أو انتهت مهلتها")
+    question_ids = [int(q_id) for q_id in row[1].split(',')]
+    if len(answers) != len(question_ids) or any(type(a) is not int or not -1 <= a <= 3 for a in answers):
+        raise SheetError("عدد الإجابات أو قيمها لا تطابق المحاولة")
+    now = time.time()
+    with write(db_path) as conn:
+        conn.executemany(
+            'INSERT INTO AttemptAnswers (attempt_id, position, question_id, answer_idx, answered_at) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT(attempt_id, position) DO UPDATE SET answer_idx=excluded.answer_idx, answered_at=excluded.answered_at',
+            [(attempt_id, pos, q_id, ans, now) for pos, (q_id, ans) in enumerate(zip(question_ids, answers)) if ans >= 0]
+        )
+    score = finalize_attempt(attempt_id, db_path)
+    if score is None:
+        raise SheetError("سُلّمت هذه المحاولة مسبقاً")
+    return attempt_id, row[0], score, len(question_ids)
+
+if __name__ == "__main__":
+    # python export_exam.py المادة عدد_الأسئلة اسم_الطالب [اسم_طالب ...]
+    # python export_exam.py --ingest answers_12.json [answers_13.json ...]
+    if sys.argv[1:2] == ["--ingest"]:
+        for path in sys.argv[2:]:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    attempt_id, name, score, total = ingest_sheet(json.load(f))
+                print(f"{path}: المحاولة {attempt_id} ({name}) — {score} / {total}")
+            except (OSError, ValueError) as e:
+                print(f"خطأ: {path}: {e}")
+    elif len(sys.argv) >= 4:
+        subject, total = sys.argv[1], int(sys.argv[2])
+        for name in sys.argv[3:]:
+            result = export_exam(name, subject, total)
+            if result is None:
+                sys.exit(f"خطأ: لا توجد أسئلة للمادة {subject}.")
+            print(f"{name}: المحاولة {result[0]} -> {result[1]} ({os.path.getsize(result[1]) // 1024} KB)")
+    else:
+        print("الاستخدام: python export_exam.py المادة عدد_الأسئلة اسم [اسم ...]  أو  --ingest ملف.json [...]")
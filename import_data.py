@@ -1,67 +1,179 @@
-import sqlite3
 import csv
 import os
+import sys
+from itertools import islice
 
-DB_NAME = "exam_simulator.db"
-
-def init_db():
-    """تهيئة قاعدة البيانات وإنشاء الجدول بالهيكلية الجديدة إذا لم يكن موجوداً."""
-    with sqlite3.connect(DB_NAME) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                subject TEXT,
-                section TEXT DEFAULT 'عام',
-                passage_text TEXT DEFAULT '',
-                question_text TEXT,
-                option_a TEXT,
-                option_b TEXT,
-                option_c TEXT,
-                option_d TEXT,
-                correct_option TEXT
+from bank_lint import check_row
+from db import DB_NAME, get_pool, get_or_create_passage, natural_key, rebuild_search_index
+
+CHUNK_SIZE = 5000
+
+# أعمدة جدول الاستيراد المؤقت بنفس ترتيب القيم في parse_row
+STAGING_COLUMNS = ('natural_key', 'subject', 'section', 'passage_id', 'question_text',
+                   'option_a', 'option_b', 'option_c', 'option_d', 'correct_idx')
+
+CSV_FIELDS = ('subject', 'section', 'passage_text', 'question_text',
+              'option_a', 'option_b', 'option_c', 'option_d', 'correct_option')
+
+def field_getter(header):
+    """دالة تعيد حقول الصف بترتيب CSV_FIELDS ('' للأعمدة غير الموجودة في الملف)."""
+    positions = {name.strip(): i for i, name in enumerate(header)}
+    index = [positions.get(name) for name in CSV_FIELDS]
+    def get(row):
+        return [row[i].strip() if i is not None and i < len(row) else '' for i in index]
+    return get
+
+class RowError(ValueError):
+    """صف مرفوض عند الاستيراد؛ الرسالة هي سبب الرفض في التقرير."""
+
+def correct_index(options, correct):
+    """رقم الخيار الذي يطابق نص الإجابة الصحيحة، أو RowError إذا لم يطابق خياراً واحداً بالضبط."""
+    matches = [i for i, opt in enumerate(options) if opt == correct]
+    if not matches:
+        raise RowError("نص الإجابة الصحيحة لا يطابق أي خيار")
+    if len(matches) > 1:
+        raise RowError("نص الإجابة الصحيحة مكرر في أكثر من خيار")
+    return matches[0]
+
+def parse_row(conn, fields, passage_ids):
+    """تحويل حقول الصف إلى قيم جاهزة للإدخال، أو RowError مع سبب الرفض."""
+    subject, section, passage, question_text, a, b, c, d, correct = fields
+    if not subject or not question_text or not correct:
+        raise RowError("نقص في البيانات الأساسية")
+    correct_idx = correct_index((a, b, c, d), correct)
+    # فحوص bank_lint للصف الواحد (خيار فارغ بين الخيارات، خيارات مكررة، HTML قابل للتنفيذ):
+    # الأخطاء تمنع الإدخال، والتحذيرات وتكرار الأسئلة يراجعها python bank_lint.py
+    for check, severity, field, message in check_row(subject, question_text, (a, b, c, d), correct_idx,
+                                                     passage if passage not in passage_ids else None):
+        if severity == 'error':
+            raise RowError(message)
+    # ذاكرة القطع مفهرسة بالنص نفسه حتى لا يُعاد حساب التجزئة لكل سؤال من أسئلة القطعة
+    passage_id = passage_ids.get(passage) if passage else None
+    if passage and passage not in passage_ids:
+        passage_id = passage_ids[passage] = get_or_create_passage(conn, passage)
+    return (natural_key(subject, question_text, a, b, c, d), subject, section or 'قسم عام',
+            passage_id, question_text, a, b, c, d, correct_idx)
+
+def bulk_import_csv(csv_file_path, db_path=DB_NAME, chunk_size=CHUNK_SIZE):
+    """استيراد جماعي داخل معاملة واحدة مع upsert حسب المفتاح الطبيعي.
+
+    يُقرأ الملف على دفعات تُدخَل بـ executemany في جدول مؤقت، ثم تُطبَّق
+    الإضافات والتعديلات على Questions بعبارتين فقط. إعادة استيراد نفس الملف
+    لا تُنشئ أي تكرار. تُعاد أعداد الصفوف المضافة والمعدلة وغير المتغيرة،
+    وفي 'rejected' قائمة (رقم الصف، السبب، نص السؤال) للصفوف المرفوضة.
+    """
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'rejected': []}
+    with get_pool(db_path).writer() as conn:
+        # إعدادات مخصصة لعملية التحميل فقط، تُعاد إلى قيمها بعد الانتهاء
+        saved = {p: conn.execute(f'PRAGMA {p}').fetchone()[0] for p in ('synchronous', 'temp_store', 'cache_size')}
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-262144')
+        try:
+            _load(conn, csv_file_path, chunk_size, stats)
+        finally:
+            for pragma, value in saved.items():
+                conn.execute(f'PRAGMA {pragma}={value}')
+    return stats
+
+def _load(conn, csv_file_path, chunk_size, stats):
+    conn.execute('BEGIN')
+    try:
+        conn.execute(f'''
+            CREATE TEMP TABLE Staging (
+                natural_key TEXT PRIMARY KEY, subject TEXT, section TEXT, passage_id INTEGER,
+                question_text TEXT, option_a TEXT, option_b TEXT, option_c TEXT, option_d TEXT,
+                correct_idx INTEGER
             )
         ''')
-        conn.commit()
+        placeholders = ','.join('?' * len(STAGING_COLUMNS))
+        passage_ids = {}  # نص القطعة -> id: كل قطعة تُخزَّن مرة واحدة مهما تكررت في الملف
+
+        with open(csv_file_path, 'r', encoding='utf-8-sig', newline='') as file:
+            csv_reader = csv.reader(file)
+            get_fields = field_getter(next(csv_reader, []))
+            reader = enumerate(csv_reader, start=2)
+            while True:
+                chunk = list(islice(reader, chunk_size))
+                if not chunk:
+                    break
+                batch = []
+                for row_num, row in chunk:
+                    fields = get_fields(row)
+                    try:
+                        batch.append(parse_row(conn, fields, passage_ids))
+                    except RowError as e:
+                        stats['rejected'].append((row_num, str(e), fields[3]))
+                        stats['skipped'] += 1
+                # عند تكرار السؤال داخل الملف نفسه يُعتمد آخر ظهور له
+                conn.executemany(f'INSERT OR REPLACE INTO Staging VALUES ({placeholders})', batch)
+
+        changed = '(q.section, q.passage_id, q.correct_idx) IS NOT (s.section, s.passage_id, s.correct_idx)'
+        total = conn.execute('SELECT COUNT(*) FROM Staging').fetchone()[0]
+        stats['updated'] = conn.execute(
+            f'SELECT COUNT(*) FROM Staging s JOIN Questions q ON q.natural_key = s.natural_key WHERE {changed}'
+        ).fetchone()[0]
+        stats['inserted'] = conn.execute(
+            'SELECT COUNT(*) FROM Staging s WHERE NOT EXISTS (SELECT 1 FROM Questions q WHERE q.natural_key = s.natural_key)'
+        ).fetchone()[0]
+        stats['unchanged'] = total - stats['inserted'] - stats['updated']
+
+        conn.execute(f'''
+            UPDATE Questions AS q
+            SET section = s.section, passage_id = s.passage_id, correct_idx = s.correct_idx
+            FROM Staging s
+            WHERE q.natural_key = s.natural_key AND {changed}
+        ''')
+        columns = ', '.join(STAGING_COLUMNS)
+        conn.execute(f'''
+            INSERT INTO Questions ({columns})
+            SELECT {columns} FROM Staging s
+            WHERE NOT EXISTS (SELECT 1 FROM Questions q WHERE q.natural_key = s.natural_key)
+            ORDER BY s.rowid
+        ''')
+        conn.execute('DROP TABLE temp.Staging')
+        conn.execute('COMMIT')
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
 
 def import_real_questions_from_csv(csv_file_path):
     if not os.path.exists(csv_file_path):
         print(f"خطأ: الملف {csv_file_path} غير موجود. تأكد من مسار الملف.")
         return
 
-    # إنشاء الجدول أولاً لتجنب خطأ OperationalError
-    init_db()
-
-    with sqlite3.connect(DB_NAME) as conn:
-        cursor = conn.cursor()
-        
-        with open(csv_file_path, 'r', encoding='utf-8-sig') as file:
-            reader = csv.DictReader(file)
-            inserted_count = 0
-            
-            for row_num, row in enumerate(reader, start=2):
-                if not row.get('subject') or not row.get('question_text') or not row.get('correct_option'):
-                    print(f"تحذير: تم تخطي الصف رقم {row_num} بسبب نقص في البيانات الأساسية.")
-                    continue
-                    
-                cursor.execute('''
-                    INSERT INTO Questions (subject, section, passage_text, question_text, option_a, option_b, option_c, option_d, correct_option)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row['subject'].strip(),
-                    row.get('section', 'قسم عام').strip(),
-                    row.get('passage_text', '').strip(),
-                    row['question_text'].strip(), 
-                    row['option_a'].strip(), 
-                    row['option_b'].strip(), 
-                    row['option_c'].strip(), 
-                    row['option_d'].strip(), 
-                    row['correct_option'].strip()
-                ))
-                inserted_count += 1
-        
-        conn.commit()
-        print(f"تم إدخال {inserted_count} سؤال إلى قاعدة البيانات بنجاح.")
+    stats = bulk_import_csv(csv_file_path)
+    print(f"تم الاستيراد: {stats['inserted']} جديد، {stats['updated']} معدَّل، "
+          f"{stats['unchanged']} بدون تغيير، {stats['skipped']} متخطى.")
+    if stats['rejected']:
+        report = write_rejection_report(csv_file_path, stats['rejected'])
+        print(f"تقرير الصفوف المرفوضة: {report}")
+    return stats
+
+def write_rejection_report(csv_file_path, rejected):
+    """كتابة الصفوف المرفوضة في ملف CSV بجانب الملف المستورد وإرجاع مساره."""
+    report = os.path.splitext(csv_file_path)[0] + '_rejected.csv'
+    with open(report, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['row', 'reason', 'question_text'])
+        writer.writerows(rejected)
+    for row_num, reason, question_text in rejected[:20]:
+        print(f"تحذير: رُفض الصف رقم {row_num}: {reason}.")
+    if len(rejected) > 20:
+        print(f"... و{len(rejected) - 20} صفاً آخر.")
+    return report
+
+def rebuild_search(db_path=DB_NAME):
+    # المشغّلات تبقي الفهرس متزامناً؛ إعادة البناء للإصلاح أو بعد تعديل Questions من خارج التطبيق
+    with get_pool(db_path).write() as conn:
+        count = rebuild_search_index(conn)
+    print(f"تمت إعادة بناء فهرس البحث: {count} سؤال.")
+    return count
 
 if __name__ == "__main__":
-    import_real_questions_from_csv("real_questions.csv")
\ No newline at end of file
+    # python import_data.py [ملف.csv]   أو   python import_data.py --rebuild-search
+    if sys.argv[1:2] == ["--rebuild-search"]:
+        rebuild_search()
+    else:
+        import_real_questions_from_csv(sys.argv[1] if len(sys.argv) > 1 else "real_questions.csv")
@@ -0,0 +1,241 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+import tomllib
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, wraps
+
+# ==========================================
+# القياس: زمن المراحل واستعلامات SQLite والجلسات
+# ==========================================
+# يُفعَّل من metrics.toml بجانب التطبيق، أو من متغيرات البيئة VEXSAM_METRICS_ENABLED و
+# VEXSAM_METRICS_PATH و VEXSAM_METRICS_INTERVAL (تتقدم على الملف). لا يوضع في .streamlit/config.toml:
+# Streamlit يرفض الأقسام التي لا يعرفها ويحذّر منها عند كل بدء. عند التعطيل تعيد timed الدالة نفسها و span سياقاً فارغاً
+# ويعيد connection_class صنف sqlite3 الأصلي، فلا كلفة على الإطلاق في مسار الطلب.
+# عند التفعيل يكتب خيط خلفي ملف نص بصيغة Prometheus كل interval ثانية، بشكل ذري، إلى
+# path (افتراضياً metrics/{port}.prom بجانب التطبيق، ويُجمع بمجمّع textfile في node_exporter).
+# لا يوضع تحت static/: كل ما فيه يخدمه Streamlit لأي زائر، ومنهم الطلاب.
+# كل عامل في serve.py يكتب ملفه بوسم worker.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CONFIG = os.path.join(ROOT, 'metrics.toml')
+ENV_PREFIX = 'VEXSAM_METRICS_'
+DEFAULTS = {'enabled': False, 'path': 'metrics/{port}.prom', 'interval': 15}
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # ثوانٍ
+
+@lru_cache(maxsize=1)
+def settings():
+    try:
+        with open(CONFIG, 'rb') as f:
+            config = {**DEFAULTS, **tomllib.load(f)}
+    except (OSError, tomllib.TOMLDecodeError):
+        config = dict(DEFAULTS)
+    for key in DEFAULTS:
+        value = os.environ.get(ENV_PREFIX + key.upper())
+        if value is not None:
+            config[key] = _env_value(key, value)
+    return config
+
+def _env_value(key, value):
+    if key == 'enabled':
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    if key == 'interval':
+        return float(value)
+    return value
+
+def enabled():
+    return bool(settings()['enabled'])
+
+# ==========================================
+# العدّادات
+# ==========================================
+
+_lock = threading.Lock()
+_spans = {}      # الاسم -> [عدد لكل حد من BUCKETS ثم +Inf، المجموع]
+_queries = {}    # نوع الاتصال -> [العدد، الزمن]
+_gauges = {}     # الاسم -> (الوصف، دالة تعيد القيمة)
+
+def observe(name, seconds):
+    with _lock:
+        entry = _spans.get(name)
+        if entry is None:
+            entry = _spans[name] = [[0] * (len(BUCKETS) + 1), 0.0]
+        entry[0][bisect_left(BUCKETS, seconds)] += 1
+        entry[1] += seconds
+    get_exporter()
+
+def timed(name):
+    """مزخرف يسجل زمن كل استدعاء تحت name؛ يعيد الدالة كما هي إذا كان القياس معطلاً."""
+    def decorate(fn):
+        if not enabled():
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+@contextmanager
+def _span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+def span(name):
+    """سياق يسجل زمن الكتلة تحت name (لأجزاء لا تكون دالة مستقلة)."""
+    return _span(name) if enabled() else nullcontext()
+
+def gauge(name, description, fn):
+    """قيمة لحظية تُقرأ عند كل تصدير (fn بلا معاملات؛ None أو استثناء يحذفها من الملف)."""
+    _gauges[name] = (description, fn)
+
+def _query(role, seconds):
+    with _lock:
+        entry = _queries.setdefault(role, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+class _TimedConnection(sqlite3.Connection):
+    """اتصال يعدّ استدعاءات execute و executemany وزمنها (حتى أول صف في SELECT)."""
+    role = 'read'
+
+    def execute(self, *args):
+        start = time.perf_counter()
+        try:
+            return super().execute(*args)
+        finally:
+            _query(self.role, time.perf_counter() - start)
+
+    def executemany(self, *args):
+        start = time.perf_counter()
+        try:
+            return super().executemany(*args)
+        finally:
+            _query(self.role, time.perf_counter() - start)
+
+class _TimedWriteConnection(_TimedConnection):
+    role = 'write'
+
+def connection_class(role):
+    """صنف الاتصال لـ sqlite3.connect(factory=...): 'read' أو 'write'."""
+    if not enabled():
+        return sqlite3.Connection
+    return _TimedWriteConnection if role == 'write' else _TimedConnection
+
+# ==========================================
+# التصدير بصيغة Prometheus
+# ==========================================
+
+def _port():
+    try:
+        import streamlit as st
+        return st.get_option('server.port')
+    except Exception:
+        return os.getpid()
+
+def _sessions():
+    # لا واجهة عامة لعدد الجلسات في Streamlit: إذا تغيّر مدير الجلسات الداخلي يُحذف المقياس
+    # من الملف (None) بدلاً من إفشال التصدير
+    from streamlit import runtime
+    if not runtime.exists():
+        return 0
+    manager = getattr(runtime.get_instance(), '_session_mgr', None)
+    count = getattr(manager, 'num_active_sessions', None)
+    return count() if callable(count) else None
+
+gauge('vexsam_sessions', 'جلسات المتصفح المتصلة بهذا العامل', _sessions)
+
+def render():
+    worker = f'worker="{_port()}"'
+    with _lock:
+        spans = {name: (list(counts), total) for name, (counts, total) in _spans.items()}
+        queries = {role: tuple(entry) for role, entry in _queries.items()}
+    lines = [
+        '# HELP vexsam_span_seconds زمن إعادة التشغيل والمراحل والمحمّلات',
+        '# TYPE vexsam_span_seconds histogram',
+    ]
+    for name, (counts, total) in sorted(spans.items()):
+        labels = f'{worker},name="{name}"'
+        cumulative = 0
+        for le, n in zip((*BUCKETS, '+Inf'), counts):
+            cumulative += n
+            lines.append(f'vexsam_span_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f'vexsam_span_seconds_sum{{{labels}}} {total:.6f}')
+        lines.append(f'vexsam_span_seconds_count{{{labels}}} {cumulative}')
+    lines += [
+        '# HELP vexsam_sqlite_queries_total استدعاءات execute/executemany على اتصالات المجمع',
+        '# TYPE vexsam_sqlite_queries_total counter',
+        *(f'vexsam_sqlite_queries_total{{{worker},conn="{role}"}} {n}' for role, (n, _) in sorted(queries.items())),
+        '# HELP vexsam_sqlite_query_seconds_total زمنها الكلي',
+        '# TYPE vexsam_sqlite_query_seconds_total counter',
+        *(f'vexsam_sqlite_query_seconds_total{{{worker},conn="{role}"}} {s:.6f}' for role, (_, s) in sorted(queries.items())),
+    ]
+    for name, (description, fn) in sorted(_gauges.items()):
+        try:
+            value = fn()
+        except Exception:
+            continue
+        if value is None:
+            continue
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} gauge', f'{name}{{{worker}}} {value}']
+    return '\n'.join(lines) + '\n'
+
+class Exporter:
+    """خيط خلفي يكتب render() إلى ملف كل interval ثانية (كتابة ذرية عبر ملف مؤقت)."""
+
+    def __init__(self, path, interval):
+        self.path = os.path.join(ROOT, path.format(port=_port(), pid=os.getpid()))
+        self.interval = interval
+        self._thread = threading.Thread(target=self._run, name='vexsam-metrics', daemon=True)
+        self._thread.start()
+
+    def write(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(render())
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.write()
+            except Exception as e:
+                print(f"خطأ: تعذر كتابة المقاييس إلى {self.path}: {e}")
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+def get_exporter():
+    global _exporter
+    if _exporter is None and enabled():
+        with _exporter_lock:
+            if _exporter is None:
+                config = settings()
+                _exporter = Exporter(config['path'], config['interval'])
+    return _exporter
+
+@atexit.register
+def _write_last():
+    if _exporter is not None:
+        try:
+            _exporter.write()
+        except OSError:
+            pass
+
+if __name__ == "__main__":
+    # python metrics.py: ما سيُكتب في ملف المقاييس لهذه العملية (للتحقق من الإعداد)
+    print(f"القياس {'مفعّل' if enabled() else 'معطّل'}: {settings()}")
+    print(render(), end='')
@@ -1,9 +1,10 @@
 import streamlit as st
-import sqlite3
+from assets import favicon, logo
+from db import bank_version, read
+from metrics import timed
+from search import MAX_COUNT, count_hits, search_questions
 
-DB_NAME = "exam_simulator.db"
-
-st.set_page_config(page_title="المراجعة - الامتحان الوطني الافتراضي", page_icon="📖", layout="wide")
+st.set_page_config(page_title="المراجعة - الامتحان الوطني الافتراضي", page_icon=favicon("📖"), layout="wide")
 
 # تهيئة الوضع (داكن افتراضياً)
 if 'dark_mode' not in st.session_state:
@@ -147,6 +148,11 @@ hr {{
     color: #2ecc71;
     font-weight: bold;
 }}
+.q-answer {{
+    color: #2ecc71;
+    font-size: 13px;
+    margin-top: 5px;
+}}
 /* عداد */
 .section-badge {{
     background: linear-gradient(135deg, #ff4b4b, #ff8f00);
@@ -172,27 +178,85 @@ if st.sidebar.button(theme_label, use_container_width=True, key="theme_review"):
 # ==========================================
 # جلب البيانات
 # ==========================================
+PAGE_SIZE = 25  # عدد بطاقات الأسئلة في الصفحة الواحدة
+
+# المحمّلات المخزّنة تأخذ نسخة البنك (BankVersion) معاملاً: أي استيراد أو تعديل للأسئلة يغيّرها
+# فتُبنى الصفحات من جديد بدلاً من عرض أسئلة وإجابات قديمة حتى إعادة تشغيل الخادم
+def current_version():
+    with read() as conn:
+        return bank_version(conn)
+
 @st.cache_data
-def get_subjects():
-    with sqlite3.connect(DB_NAME) as conn:
+@timed('review.get_subjects')
+def get_subjects(version):
+    with read() as conn:
         rows = conn.execute("SELECT DISTINCT subject FROM Questions ORDER BY subject").fetchall()
     return [r[0] for r in rows]
 
 @st.cache_data
-def get_sections(subject):
-    with sqlite3.connect(DB_NAME) as conn:
-        rows = conn.execute("SELECT DISTINCT section FROM Questions WHERE subject=? ORDER BY section", (subject,)).fetchall()
-    return [r[0] for r in rows]
+@timed('review.get_section_counts')
+def get_section_counts(subject, version):
+    # عدد الأسئلة لكل قسم من الفهرس (subject, section, id) دون قراءة الأسئلة نفسها
+    with read() as conn:
+        rows = conn.execute("SELECT section, COUNT(*) FROM Questions WHERE subject=? GROUP BY section ORDER BY section", (subject,)).fetchall()
+    return dict(rows)
 
-@st.cache_data
-def get_questions(subject, section):
-    with sqlite3.connect(DB_NAME) as conn:
+@timed('review.get_questions')
+def get_questions(subject, section, offset, limit):
+    with read() as conn:
         rows = conn.execute(
-            "SELECT id, passage_text, question_text, option_a, option_b, option_c, option_d, correct_option FROM Questions WHERE subject=? AND section=? ORDER BY id",
-            (subject, section)
+            "SELECT q.id, q.passage_id, COALESCE(p.passage_text, q.passage_text), q.question_text, q.option_a, q.option_b, q.option_c, q.option_d, q.correct_idx "
+            "FROM Questions q LEFT JOIN Passages p ON p.id = q.passage_id WHERE q.subject=? AND q.section=? ORDER BY q.id LIMIT ? OFFSET ?",
+            (subject, section, limit, offset)
         ).fetchall()
     return rows
 
+def cards_html(rows, first, show_answers, labels=None):
+    # الألوان تأتي من CSS الوضع عبر الأصناف فقط، فتبديل الوضع لا يعيد البناء
+    parts = []
+    prev_passage = None
+    for i, q in enumerate(rows, first):
+        q_id, passage_id, passage, q_text, opt_a, opt_b, opt_c, opt_d, correct = q[:9]
+        label = f" — {labels[i - first]}" if labels else ""
+        parts.append(f'<div class="q-card"><div class="q-num">سؤال {i}{label}</div>')
+
+        # القطعة تُعرض مرة واحدة فقط لأسئلتها المتتالية (وفي أول الصفحة دائماً)
+        if passage and passage.strip() and (passage_id is None or passage_id != prev_passage):
+            parts.append(f'<div class="q-passage">{passage}</div>')
+        prev_passage = passage_id
+
+        parts.append(f'<div class="q-text">{q_text}</div><div class="opts-grid">')
+        for j, (letter, text_opt) in enumerate((("A", opt_a), ("B", opt_b), ("C", opt_c), ("D", opt_d))):
+            is_correct = show_answers and j == correct
+            cls = "opt correct" if is_correct else "opt"
+            mark = " ✅" if is_correct else ""
+            parts.append(f'<div class="{cls}">{letter}) {text_opt}{mark}</div>')
+        parts.append('</div>')
+
+        if show_answers and correct is not None:
+            parts.append(f'<div class="q-answer">✔ الإجابة: {"ABCD"[correct]}) {q[4 + correct]}</div>')
+        parts.append('</div>')
+    return ''.join(parts)
+
+@st.cache_data(max_entries=512)
+@timed('review.page_html')
+def page_html(subject, section, show_answers, page, version):
+    # HTML صفحة كاملة يُبنى مرة واحدة لكل (مادة، قسم، إظهار الإجابات، صفحة) ونسخة من البنك
+    offset = page * PAGE_SIZE
+    return cards_html(get_questions(subject, section, offset, PAGE_SIZE), offset + 1, show_answers)
+
+@st.cache_data(max_entries=256, ttl=600)
+@timed('review.search_count')
+def search_count(text, subject, version):
+    return count_hits(text, subject)
+
+@st.cache_data(max_entries=256, ttl=600)
+@timed('review.search_html')
+def search_html(text, subject, show_answers, page, version):
+    offset = page * PAGE_SIZE
+    rows = search_questions(text, PAGE_SIZE, offset, subject)
+    return cards_html(rows, offset + 1, show_answers, labels=[f"{r[9]} / {r[10]}" for r in rows])
+
 # ==========================================
 # الواجهة
 # ==========================================
@@ -200,7 +264,7 @@ def get_questions(subject, section):
 # الشعار
 col1, col2, col3 = st.columns([2, 1, 2])
 with col2:
-    st.image("logo.png", width=300)
+    st.image(logo(300), width=300)
 
 st.markdown(f"""
 <div style="text-align:center; margin-bottom:30px;">
@@ -215,67 +279,59 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # اختيار المادة
-subjects = get_subjects()
+version = current_version()
+subjects = get_subjects(version)
 if not subjects:
     st.error("قاعدة البيانات فارغة. قم بإضافة أسئلة أولاً.")
     st.stop()
 
 selected_subject = st.selectbox("📚 اختر المادة:", subjects, key="rev_subject")
 
+# البحث النصي: كلمة من نص السؤال أو خياراته أو القطعة (دون اعتبار للتشكيل وأشكال الألف)
+search_text = st.text_input("🔎 بحث في الأسئلة:", key="rev_search", placeholder="كلمة من السؤال أو الخيارات أو القطعة")
+
 # جلب الأقسام
-sections = get_sections(selected_subject)
+counts = get_section_counts(selected_subject, version)
 
-if not sections:
+if not counts:
     st.warning("لا توجد أقسام لهذه المادة.")
     st.stop()
 
-# إظهار/إخفاء الإجابات
-show_answers = st.toggle("👁️ إظهار الإجابات الصحيحة", value=False)
+if search_text.strip():
+    hits = search_count(search_text, selected_subject, version)
+    if hits:
+        pages = max(1, -(-hits // PAGE_SIZE))
+        c1, c2 = st.columns([3, 1])
+        c1.caption(f"النتائج: {'أكثر من ' if hits >= MAX_COUNT else ''}{hits}")
+        page = c2.number_input(f"الصفحة (من {pages}):", min_value=1, max_value=pages, value=1, step=1,
+                               key=f"rev_search_page_{selected_subject}_{search_text}")
+        show_answers = st.toggle("👁️ إظهار الإجابات الصحيحة", value=False)
+        st.divider()
+        st.markdown(search_html(search_text, selected_subject, show_answers, page - 1, version), unsafe_allow_html=True)
+    else:
+        st.info("لا توجد نتائج.")
+else:
+    # قسم واحد وصفحة واحدة في كل مرة: حجم الصفحة ثابت مهما كبر بنك الأسئلة
+    c1, c2 = st.columns([3, 1])
+    selected_section = c1.selectbox("📂 القسم:", list(counts), format_func=lambda sec: f"{sec}  ({counts[sec]} سؤال)", key="rev_section")
+    pages = max(1, -(-counts[selected_section] // PAGE_SIZE))
+    page = c2.number_input(f"الصفحة (من {pages}):", min_value=1, max_value=pages, value=1, step=1,
+                           key=f"rev_page_{selected_subject}_{selected_section}")
+
+    # إظهار/إخفاء الإجابات
+    show_answers = st.toggle("👁️ إظهار الإجابات الصحيحة", value=False)
 
-st.divider()
+    st.divider()
 
-# عرض الأسئلة حسب القسم
-total_all = 0
-for sec in sections:
-    questions = get_questions(selected_subject, sec)
-    total_all += len(questions)
-    
-    with st.expander(f"📂 {sec}  ({len(questions)} سؤال)", expanded=False):
-        for i, q in enumerate(questions, 1):
-            q_id, passage, q_text, opt_a, opt_b, opt_c, opt_d, correct = q
-            
-            # بناء HTML للسؤال
-            html = f'<div class="q-card">'
-            html += f'<div class="q-num">سؤال {i}</div>'
-            
-            if passage and passage.strip():
-                html += f'<div class="q-passage">{passage}</div>'
-            
-            html += f'<div class="q-text">{q_text}</div>'
-            html += '<div class="opts-grid">'
-            
-            options = [("A", opt_a), ("B", opt_b), ("C", opt_c), ("D", opt_d)]
-            for letter, text_opt in options:
-                is_correct = (text_opt == correct) and show_answers
-                cls = "opt correct" if is_correct else "opt"
-                mark = " ✅" if is_correct else ""
-                html += f'<div class="{cls}">{letter}) {text_opt}{mark}</div>'
-            
-            html += '</div>'
-            
-            if show_answers:
-                html += f'<div style="color:#2ecc71; font-size:13px; margin-top:5px;">✔ الإجابة: {correct}</div>'
-            
-            html += '</div>'
-            st.markdown(html, unsafe_allow_html=True)
+    st.markdown(page_html(selected_subject, selected_section, show_answers, page - 1, version), unsafe_allow_html=True)
 
 # إحصائيات
 st.divider()
 st.markdown(f"""
 <div style="text-align:center; padding:15px;">
-    <span class="section-badge">📊 إجمالي الأسئلة: {total_all}</span>
+    <span class="section-badge">📊 إجمالي الأسئلة: {sum(counts.values())}</span>
     &nbsp;&nbsp;
-    <span class="section-badge">📂 عدد الأقسام: {len(sections)}</span>
+    <span class="section-badge">📂 عدد الأقسام: {len(counts)}</span>
 </div>
 """, unsafe_allow_html=True)
 
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from assets import favicon
+from attempts import finished_attempts, reconstruct_attempt
+from db import DB_NAME
+from exam_pool import get_exam_pool
+from question_bank import get_bank
+from scoring import N_CHOICES, analyse
+from theme import main_css
+
+st.set_page_config(page_title="التحليلات - الامتحان الوطني الافتراضي", page_icon=favicon("📊"), layout="wide")
+
+# تهيئة الوضع (داكن افتراضياً)
+if 'dark_mode' not in st.session_state:
+    st.session_state.dark_mode = True
+
+st.markdown(main_css(st.session_state.dark_mode), unsafe_allow_html=True)
+st.sidebar.markdown(f'<div class="sidebar-title"><h3>📝 الامتحان الوطني</h3></div>', unsafe_allow_html=True)
+
+# زر تبديل الوضع
+theme_label = "☀️ الوضع النهاري" if st.session_state.dark_mode else "🌙 الوضع الليلي"
+if st.sidebar.button(theme_label, use_container_width=True, key="theme_analytics"):
+    st.session_state.dark_mode = not st.session_state.dark_mode
+    st.rerun()
+
+# ==========================================
+# تحليل كل المحاولات المحفوظة
+# ==========================================
+ALL = "كل المواد"
+
+@st.cache_data(ttl=60)
+def cohort(subject):
+    # كل المحاولات تُصحَّح وتُحلَّل دفعة واحدة كمصفوفة (scoring.analyse)
+    attempts = finished_attempts(None if subject == ALL else subject)
+    if not attempts:
+        return None
+    bank = get_bank(DB_NAME)
+    result = analyse(bank, [(a[5], a[6]) for a in attempts])
+    lengths = np.maximum(result['lengths'], 1)
+    pct = result['scores'] / lengths * 100
+    students = pd.DataFrame({
+        'المحاولة': [a[0] for a in attempts],
+        'الطالب': [a[1] for a in attempts],
+        'المادة': [a[2] for a in attempts],
+        'الدرجة': result['scores'],
+        'عدد الأسئلة': result['lengths'],
+        'النسبة %': pct.round(1),
+        'ناجح': pct >= np.array([a[3] for a in attempts]),
+    })
+
+    totals = result['section_total'].sum(axis=0)
+    used = totals > 0
+    sections = pd.DataFrame({
+        'القسم': np.array(result['sections'], dtype=object)[used],
+        'الإجابات': totals[used],
+        'النسبة الصحيحة %': (result['section_correct'].sum(axis=0)[used] / totals[used] * 100).round(1),
+    })
+
+    items = result['items']
+    rows = [bank.rows.get(int(q_id)) for q_id in items['ids']]
+    table = {
+        'السؤال': [r[4][:80] if r else '—' for r in rows],
+        'القسم': [r[2] if r else '—' for r in rows],
+        'الظهور': items['n'],
+        'الصعوبة p': items['p'].round(2),
+        'التمييز': items['discrimination'].round(2),
+    }
+    for col, name in zip(range(N_CHOICES), ('A', 'B', 'C', 'D', 'بدون')):
+        table[name] = items['distractors'][:, col]
+    return students, sections, pd.DataFrame(table, index=items['ids'])
+
+# ==========================================
+# الواجهة
+# ==========================================
+st.title("📊 تحليل النتائج")
+
+subjects = [ALL] + sorted(get_bank(DB_NAME).sections)
+subject = st.selectbox("📚 المادة:", subjects, key="an_subject")
+data = cohort(subject)
+
+if data is None:
+    st.info("لا توجد محاولات منتهية بعد.")
+else:
+    students, sections, items = data
+    c1, c2, c3 = st.columns(3)
+    c1.metric("عدد المحاولات", len(students))
+    c2.metric("متوسط النسبة", f"{students['النسبة %'].mean():.1f} %")
+    c3.metric("نسبة النجاح", f"{students['ناجح'].mean() * 100:.1f} %")
+
+    st.subheader("توزيع الدرجات")
+    bins = np.histogram(students['النسبة %'], bins=10, range=(0, 100))[0]
+    st.bar_chart(pd.DataFrame({'المحاولات': bins}, index=[f"{i * 10}-{i * 10 + 10}" for i in range(10)]))
+
+    st.subheader("الأداء حسب القسم")
+    st.dataframe(sections, hide_index=True, use_container_width=True)
+
+    st.subheader("تحليل الأسئلة")
+    st.caption("الصعوبة p: نسبة من أجاب إجابة صحيحة. التمييز: الارتباط بين صحة السؤال ونسبة الطالب في بقية "
+               "الأسئلة، دون السؤال نفسه (أقل من 0.2 يستحق المراجعة). الأعمدة A-D: عدد من اختار كل خيار.")
+    min_n = st.number_input("أقل عدد ظهور للسؤال:", min_value=1, value=1, step=1)
+    st.dataframe(items[items['الظهور'] >= min_n].sort_values('التمييز'), use_container_width=True)
+
+    st.subheader("المحاولات")
+    st.dataframe(students, hide_index=True, use_container_width=True)
+
+# ==========================================
+# إعادة بناء امتحان طالب من البذرة (للمراقب)
+# ==========================================
+with st.expander("🔍 إعادة بناء محاولة كما رآها الطالب"):
+    attempt_id = st.number_input("رقم المحاولة:", min_value=1, step=1, key="an_attempt")
+    if st.button("إعادة البناء", key="an_rebuild"):
+        exam = reconstruct_attempt(int(attempt_id))
+        if exam is None:
+            st.warning("لا توجد محاولة بهذا الرقم، أو أنها أُنشئت قبل التوليد بالبذرة.")
+        else:
+            bank = get_bank(DB_NAME)
+            st.caption(f"الطالب: {exam['student_name']} — المادة: {exam['subject']} — البذرة: {exam['seed']}")
+            if exam['matches']:
+                st.success("إعادة التوليد من البذرة تطابق الأسئلة المحفوظة.")
+            else:
+                st.warning("تغيّر بنك الأسئلة بعد المحاولة؛ الأسئلة المعروضة من القائمة المحفوظة.")
+            order = exam['option_order']
+            lines = []
+            for pos, q_id in enumerate(exam['questions']):
+                q = bank.rows.get(q_id)
+                if q is None:
+                    lines.append(f"{pos + 1}. (سؤال محذوف #{q_id})")
+                    continue
+                ans = exam['user_answers'][pos]
+                shown = []
+                for letter, opt in zip('ABCD', order[pos * 4:pos * 4 + 4]):
+                    mark = (" ✅" if opt == q[9] else "") + (" ⬅️" if opt == ans else "")
+                    shown.append(f"{letter}) {q[5 + opt]}{mark}")
+                lines.append(f"{pos + 1}. **{q[4]}**  \n" + " — ".join(shown))
+            st.markdown("\n".join(lines))
+
+# ==========================================
+# مجمع الامتحانات الجاهزة (exam_pool)
+# ==========================================
+with st.expander("⚡ مجمع الامتحانات الجاهزة"):
+    stats = get_exam_pool(DB_NAME).stats()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("نسبة الإصابة", "—" if stats['hit_rate'] is None else f"{stats['hit_rate'] * 100:.1f} %")
+    c2.metric("إصابة / إخفاق", f"{stats['hits']} / {stats['misses']}")
+    c3.metric("امتحانات مولّدة", stats['generated'])
+    c4.metric("زمن التوليد p50 / p95", f"{stats.get('refill_ms_p50', 0):.2f} / {stats.get('refill_ms_p95', 0):.2f} ms")
+    st.dataframe(pd.DataFrame(
+        [(subject, total, n) for (subject, total), n in sorted(stats['ready'].items())],
+        columns=['المادة', 'عدد الأسئلة', 'جاهز'],
+    ), hide_index=True, use_container_width=True)
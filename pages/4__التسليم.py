@@ -0,0 +1,41 @@
+import json
+
+import pandas as pd
+import streamlit as st
+
+from assets import favicon
+from export_exam import ingest_sheet
+from theme import main_css
+
+st.set_page_config(page_title="التسليم - الامتحان الوطني الافتراضي", page_icon=favicon("📤"), layout="wide")
+
+# تهيئة الوضع (داكن افتراضياً)
+if 'dark_mode' not in st.session_state:
+    st.session_state.dark_mode = True
+
+st.markdown(main_css(st.session_state.dark_mode), unsafe_allow_html=True)
+st.sidebar.markdown(f'<div class="sidebar-title"><h3>📝 الامتحان الوطني</h3></div>', unsafe_allow_html=True)
+
+# زر تبديل الوضع
+theme_label = "☀️ الوضع النهاري" if st.session_state.dark_mode else "🌙 الوضع الليلي"
+if st.sidebar.button(theme_label, use_container_width=True, key="theme_submit"):
+    st.session_state.dark_mode = not st.session_state.dark_mode
+    st.rerun()
+
+# ==========================================
+# رفع أوراق إجابات الامتحانات المصدَّرة (export_exam.py)
+# ==========================================
+st.title("📤 تسليم الامتحانات دون اتصال")
+st.caption("ارفع ملفات answers_*.json التي أنتجتها حزم الامتحان الثابتة؛ كل ملف يُصحَّح ويُحفظ كمحاولة منتهية.")
+
+files = st.file_uploader("أوراق الإجابات:", type="json", accept_multiple_files=True, key="sheets")
+if files and st.button("تسليم", type="primary", key="ingest"):
+    rows = []
+    for f in files:
+        try:
+            attempt_id, name, score, total = ingest_sheet(json.load(f))
+            rows.append((f.name, attempt_id, name, f"{score} / {total}", "✅"))
+        except ValueError as e:
+            rows.append((f.name, None, None, None, f"❌ {e}"))
+    st.dataframe(pd.DataFrame(rows, columns=['الملف', 'المحاولة', 'الطالب', 'الدرجة', 'الحالة']),
+                 hide_index=True, use_container_width=True)
@@ -0,0 +1,104 @@
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from assets import favicon
+from attempts import live_progress
+from db import DB_NAME
+from question_bank import get_bank
+from theme import main_css
+
+st.set_page_config(page_title="المراقبة - الامتحان الوطني الافتراضي", page_icon=favicon("👁️"), layout="wide")
+
+# تهيئة الوضع (داكن افتراضياً)
+if 'dark_mode' not in st.session_state:
+    st.session_state.dark_mode = True
+
+st.markdown(main_css(st.session_state.dark_mode), unsafe_allow_html=True)
+st.sidebar.markdown(f'<div class="sidebar-title"><h3>📝 الامتحان الوطني</h3></div>', unsafe_allow_html=True)
+
+# زر تبديل الوضع
+theme_label = "☀️ الوضع النهاري" if st.session_state.dark_mode else "🌙 الوضع الليلي"
+if st.sidebar.button(theme_label, use_container_width=True, key="theme_proctor"):
+    st.session_state.dark_mode = not st.session_state.dark_mode
+    st.rerun()
+
+# ==========================================
+# لقطة حية للامتحانات الجارية
+# ==========================================
+# العدّادات تُحدَّث مع كل إجابة داخل طابور الكتابة (AttemptProgress / SectionProgress)،
+# واللقطة مشتركة بين كل المراقبين لمدة REFRESH_SECONDS: استعلام واحد لكل مادة مهما كثر
+# المراقبون، ولا يمس سجل الإجابات ولا مسار حفظها.
+ALL = "كل المواد"
+REFRESH_SECONDS = 5
+
+@st.cache_data(ttl=REFRESH_SECONDS, show_spinner=False)
+def snapshot(subject):
+    attempts, sections = live_progress(None if subject == ALL else subject)
+    if not attempts:
+        return None
+    students = pd.DataFrame(attempts, columns=['المحاولة', 'الطالب', 'المادة', 'end_time', 'total', 'answered', 'correct'])
+    if sections:
+        by_section = pd.DataFrame(sections, columns=['المحاولة', 'القسم', 'answered', 'correct'])
+        by_section['label'] = by_section['correct'].astype(str) + ' / ' + by_section['answered'].astype(str)
+        students = students.join(by_section.pivot(index='المحاولة', columns='القسم', values='label'), on='المحاولة')
+    return students
+
+st.title("👁️ مراقبة الامتحانات الجارية")
+st.caption(f"تتحدث كل {REFRESH_SECONDS} ثوانٍ. الدرجة الجارية: الصحيح من المُجاب حتى الآن؛ أعمدة الأقسام: صحيح / مُجاب.")
+
+subjects = [ALL] + sorted(get_bank(DB_NAME).sections)
+subject = st.selectbox("📚 المادة:", subjects, key="pr_subject")
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def live(subject):
+    students = snapshot(subject)
+    if students is not None:
+        # الوقت المتبقي يُحسب عند كل عرض، فيبقى دقيقاً داخل مدة اللقطة
+        students = students[students['end_time'] > time.time()]
+    if students is None or students.empty:
+        st.info("لا توجد امتحانات جارية الآن.")
+        return
+
+    total = np.maximum(students['total'].to_numpy(), 1)
+    answered = students['answered'].to_numpy()
+    progress = answered / total * 100
+    running = np.divide(students['correct'].to_numpy() * 100, answered,
+                        out=np.zeros(len(students)), where=answered > 0)
+    remaining = (students['end_time'].to_numpy() - time.time()).astype(int)
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("امتحانات جارية", len(students))
+    c2.metric("متوسط الإنجاز", f"{progress.mean():.1f} %")
+    c3.metric("متوسط الدرجة الجارية", f"{running[answered > 0].mean() if (answered > 0).any() else 0:.1f} %")
+    c4.metric("أقرب انتهاء", f"{remaining.min() // 60:02d}:{remaining.min() % 60:02d}")
+
+    labels = [f"{i * 10}-{i * 10 + 10}" for i in range(10)]
+    h1, h2 = st.columns(2)
+    with h1:
+        st.subheader("توزيع الإنجاز %")
+        st.bar_chart(pd.DataFrame({'الطلاب': np.histogram(progress, bins=10, range=(0, 100))[0]}, index=labels))
+    with h2:
+        st.subheader("توزيع الدرجة الجارية %")
+        bins = np.histogram(running[answered > 0], bins=10, range=(0, 100))[0]
+        st.bar_chart(pd.DataFrame({'الطلاب': bins}, index=labels))
+
+    st.subheader("الطلاب")
+    table = pd.DataFrame({
+        'المحاولة': students['المحاولة'],
+        'الطالب': students['الطالب'],
+        'المادة': students['المادة'],
+        'المُجاب': students['answered'].astype(str) + ' / ' + students['total'].astype(str),
+        'الإنجاز %': progress.round(1),
+        'الوقت المتبقي': [f"{r // 60:02d}:{r % 60:02d}" for r in remaining],
+        'الدرجة الجارية %': running.round(1),
+    })
+    for column in students.columns[7:]:
+        table[column] = students[column].fillna('—')
+    st.dataframe(table, hide_index=True, use_container_width=True, column_config={
+        'الإنجاز %': st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f %%"),
+    })
+
+live(subject)
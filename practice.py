@@ -0,0 +1,76 @@
+import time
+
+from db import DB_NAME, read
+
+# ==========================================
+# المراجعة المتباعدة (SM-2) لأخطاء كل طالب
+# ==========================================
+# كل سؤال أخطأ فيه الطالب (في امتحان أو مراجعة) يدخل جدول Reviews بموعد استحقاق،
+# وكل إجابة لاحقة عليه تحدّث الفاصل ومعامل السهولة بخوارزمية SM-2:
+#   خطأ  -> يعود السؤال بعد يوم واحد ويبدأ العد من جديد
+#   صواب -> بعد يوم، ثم 6 أيام، ثم الفاصل السابق × معامل السهولة
+# طابور "أسئلتي المستحقة" قراءة نطاق واحدة من الفهرس (student_name, subject, due).
+
+DAY = 86400
+PRACTICE_SIZE = 20
+START_EASE = 2.5
+MIN_EASE = 1.3
+QUALITY = {True: 4, False: 1}  # درجة SM-2 (0-5) للإجابة الصحيحة والخاطئة
+
+def sm2(reps, interval, ease, quality):
+    """خطوة SM-2: (التكرارات، الفاصل بالأيام، معامل السهولة) بعد إجابة بدرجة quality."""
+    if quality < 3:
+        reps, interval = 0, 1.0
+    else:
+        reps += 1
+        interval = 1.0 if reps == 1 else 6.0 if reps == 2 else round(interval * ease, 1)
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return reps, interval, ease
+
+def review(conn, student_name, subject, outcomes, at):
+    """تحديث جدول المراجعة بنتائج [(q_id، صحيحة؟)] داخل معاملة الكتابة الجارية.
+
+    السؤال الجديد يدخل الجدول عند الخطأ فقط؛ السؤال الموجود يُحدَّث مع كل إجابة.
+    """
+    if not outcomes:
+        return 0
+    marks = ','.join('?' * len(outcomes))
+    current = {row[0]: row[1:] for row in conn.execute(
+        f'SELECT question_id, interval, ease, reps, lapses FROM Reviews WHERE student_name=? AND question_id IN ({marks})',
+        (student_name, *(q_id for q_id, _ in outcomes))
+    )}
+    rows = []
+    for q_id, correct in outcomes:
+        state = current.get(q_id)
+        if state is None:
+            if correct:
+                continue
+            state = (0.0, START_EASE, 0, 0)
+        interval, ease, reps, lapses = state
+        reps, interval, ease = sm2(reps, interval, ease, QUALITY[correct])
+        rows.append((student_name, q_id, subject, at + interval * DAY, interval, ease, reps, lapses + (not correct), at))
+    conn.executemany(
+        'INSERT OR REPLACE INTO Reviews (student_name, question_id, subject, due, interval, ease, reps, lapses, last_review) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
+    )
+    return len(rows)
+
+def due_questions(student_name, subject, limit=PRACTICE_SIZE, now=None, db_path=DB_NAME):
+    """أقدم limit سؤالاً مستحقاً للطالب في المادة."""
+    with read(db_path) as conn:
+        return [r[0] for r in conn.execute(
+            'SELECT question_id FROM Reviews WHERE student_name=? AND subject=? AND due<=? ORDER BY due LIMIT ?',
+            (student_name, subject, time.time() if now is None else now, limit)
+        )]
+
+def due_summary(student_name, subject, now=None, db_path=DB_NAME):
+    """(عدد المستحق الآن، عدد أسئلة الجدول، موعد أقرب سؤال غير مستحق أو None)."""
+    now = time.time() if now is None else now
+    with read(db_path) as conn:
+        due = conn.execute('SELECT COUNT(*) FROM Reviews WHERE student_name=? AND subject=? AND due<=?',
+                           (student_name, subject, now)).fetchone()[0]
+        total = conn.execute('SELECT COUNT(*) FROM Reviews WHERE student_name=? AND subject=?',
+                             (student_name, subject)).fetchone()[0]
+        upcoming = conn.execute('SELECT MIN(due) FROM Reviews WHERE student_name=? AND subject=? AND due>?',
+                                (student_name, subject, now)).fetchone()[0]
+    return due, total, upcoming
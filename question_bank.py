@@ -0,0 +1,170 @@
+import os
+import random
+import threading
+from array import array
+
+from db import DB_NAME, bank_version, read
+
+# ==========================================
+# بنك الأسئلة في الذاكرة (مشترك على مستوى العملية)
+# ==========================================
+
+class QuestionBank:
+    """نسخة للقراءة فقط من جدول الأسئلة مع مصفوفات معرّفات لكل (مادة، قسم)."""
+
+    def __init__(self, db_path, signature=None):
+        self.db_path = db_path
+        self.signature = signature
+        self.version = None       # BankVersion.version وقت التحميل
+        self.rows = {}            # id -> (id, subject, section, passage_id, question_text, a, b, c, d, correct_idx)
+        self.passages = {}        # passage_id -> نص القطعة (نسخة واحدة لكل قطعة)
+        self.sections = {}        # subject -> [section, ...] بترتيب أول ظهور
+        self.pools = {}           # (subject, section) -> array من المعرّفات
+        self.subject_pools = {}   # subject -> array من كل معرّفات المادة
+        self.passage_groups = {}  # (subject, section) -> {passage_id: array}
+        self.loose_pools = {}     # (subject, section) -> أسئلة القسم التي لا تتبع قطعة
+
+    def load(self):
+        # النصوص المتكررة (وأهمها نص القطعة) تُخزَّن مرة واحدة وتشاركها كل الصفوف
+        shared = {}
+        with read(self.db_path) as conn:
+            # العدّاد يُقرأ قبل الصفوف: أي تعديل بينهما يؤدي فقط إلى إعادة تحميل لاحقة
+            self.version = bank_version(conn)
+            self.passages = dict(conn.execute('SELECT id, passage_text FROM Passages'))
+            cursor = conn.execute('''
+                SELECT id, subject, section, passage_id, question_text,
+                       option_a, option_b, option_c, option_d, correct_idx
+                FROM Questions ORDER BY id
+            ''')
+            for row in cursor:
+                q_id, subject, section = row[0], row[1], row[2]
+                pool = self.pools.get((subject, section))
+                if pool is None:
+                    pool = self.pools[(subject, section)] = array('q')
+                    self.sections.setdefault(subject, []).append(section)
+                    self.subject_pools.setdefault(subject, array('q'))
+                pool.append(q_id)
+                self.subject_pools[subject].append(q_id)
+                if row[3] is not None:
+                    groups = self.passage_groups.setdefault((subject, section), {})
+                    groups.setdefault(row[3], array('q')).append(q_id)
+                self.rows[q_id] = tuple(shared.setdefault(v, v) if isinstance(v, str) else v for v in row)
+        for key in self.passage_groups:
+            self.loose_pools[key] = array('q', (q_id for q_id in self.pools[key] if self.rows[q_id][3] is None))
+        return self
+
+    def get(self, q_id):
+        return self.rows[q_id]
+
+    def passage(self, passage_id):
+        return self.passages.get(passage_id, '') if passage_id is not None else ''
+
+    def sample(self, subject, total_limit, rng=random, group_passages=False):
+        """سحب متوازن على الأقسام ثم تعويض النقص من أي قسم، دون أي استعلام.
+
+        مع group_passages تُسحب أسئلة أقسام القطع قطعةً قطعة، وتُرتَّب أسئلة
+        كل قطعة متتالية حتى تُعرض القطعة مرة واحدة لمجموعة أسئلتها.
+        """
+        sections = self.sections.get(subject)
+        if not sections:
+            return []
+        q_per = total_limit // len(sections)
+        rem = total_limit % len(sections)
+        ids = []
+        # الجولة الأولى: توزيع متوازن على الأقسام
+        for i, sec in enumerate(sections):
+            pool = self.pools[(subject, sec)]
+            limit = q_per + (1 if i < rem else 0)
+            if group_passages and (subject, sec) in self.passage_groups:
+                picked = self._sample_by_passage((subject, sec), limit, rng)
+            elif limit >= len(pool):
+                picked = list(pool)
+                rng.shuffle(picked)
+            else:
+                picked = rng.sample(pool, limit)
+            ids.extend(picked)
+        # جولة التعويض: إذا لم يكتمل العدد المطلوب، نكمل من بقية أسئلة المادة
+        deficit = total_limit - len(ids)
+        if deficit > 0:
+            ids.extend(self._top_up(subject, set(ids), deficit, rng))
+        if group_passages:
+            ids = self._group_by_passage(ids)
+        return ids
+
+    def _sample_by_passage(self, key, limit, rng):
+        groups = self.passage_groups[key]
+        order = list(groups)
+        rng.shuffle(order)
+        picked = []
+        for p_id in order:
+            need = limit - len(picked)
+            if need <= 0:
+                break
+            group = groups[p_id]
+            picked.extend(group if need >= len(group) else sorted(rng.sample(group, need)))
+        loose = self.loose_pools[key]
+        need = limit - len(picked)
+        if need > 0 and loose:
+            picked.extend(rng.sample(loose, min(need, len(loose))))
+        return picked
+
+    def _group_by_passage(self, ids):
+        # ترتيب مستقر: أسئلة القطعة الواحدة تُجمع عند موضع أول سؤال منها
+        groups = {}
+        for q_id in ids:
+            p_id = self.rows[q_id][3]
+            groups.setdefault(q_id if p_id is None else ('p', p_id), []).append(q_id)
+        return [q_id for group in groups.values() for q_id in group]
+
+    def _top_up(self, subject, selected, deficit, rng):
+        pool = self.subject_pools[subject]
+        available = len(pool) - len(selected)
+        if available <= 0:
+            return []
+        if deficit >= available:
+            rest = [q_id for q_id in pool if q_id not in selected]
+            rng.shuffle(rest)
+            return rest
+        # سحب بالرفض: التكلفة المتوقعة تتناسب مع العجز وليس مع حجم البنك
+        extra = []
+        while len(extra) < deficit:
+            q_id = pool[rng.randrange(len(pool))]
+            if q_id not in selected:
+                selected.add(q_id)
+                extra.append(q_id)
+        return extra
+
+
+def _file_signature(db_path):
+    # في وضع WAL تُكتب التعديلات في ملف -wal قبل الملف الرئيسي
+    sig = []
+    for path in (db_path, db_path + '-wal'):
+        try:
+            st = os.stat(path)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+
+_banks = {}
+_lock = threading.Lock()
+
+def get_bank(db_path=DB_NAME):
+    """إرجاع البنك المشترك، مع إعادة التحميل تلقائياً إذا تغيّرت الأسئلة في قاعدة البيانات."""
+    sig = _file_signature(db_path)
+    bank = _banks.get(db_path)
+    if bank is not None and bank.signature == sig:
+        return bank
+    with _lock:
+        bank = _banks.get(db_path)
+        if bank is None or bank.signature != sig:
+            # تغيّر الملف لا يعني تغيّر الأسئلة (المحاولات والإجابات في نفس الملف)
+            with read(db_path) as conn:
+                version = bank_version(conn)
+            if bank is None or bank.version != version:
+                bank = QuestionBank(db_path, sig).load()
+                _banks[db_path] = bank
+            else:
+                bank.signature = sig
+    return bank
@@ -0,0 +1,157 @@
+from array import array
+from functools import lru_cache
+
+import numpy as np
+
+# ==========================================
+# التصحيح والتحليل المتجه (NumPy)
+# ==========================================
+# الإجابات أرقام خيارات صغيرة (int8): 0-3 للخيارات، و-1 لسؤال لم يُجب عنه.
+# مجموعة محاولات تُرمَّز كمصفوفتين (محاولة × موضع) بنفس الشكل:
+#   items   : رقم السؤال داخل مصفوفات البنك (-1 = حشو بعد نهاية امتحان أقصر)
+#   answers : الإجابة في ذلك الموضع
+# وكل التجميعات (الدرجات، الأقسام، تحليل البنود، المشتتات) تتم بـ bincount دفعة واحدة.
+
+UNANSWERED = -1
+N_CHOICES = 5  # A-D + بدون إجابة (عمود المشتتات الأخير)
+
+class BankArrays:
+    """مصفوفات البنك التي يحتاجها التصحيح: مفتاح الإجابة ورمز القسم لكل سؤال."""
+
+    def __init__(self, bank):
+        ids = sorted(bank.rows)
+        self.ids = np.array(ids, dtype=np.int64)
+        # جدول مباشر: معرّف السؤال -> رقم البند (-1 لمعرّف غير موجود)
+        self.lookup = np.full(int(self.ids[-1]) + 2 if ids else 1, -1, dtype=np.int32)
+        self.lookup[self.ids] = np.arange(len(ids), dtype=np.int32)
+        self.section_names = []
+        codes = {}
+        key = np.full(len(ids), -1, dtype=np.int8)  # -1: سؤال بلا إجابة صحيحة
+        sections = np.zeros(len(ids), dtype=np.int32)
+        for i, q_id in enumerate(ids):
+            q = bank.rows[q_id]
+            if q[9] is not None:
+                key[i] = q[9]
+            code = codes.get(q[2])
+            if code is None:
+                code = codes[q[2]] = len(self.section_names)
+                self.section_names.append(q[2])
+            sections[i] = code
+        self.key = key
+        self.sections = sections
+
+@lru_cache(maxsize=2)
+def bank_arrays(bank):
+    # البنك كائن ثابت حتى إعادة تحميله، فيكفي التخزين حسب هويته
+    return BankArrays(bank)
+
+
+def _flat(values, dtype):
+    # array('q') / array('b') تُقرأ دون نسخ، والقوائم تُحوَّل مباشرة
+    if isinstance(values, array):
+        return np.frombuffer(values, dtype=dtype)
+    return np.asarray(values, dtype=dtype)
+
+def encode(arrays, attempts):
+    """ترميز [(question_ids, answers), ...] كمصفوفتي (محاولة × موضع) مع حشو للأطوال المختلفة."""
+    lengths = np.array([len(q_ids) for q_ids, _ in attempts], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    filled = np.arange(width) < lengths[:, None]
+    items = np.full((len(attempts), width), -1, dtype=np.int32)
+    answers = np.full((len(attempts), width), UNANSWERED, dtype=np.int8)
+    if not filled.any():
+        return items, answers
+    ids = np.concatenate([_flat(q_ids, np.int64) for q_ids, _ in attempts])
+    # تحويل المعرّفات إلى أرقام بنود بقراءة واحدة من الجدول للدفعة كلها
+    lookup = arrays.lookup
+    items[filled] = lookup[np.clip(ids, 0, len(lookup) - 1)]
+    answers[filled] = np.concatenate([_flat(ans, np.int8) for _, ans in attempts])
+    return items, answers
+
+def score_matrix(arrays, items, answers):
+    """درجات كل المحاولات وتفصيلها حسب القسم في عملية واحدة.
+
+    يعيد (correct, scores, section_correct, section_total) حيث correct مصفوفة منطقية
+    بنفس شكل المدخلات، و section_* بشكل (محاولة × قسم).
+    """
+    present = items >= 0
+    safe = np.where(present, items, 0)
+    correct = present & (answers >= 0) & (answers == arrays.key[safe])
+    n_attempts, n_sections = items.shape[0], len(arrays.section_names)
+    scores = correct.sum(axis=1)
+    # فهرس مسطّح (محاولة، قسم) لكل موضع مستخدم
+    rows = np.broadcast_to(np.arange(n_attempts)[:, None], items.shape)[present]
+    cells = rows * n_sections + arrays.sections[items[present]]
+    size = n_attempts * n_sections
+    section_total = np.bincount(cells, minlength=size).reshape(n_attempts, n_sections)
+    section_correct = np.bincount(cells, weights=correct[present], minlength=size).reshape(n_attempts, n_sections)
+    return correct, scores, section_correct.astype(np.int64), section_total
+
+def item_analysis(arrays, items, answers, correct, scores):
+    """تحليل البنود لكل سؤال ظهر في محاولة واحدة على الأقل.
+
+    يعيد dict من المصفوفات: ids, n (مرات الظهور), p (نسبة الإجابة الصحيحة),
+    discrimination (ارتباط ثنائي نقطي مصحح بين صحة البند ونسبة الطالب في بقية البنود،
+    دون البند نفسه حتى لا يرتبط بنفسه؛ NaN إذا لم يظهر البند إلا في امتحانات من سؤال واحد)،
+    و distractors بشكل (بند × 5): عدد من اختار A-D ثم من ترك السؤال.
+    """
+    present = items >= 0
+    m = len(arrays.ids)
+    item = items[present]
+    is_correct = correct[present].astype(np.float64)
+    # نسبة بقية البنود لكل موضع: (الدرجة - صحة البند) / (الطول - 1)، والامتحانات قد تختلف في الطول
+    lengths = present.sum(axis=1)
+    scores_at = np.broadcast_to(scores[:, None], items.shape)[present]
+    lengths_at = np.broadcast_to(lengths[:, None], items.shape)[present]
+    rated = (lengths_at > 1).astype(np.float64)
+    rest = np.divide(scores_at - is_correct, lengths_at - 1, out=np.zeros(len(item)), where=lengths_at > 1)
+
+    n = np.bincount(item, minlength=m)
+    n_correct = np.bincount(item, weights=is_correct, minlength=m)
+    n_rated = np.bincount(item, weights=rated, minlength=m)
+    n_rated_correct = np.bincount(item, weights=rated * is_correct, minlength=m)
+    sum_rest = np.bincount(item, weights=rest, minlength=m)
+    sum_rest_correct = np.bincount(item, weights=rest * is_correct, minlength=m)
+    sum_sq = np.bincount(item, weights=rest * rest, minlength=m)
+
+    choice = answers[present].astype(np.int64)
+    choice[choice < 0] = N_CHOICES - 1
+    distractors = np.bincount(item * N_CHOICES + choice, minlength=m * N_CHOICES).reshape(m, N_CHOICES)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = n_correct / n
+        p_rated = n_rated_correct / n_rated
+        mean_correct = sum_rest_correct / n_rated_correct
+        mean_wrong = (sum_rest - sum_rest_correct) / (n_rated - n_rated_correct)
+        std = np.sqrt(np.maximum(sum_sq / n_rated - (sum_rest / n_rated) ** 2, 0))
+        discrimination = (mean_correct - mean_wrong) / std * np.sqrt(p_rated * (1 - p_rated))
+    seen = n > 0
+    return {
+        'ids': arrays.ids[seen], 'n': n[seen], 'p': p[seen],
+        'discrimination': discrimination[seen], 'distractors': distractors[seen],
+    }
+
+def analyse(bank, attempts):
+    """تصحيح وتحليل مجموعة محاولات [(question_ids, answers), ...] دفعة واحدة."""
+    arrays = bank_arrays(bank)
+    items, answers = encode(arrays, attempts)
+    correct, scores, section_correct, section_total = score_matrix(arrays, items, answers)
+    return {
+        'scores': scores, 'lengths': (items >= 0).sum(axis=1),
+        'sections': arrays.section_names,
+        'section_correct': section_correct, 'section_total': section_total,
+        'items': item_analysis(arrays, items, answers, correct, scores),
+    }
+
+def score_attempt(bank, question_ids, answers):
+    """تصحيح محاولة واحدة: (الدرجة، [(q_id, الإجابة) للخاطئة أو المتروكة]، {القسم: (صحيح، المجموع)})."""
+    arrays = bank_arrays(bank)
+    items, matrix = encode(arrays, [(question_ids, answers)])
+    correct, scores, section_correct, section_total = score_matrix(arrays, items, matrix)
+    wrong = np.flatnonzero(~correct[0])
+    incorrect = [(question_ids[i], answers[i]) for i in wrong.tolist()]
+    sections = {
+        arrays.section_names[s]: (int(section_correct[0, s]), int(section_total[0, s]))
+        for s in np.flatnonzero(section_total[0]).tolist()
+    }
+    return int(scores[0]), incorrect, sections
@@ -0,0 +1,52 @@
+import re
+
+from db import DB_NAME, ar_norm, read
+
+# ==========================================
+# البحث النصي في بنك الأسئلة (FTS5)
+# ==========================================
+# الفهرس QuestionsFTS مخزّن بعد التطبيع (db.ar_norm_sql)، فنطبّع نص البحث بنفس
+# القواعد في بايثون ونبحث بكل كلمة كبادئة: "مدرس" تطابق "مدرسة" و"مَدْرَسَة".
+# الكلمات الأقصر من MIN_PREFIX تُطابق كاملة، وإلا فإن "ال" مثلاً تطابق البنك كله.
+
+MIN_PREFIX = 3   # يطابق prefix='3' في تعريف QuestionsFTS
+MAX_COUNT = 1000  # لا نعدّ النتائج بعد هذا الحد؛ الواجهة تعرض "أكثر من"
+
+_WORD = re.compile(r'\w+')
+
+def match_query(text):
+    """تحويل نص المستخدم إلى استعلام MATCH آمن (كل الكلمات مطلوبة)، أو None إذا كان فارغاً."""
+    words = _WORD.findall(ar_norm(text))
+    if not words:
+        return None
+    return ' '.join(f'"{w}"*' if len(w) >= MIN_PREFIX else f'"{w}"' for w in words)
+
+def _subject_filter(subject):
+    return (' AND q.subject=?', (subject,)) if subject else ('', ())
+
+def count_hits(text, subject=None, db_path=DB_NAME):
+    query = match_query(text)
+    if query is None:
+        return 0
+    where, params = _subject_filter(subject)
+    with read(db_path) as conn:
+        return conn.execute(
+            'SELECT COUNT(*) FROM (SELECT 1 FROM QuestionsFTS f JOIN Questions q ON q.id = f.rowid '
+            f'WHERE QuestionsFTS MATCH ?{where} LIMIT ?)',
+            (query, *params, MAX_COUNT)
+        ).fetchone()[0]
+
+def search_questions(text, limit, offset=0, subject=None, db_path=DB_NAME):
+    """نتائج مرتبة حسب bm25 بنفس أعمدة صفحة المراجعة، مع المادة والقسم."""
+    query = match_query(text)
+    if query is None:
+        return []
+    where, params = _subject_filter(subject)
+    with read(db_path) as conn:
+        return conn.execute(
+            'SELECT q.id, q.passage_id, COALESCE(p.passage_text, q.passage_text), q.question_text, '
+            'q.option_a, q.option_b, q.option_c, q.option_d, q.correct_idx, q.subject, q.section '
+            'FROM QuestionsFTS f JOIN Questions q ON q.id = f.rowid LEFT JOIN Passages p ON p.id = q.passage_id '
+            f'WHERE QuestionsFTS MATCH ?{where} ORDER BY f.rank LIMIT ? OFFSET ?',
+            (query, *params, limit, offset)
+        ).fetchall()
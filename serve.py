@@ -0,0 +1,114 @@
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import time
+import zlib
+
+from db import DB_NAME, init_db
+
+# ==========================================
+# التشغيل بعدة عمليات Streamlit خلف وسيط محلي
+# ==========================================
+# عملية Streamlit واحدة = حلقة أحداث واحدة و GIL واحد، أي نواة واحدة لكل قاعة. هنا تُشغَّل
+# عدة عمليات (عمّال) على منافذ داخلية، ووسيط TCP صغير على المنفذ العام يوزّع الاتصالات
+# عليها (HTTP و WebSocket معاً). حالة الامتحان مشتركة في قاعدة البيانات (WAL):
+# المحاولة وإجاباتها وموضع الطالب مربوطة برمز الجلسة في رابط الصفحة (?s=)، فإذا انقطع
+# اتصال الطالب أو توقف عامله يعيد المتصفح الاتصال بعامل آخر ويستأنف الامتحان نفسه.
+#
+#   ip   (الافتراضي) كل عنوان عميل يذهب لنفس العامل ما دام حياً؛ يلزم لرفع الملفات
+#        (صفحة التسليم) لأن الملف المرفوع يبقى في ذاكرة العامل الذي استقبله
+#   rr   توزيع دوري لكل اتصال؛ للاختبار من عنوان واحد (benchmarks/bench_workers.py)
+#
+# العامل الذي يتوقف يُعاد تشغيله تلقائياً.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PORT = 8501
+BASE_PORT = 8600      # منافذ العمّال الداخلية: 8600، 8601، ...
+CHUNK = 64 * 1024
+RESTART_DELAY = 1
+
+class Proxy:
+    """وسيط TCP: يختار عاملاً لكل اتصال وينقل البايتات في الاتجاهين دون تفسيرها."""
+
+    def __init__(self, ports, balance='ip'):
+        self.ports = ports
+        self.balance = balance
+        self._next = itertools.count()
+
+    def candidates(self, client_ip):
+        # العامل المفضّل أولاً، ثم البقية بالترتيب إذا رفض الاتصال (عامل متوقف)
+        n = len(self.ports)
+        start = zlib.crc32(client_ip.encode()) if self.balance == 'ip' else next(self._next)
+        return [self.ports[(start + k) % n] for k in range(n)]
+
+    async def handle(self, client_reader, client_writer):
+        peer = client_writer.get_extra_info('peername')
+        for port in self.candidates(peer[0] if peer else ''):
+            try:
+                upstream_reader, upstream_writer = await asyncio.open_connection('127.0.0.1', port)
+                break
+            except OSError:
+                continue
+        else:
+            client_writer.close()
+            return
+        await asyncio.gather(pipe(client_reader, upstream_writer), pipe(upstream_reader, client_writer))
+
+async def pipe(reader, writer):
+    try:
+        while data := await reader.read(CHUNK):
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        writer.close()
+
+def start_worker(port, script):
+    return subprocess.Popen([
+        sys.executable, '-m', 'streamlit', 'run', script,
+        '--server.port', str(port), '--server.address', '127.0.0.1', '--server.headless', 'true',
+    ], cwd=ROOT)
+
+async def supervise(workers, script):
+    while True:
+        await asyncio.sleep(RESTART_DELAY)
+        for port, proc in list(workers.items()):
+            if proc.poll() is not None:
+                print(f"خطأ: توقف العامل على المنفذ {port} (الرمز {proc.returncode})؛ إعادة تشغيله")
+                workers[port] = start_worker(port, script)
+
+async def serve(n_workers, port=PORT, balance='ip', script='app.py', host='0.0.0.0'):
+    # الترحيلات مرة واحدة قبل العمّال حتى لا تتسابق العمليات عليها
+    os.chdir(ROOT)
+    init_db(DB_NAME)
+    ports = [BASE_PORT + i for i in range(n_workers)]
+    workers = {p: start_worker(p, script) for p in ports}
+    proxy = Proxy(ports, balance)
+    server = await asyncio.start_server(proxy.handle, host, port)
+    print(f"{n_workers} عامل على المنافذ {ports[0]}-{ports[-1]}، الوسيط على {host}:{port} (توزيع {balance})")
+    try:
+        async with server:
+            await asyncio.gather(server.serve_forever(), supervise(workers, script))
+    finally:
+        for proc in workers.values():
+            proc.terminate()
+        deadline = time.time() + 10
+        for proc in workers.values():
+            try:
+                proc.wait(max(0.1, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+if __name__ == "__main__":
+    # python serve.py [عدد العمّال] [ip|rr] [المنفذ]       الافتراضي: عدد الأنوية، ip، 8501
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    balance = sys.argv[2] if len(sys.argv) > 2 else 'ip'
+    if balance not in ('ip', 'rr'):
+        sys.exit("الاستخدام: python serve.py [عدد العمّال] [ip|rr] [المنفذ]")
+    try:
+        asyncio.run(serve(n_workers, int(sys.argv[3]) if len(sys.argv) > 3 else PORT, balance))
+    except KeyboardInterrupt:
+        pass
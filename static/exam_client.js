@@ -0,0 +1,137 @@
+// عميل الصفحة: يُثبَّت مرة واحدة في نافذة Streamlit الأم، وكل إعادة تحميل للـ iframe
+// تستدعي configure فقط. لا يوجد أي setInterval: التحديث يتم عند تغيّر DOM أو عند
+// تغيير اختيار، والمؤقت نبضة واحدة كل ثانية محاذاة لتغيّر الثانية المعروضة.
+(function (w) {
+    if (w.__vexsam) return;
+    var doc = w.document;
+    var KEY = 'vexsam_end';
+    var TIMER_ID = '_vex_timer_';
+    var NAV_NAMES = {
+        'app': '📝 الامتحان',
+        '2   المراجعة': '📖 المراجعة',
+        'المراجعة': '📖 المراجعة',
+        '3   التحليلات': '📊 التحليلات',
+        'التحليلات': '📊 التحليلات',
+        '4   التسليم': '📤 التسليم',
+        'التسليم': '📤 التسليم',
+        '5   المراقبة': '👁️ المراقبة',
+        'المراقبة': '👁️ المراقبة'
+    };
+    var state = { cfg: {}, endTime: 0, timer: null, frame: null };
+
+    // ── أسماء الصفحات في القائمة الجانبية ─────────────────────────
+    function renameNav() {
+        var links = doc.querySelectorAll('[data-testid="stSidebarNav"] a span');
+        for (var i = 0; i < links.length; i++) {
+            var txt = links[i].textContent.trim().toLowerCase();
+            for (var key in NAV_NAMES) {
+                var name = NAV_NAMES[key];
+                if (txt !== name.toLowerCase() && (txt === key.toLowerCase() || txt.indexOf(key.toLowerCase()) !== -1)) {
+                    links[i].textContent = name;
+                    break;
+                }
+            }
+        }
+    }
+
+    // ── تمييز الخيار المحدد بلون أحمر ────────────────────────────
+    function paintRadios() {
+        var c = state.cfg.colors;
+        if (!c) return;
+        var labels = doc.querySelectorAll('div[role="radiogroup"] > label');
+        for (var i = 0; i < labels.length; i++) {
+            var lbl = labels[i];
+            var inp = lbl.querySelector('input[type="radio"]');
+            var on = !!(inp && inp.checked);
+            if (lbl.__vexOn === on && lbl.__vexTheme === c) continue;
+            lbl.__vexOn = on;
+            lbl.__vexTheme = c;
+            lbl.style.border = on ? '2px solid #ff4b4b' : '1px solid ' + c.radio_border;
+            lbl.style.backgroundColor = on ? c.sel_bg : c.radio_bg;
+            lbl.style.boxShadow = on ? '0 4px 12px rgba(255,75,75,0.4)' : 'none';
+        }
+    }
+
+    function refresh() {
+        state.frame = null;
+        renameNav();
+        paintRadios();
+    }
+
+    // تجميع كل التغييرات في إطار رسم واحد
+    function schedule() {
+        if (state.frame === null) state.frame = w.requestAnimationFrame(refresh);
+    }
+
+    // ── المؤقت ───────────────────────────────────────────────────
+    function timerEl(create) {
+        var el = doc.getElementById(TIMER_ID);
+        if (!el && create) {
+            el = doc.createElement('div');
+            el.id = TIMER_ID;
+            el.style.cssText = [
+                'position:fixed', 'top:85px', 'right:25px', 'z-index:999999',
+                'background:#ff4b4b', 'color:white', 'padding:12px 20px',
+                'border-radius:8px', 'font-weight:bold', 'font-family:monospace',
+                'font-size:26px', 'border:2px solid white',
+                'box-shadow:0 6px 20px rgba(0,0,0,0.5)',
+                'min-width:110px', 'text-align:center'
+            ].join(';');
+            el.appendChild(doc.createTextNode(''));
+            doc.body.appendChild(el);
+        }
+        return el;
+    }
+
+    function stopTimer() {
+        if (state.timer !== null) {
+            w.clearTimeout(state.timer);
+            state.timer = null;
+        }
+    }
+
+    function tick() {
+        state.timer = null;
+        var el = timerEl(false);
+        if (!el) return;
+        var rem = state.endTime - Date.now();
+        if (rem <= 0) {
+            // تعديل عقدة النص (characterData) لا يوقظ MutationObserver المراقب لـ childList
+            // العرض فقط: التسليم يتم في الخادم عند انتهاء الوقت (deadlines.py وجزء المراقبة)
+            el.firstChild.nodeValue = '00:00';
+            w.sessionStorage.removeItem(KEY);
+            return;
+        }
+        var m = Math.floor(rem / 60000);
+        var s = Math.floor((rem % 60000) / 1000);
+        el.firstChild.nodeValue = (m < 10 ? '0' : '') + m + ':' + (s < 10 ? '0' : '') + s;
+        // النبضة التالية عند تغيّر الثانية المعروضة تماماً
+        state.timer = w.setTimeout(tick, (rem % 1000) || 1000);
+    }
+
+    function configure(cfg) {
+        state.cfg = cfg;
+        stopTimer();
+        if (cfg.endTs) {
+            var serverEnd = cfg.endTs * 1000;
+            var stored = parseInt(w.sessionStorage.getItem(KEY) || '0');
+            if (serverEnd > stored) w.sessionStorage.setItem(KEY, serverEnd);
+            state.endTime = parseInt(w.sessionStorage.getItem(KEY));
+            timerEl(true);
+            tick();
+        } else {
+            // خارج الامتحان: مسح المؤقت من الصفحة ومن sessionStorage
+            w.sessionStorage.removeItem(KEY);
+            var el = timerEl(false);
+            if (el) el.parentNode.removeChild(el);
+        }
+        schedule();
+    }
+
+    new w.MutationObserver(schedule).observe(doc.body, { childList: true, subtree: true });
+    doc.addEventListener('change', function (e) {
+        if (e.target && e.target.type === 'radio') schedule();
+    }, true);
+
+    w.__vexsam = { configure: configure, state: state };
+})(window);
@@ -0,0 +1,58 @@
+import csv
+import os
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from db import init_db
+
+CSV = os.path.join(ROOT, 'real_questions.csv')
+
+# مخطط exam_simulator.db الأصلي (قبل الترحيلات، user_version=0): نص القطعة داخل كل سؤال
+# والإجابة الصحيحة نص الخيار
+BASELINE_SCHEMA = '''
+    CREATE TABLE Questions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        subject TEXT,
+        section TEXT DEFAULT 'عام',
+        passage_text TEXT DEFAULT '',
+        question_text TEXT,
+        option_a TEXT,
+        option_b TEXT,
+        option_c TEXT,
+        option_d TEXT,
+        correct_option TEXT
+    )
+'''
+
+def csv_rows():
+    with open(CSV, encoding='utf-8-sig', newline='') as f:
+        return [row for row in csv.reader(f) if row][1:]
+
+def build_baseline(path):
+    """قاعدة بالمخطط الأصلي تحمل أسئلة real_questions.csv كما هي."""
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(BASELINE_SCHEMA)
+        conn.executemany(
+            'INSERT INTO Questions (subject, section, passage_text, question_text, '
+            'option_a, option_b, option_c, option_d, correct_option) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            csv_rows()
+        )
+    conn.close()
+    return str(path)
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    return build_baseline(tmp_path / 'exam_simulator.db')
+
+@pytest.fixture(scope='session')
+def bank_db(tmp_path_factory):
+    """قاعدة مرحَّلة إلى آخر إصدار، مشتركة بين الاختبارات التي تقرأ البنك وتنشئ محاولات."""
+    path = build_baseline(tmp_path_factory.mktemp('bank') / 'exam_simulator.db')
+    init_db(path)
+    return path
@@ -0,0 +1,56 @@
+import sqlite3
+
+from conftest import csv_rows
+from db import SCHEMA_VERSION, migrate, natural_key, passage_hash
+
+def connect(path):
+    return sqlite3.connect(path, isolation_level=None)
+
+def test_migrates_baseline_to_latest(baseline_db):
+    conn = connect(baseline_db)
+    assert migrate(conn) == 0
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION == 14
+    # تشغيل ثانٍ لا يطبق شيئاً
+    assert migrate(conn) == SCHEMA_VERSION
+
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(Questions)')}
+    assert 'correct_option' not in columns
+    assert {'natural_key', 'passage_id', 'correct_idx'} <= columns
+    for table in ('Passages', 'Attempts', 'AttemptAnswers', 'QuestionsFTS', 'BankVersion',
+                  'Reviews', 'Sessions', 'AttemptProgress', 'SectionProgress'):
+        assert conn.execute('SELECT 1 FROM sqlite_master WHERE name=?', (table,)).fetchone(), table
+
+def test_keeps_every_distinct_question(baseline_db):
+    rows = csv_rows()
+    conn = connect(baseline_db)
+    migrate(conn)
+
+    # التكرارات تُحذف ويبقى أقدم صف
+    first = {}
+    for i, row in enumerate(rows, start=1):
+        first.setdefault(natural_key(row[0], *row[3:8]), (i, row))
+    stored = {key: row for key, *row in conn.execute(
+        'SELECT natural_key, id, passage_id, correct_idx FROM Questions')}
+    assert stored.keys() == first.keys()
+    assert conn.execute('SELECT COUNT(*) FROM QuestionsFTS').fetchone()[0] == len(first)
+
+    passages = dict(conn.execute('SELECT id, passage_text FROM Passages'))
+    assert len(passages) == len({row[2].strip() for _, row in first.values() if row[2].strip()})
+    assert not conn.execute("SELECT COUNT(*) FROM Questions WHERE passage_text != ''").fetchone()[0]
+    for key, (q_id, passage_id, correct_idx) in stored.items():
+        row_id, row = first[key]
+        assert q_id == row_id
+        if row[2].strip():
+            assert passage_hash(passages[passage_id]) == passage_hash(row[2])
+        else:
+            assert passage_id is None
+        matches = [i for i, option in enumerate(row[4:8]) if option.strip() == row[8].strip()]
+        assert correct_idx == (matches[0] if len(matches) == 1 else None)
+
+def test_reports_unmatched_correct_answers(baseline_db):
+    conn = connect(baseline_db)
+    migrate(conn)
+    reported = dict(conn.execute('SELECT question_id, matches FROM CorrectOptionReport'))
+    missing = {q_id for (q_id,) in conn.execute('SELECT id FROM Questions WHERE correct_idx IS NULL')}
+    assert missing <= reported.keys()
+    assert all(matches != 1 for matches in reported.values())
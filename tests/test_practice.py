@@ -0,0 +1,43 @@
+import pytest
+
+from db import get_pool
+from practice import DAY, MIN_EASE, QUALITY, START_EASE, due_questions, review, sm2
+
+def test_intervals_after_correct_answers():
+    reps, interval, ease = 0, 0.0, START_EASE
+    intervals = []
+    for _ in range(5):
+        previous = ease
+        reps, interval, ease = sm2(reps, interval, ease, QUALITY[True])
+        intervals.append(interval)
+        assert ease == pytest.approx(previous)  # الدرجة 4 لا تغير معامل السهولة
+    assert intervals == [1.0, 6.0, 15.0, 37.5, 93.8]
+
+def test_wrong_answer_resets_and_lowers_ease():
+    reps, interval, ease = sm2(3, 15.0, START_EASE, QUALITY[False])
+    assert (reps, interval) == (0, 1.0)
+    assert ease == pytest.approx(START_EASE - 0.54)
+    reps, interval, ease = sm2(reps, interval, ease, QUALITY[True])
+    assert (reps, interval) == (1, 1.0)
+
+def test_ease_never_drops_below_minimum():
+    ease = START_EASE
+    for _ in range(10):
+        _, _, ease = sm2(0, 1.0, ease, QUALITY[False])
+    assert ease == MIN_EASE
+
+def test_review_schedules_only_mistakes(bank_db):
+    at = 1_000_000.0
+    with get_pool(bank_db).write() as conn:
+        assert review(conn, 'sm2', 'اللغة العربية', [(1, False), (2, True)], at) == 1
+    assert due_questions('sm2', 'اللغة العربية', now=at + DAY - 1, db_path=bank_db) == []
+    assert due_questions('sm2', 'اللغة العربية', now=at + DAY, db_path=bank_db) == [1]
+
+    # الإجابات الصحيحة اللاحقة تباعد موعده: يوم ثم 6 أيام
+    with get_pool(bank_db).write() as conn:
+        review(conn, 'sm2', 'اللغة العربية', [(1, True)], at + DAY)
+    assert due_questions('sm2', 'اللغة العربية', now=at + 2 * DAY, db_path=bank_db) == [1]
+    with get_pool(bank_db).write() as conn:
+        review(conn, 'sm2', 'اللغة العربية', [(1, True)], at + 2 * DAY)
+    assert due_questions('sm2', 'اللغة العربية', now=at + 8 * DAY - 1, db_path=bank_db) == []
+    assert due_questions('sm2', 'اللغة العربية', now=at + 8 * DAY, db_path=bank_db) == [1]
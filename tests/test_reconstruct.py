@@ -0,0 +1,54 @@
+import random
+import time
+
+import pytest
+
+from adaptive import get_item_pool
+from attempts import create_attempt, finalize_attempt, reconstruct_attempt, record_answer, record_items
+from exam_generator import option_order
+from question_bank import get_bank
+
+SUBJECTS = ('اللغة العربية', 'اللغة الإنجليزية')
+
+@pytest.mark.parametrize('subject', SUBJECTS)
+def test_fixed_attempt_rebuilds_from_seed(bank_db, subject):
+    attempt_id, seed, question_ids = create_attempt('reconstruct', subject, 50, 30, time.time() + 3600, db_path=bank_db)
+    rng = random.Random(attempt_id)
+    answers = [rng.choice((-1, 0, 1, 2, 3)) for _ in question_ids]
+    for position, (q_id, answer) in enumerate(zip(question_ids, answers)):
+        if answer >= 0:
+            record_answer(attempt_id, position, q_id, answer, db_path=bank_db)
+    finalize_attempt(attempt_id, db_path=bank_db)
+
+    rebuilt = reconstruct_attempt(attempt_id, db_path=bank_db)
+    assert rebuilt['seed'] == seed
+    assert list(rebuilt['questions']) == list(question_ids)
+    assert list(rebuilt['user_answers']) == answers
+    assert rebuilt['matches'] and not rebuilt['bank_changed']
+    assert rebuilt['option_order'] == option_order(seed, len(question_ids))
+
+def test_adaptive_attempt_replays_from_answers(bank_db):
+    subject = SUBJECTS[0]
+    attempt_id, seed, question_ids = create_attempt('reconstruct', subject, 50, 15, time.time() + 3600,
+                                                    db_path=bank_db, adaptive=True)
+    questions, answers = list(question_ids), []
+    rows = get_bank(bank_db).rows
+    items = get_item_pool(bank_db)
+    rng = random.Random(seed)
+    while True:
+        key = rows[questions[-1]][9]
+        answer = key if key is not None and rng.random() < 0.6 else rng.randrange(4)
+        record_answer(attempt_id, len(answers), questions[-1], answer, db_path=bank_db)
+        answers.append(answer)
+        q_id, _, _ = items.step(subject, questions, answers, seed, 15)
+        if q_id is None:
+            break
+        questions.append(q_id)
+        record_items(attempt_id, questions, db_path=bank_db)
+    finalize_attempt(attempt_id, db_path=bank_db)
+
+    assert len(questions) > 1
+    rebuilt = reconstruct_attempt(attempt_id, db_path=bank_db)
+    assert list(rebuilt['questions']) == questions
+    assert list(rebuilt['user_answers']) == answers
+    assert rebuilt['matches']
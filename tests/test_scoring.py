@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+import pytest
+
+from question_bank import get_bank
+from scoring import analyse, score_attempt
+
+@pytest.fixture(scope='module')
+def bank(bank_db):
+    return get_bank(bank_db)
+
+@pytest.fixture(scope='module')
+def attempts(bank):
+    # محاولات بأطوال مختلفة (منها سؤال واحد) وإجابات صحيحة وخاطئة ومتروكة (-1)،
+    # ومعها أسئلة بلا إجابة صحيحة (correct_idx NULL) تُحسب خاطئة دائماً
+    rng = random.Random(7)
+    unkeyed = [q_id for q_id, row in bank.rows.items() if row[9] is None]
+    assert unkeyed
+    pool = sorted(bank.rows)[:40] + unkeyed
+    result = []
+    for _ in range(200):
+        q_ids = rng.sample(pool, rng.randint(1, 20))
+        answers = [rng.choice((-1, 0, 1, 2, 3, *[bank.rows[q][9]] * 2)) if bank.rows[q][9] is not None
+                   else rng.choice((-1, 0, 1, 2, 3)) for q in q_ids]
+        result.append((q_ids, answers))
+    return result
+
+def test_score_attempt_matches_batch(bank, attempts):
+    batch = analyse(bank, attempts)
+    for i, (q_ids, answers) in enumerate(attempts):
+        score, incorrect, sections = score_attempt(bank, q_ids, answers)
+        right = [a == bank.rows[q][9] for q, a in zip(q_ids, answers)]
+        assert score == batch['scores'][i] == sum(right)
+        assert batch['lengths'][i] == len(q_ids)
+        assert incorrect == [(q, a) for q, a, ok in zip(q_ids, answers, right) if not ok]
+        by_section = {
+            name: (int(batch['section_correct'][i, s]), int(batch['section_total'][i, s]))
+            for s, name in enumerate(batch['sections']) if batch['section_total'][i, s]
+        }
+        assert sections == by_section
+        assert sum(total for _, total in sections.values()) == len(q_ids)
+
+def test_item_analysis(bank, attempts):
+    items = analyse(bank, attempts)['items']
+    for q_id, n, p, discrimination, distractors in zip(
+            items['ids'].tolist(), items['n'], items['p'], items['discrimination'], items['distractors']):
+        seen = [(q_ids, answers) for q_ids, answers in attempts if q_id in q_ids]
+        chosen = [answers[q_ids.index(q_id)] for q_ids, answers in seen]
+        assert n == len(seen)
+        assert p == pytest.approx(np.mean([a == bank.rows[q_id][9] for a in chosen]))
+        assert distractors.tolist() == [chosen.count(c) for c in (0, 1, 2, 3, -1)]
+        # التمييز المصحح: الارتباط بين صحة البند ونسبة الطالب في بقية البنود
+        item, rest = [], []
+        for q_ids, answers in seen:
+            if len(q_ids) > 1:
+                right = [a == bank.rows[q][9] for q, a in zip(q_ids, answers)]
+                own = right[q_ids.index(q_id)]
+                item.append(float(own))
+                rest.append((sum(right) - own) / (len(q_ids) - 1))
+        if len(set(item)) > 1 and len(set(rest)) > 1:
+            assert discrimination == pytest.approx(np.corrcoef(item, rest)[0, 1])
+        else:
+            assert np.isnan(discrimination)
@@ -0,0 +1,158 @@
+from functools import lru_cache
+
+# ==========================================
+# ألوان الوضعين و CSS الصفحات
+# ==========================================
+# مشتركة بين app.py وصفحات pages/ دون استيراد app.py نفسه (إعداد الصفحة وطابور الكتابة
+# وجدولة المواعيد ومجمع الامتحانات تبقى لصفحة الامتحان وحدها).
+
+# ألوان الوضع الداكن والفاتح (مفتاح القاموس: dark_mode)
+THEMES = {
+    True: dict(
+        bg="#0e1117", card_bg="#1a1a1b", border="#3e3e42",
+        text="#ffffff", text2="#e0e0e0", muted="#888",
+        selected_bg="#2d1616", sidebar_bg="#0e1117", sidebar_text="#ffffff",
+        radio_bg="#1a1a1b", radio_border="#3e3e42", radio_text="white",
+        passage_bg="rgba(255,193,7,0.1)",
+    ),
+    False: dict(
+        bg="#ffffff", card_bg="#f8f9fa", border="#dee2e6",
+        text="#1a1a2e", text2="#333333", muted="#666",
+        selected_bg="#ffe0e0", sidebar_bg="#f0f2f6", sidebar_text="#1a1a2e",
+        radio_bg="#f0f2f6", radio_border="#dee2e6", radio_text="#1a1a2e",
+        passage_bg="rgba(255,193,7,0.15)",
+    ),
+}
+
+# الأصول الثابتة تُبنى مرة واحدة لكل وضع بدلاً من تجميع f-string في كل إعادة تشغيل
+@lru_cache(maxsize=2)
+def exam_css(dark):
+    t = THEMES[dark]
+    radio_bg, radio_border, radio_text, sel_bg = t['radio_bg'], t['radio_border'], t['radio_text'], t['selected_bg']
+    return f"""
+        <style>
+        /* اتجاه النص من اليمين لليسار */
+        .main .block-container {{
+            direction: rtl;
+            text-align: right;
+        }}
+        /* إخفاء دوائر الراديو */
+        div[role="radiogroup"] > label > div:first-child {{ display: none !important; }}
+        div[role="radiogroup"] svg {{ display: none !important; }}
+        div[role="radiogroup"] > label > div:first-of-type {{
+            display: none !important; width: 0 !important; height: 0 !important;
+            overflow: hidden !important; margin: 0 !important; padding: 0 !important;
+        }}
+        [data-testid="stRadio"] [role="radiogroup"] label > div:first-of-type {{ display: none !important; }}
+
+        /* تحويل الخيارات إلى بطاقات */
+        div[role="radiogroup"] > label {{
+            background-color: {radio_bg} !important;
+            border: 1px solid {radio_border} !important;
+            padding: 15px 25px !important;
+            border-radius: 10px !important;
+            margin-bottom: 8px !important;
+            width: 100% !important;
+            cursor: pointer !important;
+            color: {radio_text} !important;
+            display: block !important;
+            direction: rtl !important;
+            text-align: right !important;
+        }}
+        div[role="radiogroup"] > label[aria-checked="true"] {{
+            border: 2px solid #ff4b4b !important;
+            background-color: {sel_bg} !important;
+            box-shadow: 0 4px 12px rgba(255, 75, 75, 0.4) !important;
+        }}
+
+        /* نص القطعة (app.passage_html): التنسيق هنا لا في كل سؤال */
+        .vx-passage {{
+            background: {t['passage_bg']};
+            border-right: 5px solid #ffc107;
+            padding: 20px;
+            border-radius: 8px;
+            direction: ltr;
+            text-align: left;
+            margin-bottom: 20px;
+            color: {t['text2']};
+        }}
+        </style>
+"""
+
+@lru_cache(maxsize=2)
+def main_css(dark):
+    t = THEMES[dark]
+    bg, border, text, muted = t['bg'], t['border'], t['text'], t['muted']
+    sidebar_bg, sidebar_text = t['sidebar_bg'], t['sidebar_text']
+    return f"""
+    <style>
+    /* القائمة الجانبية RTL */
+    [data-testid="stSidebar"] {{
+        direction: rtl;
+        text-align: right;
+        background-color: {sidebar_bg} !important;
+    }}
+    [data-testid="stSidebar"] > div:first-child {{
+        background-color: {sidebar_bg} !important;
+    }}
+    [data-testid="stSidebar"] * {{
+        color: {sidebar_text} !important;
+    }}
+    [data-testid="stSidebar"] .stButton button {{
+        color: {sidebar_text} !important;
+        border-color: {border} !important;
+    }}
+    [data-testid="stSidebar"] [data-testid="stSidebarNav"] {{
+        direction: rtl;
+        padding-top: 15px;
+    }}
+    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a {{
+        direction: rtl;
+        text-align: right;
+        font-size: 16px !important;
+        font-weight: 600 !important;
+        padding: 10px 20px !important;
+    }}
+    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a span {{
+        font-size: 16px !important;
+    }}
+    /* عنوان القائمة الجانبية */
+    .sidebar-title {{
+        text-align: center;
+        padding: 15px 10px;
+        border-bottom: 1px solid {border};
+        margin-bottom: 15px;
+    }}
+    .sidebar-title h3 {{
+        background: linear-gradient(135deg, #ff4b4b, #ff8f00);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        font-size: 1.3rem;
+        font-weight: 900;
+        margin: 0;
+    }}
+    /* ألوان الوضع */
+    .main .block-container {{
+        color: {text} !important;
+    }}
+    .stApp {{
+        background-color: {bg} !important;
+    }}
+    .stApp [data-testid="stHeader"] {{
+        background-color: {bg} !important;
+    }}
+    h1, h2, h3, h4, h5, h6, p, span, label, .stMarkdown {{
+        color: {text} !important;
+    }}
+    .stCaption, .stCaption p {{
+        color: {muted} !important;
+    }}
+    hr {{
+        border-color: {border} !important;
+    }}
+    /* أزرار */
+    .stButton button {{
+        color: {text} !important;
+    }}
+    </style>
+"""